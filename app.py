@@ -4,174 +4,1980 @@ Meeting Poll Web Application
 A simple Flask app for creating and managing meeting polls similar to Doodle.
 """
 
+import bisect
+import csv
+import hashlib
+import hmac
+import io
+import itertools
+import json
+import logging
+import math
 import os
+import pickle
+import queue
+import re
+import socket
 import sqlite3
+import threading
+import time
 import uuid
-from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, jsonify, g
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from urllib.parse import urlparse
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import click
+from flask import Flask, Response, make_response, render_template, request, redirect, url_for, jsonify
+from jinja2 import DictLoader
+from markupsafe import Markup
+
+try:
+    import numpy
+except ImportError:   # /api/poll/<poll_id>/best falls back to plain Python
+    numpy = None
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-in-production'
 
-# Database configuration
-DATABASE = 'polls.db'
+# Logging configuration. LOG_LEVEL sets the starting level; the level and the
+# set of polls with a per-request debug trace can be changed at runtime
+# through /admin/logging, which every worker picks up from LOG_CONTROL_FILE.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_CONTROL_FILE = os.environ.get('LOG_CONTROL_FILE', 'log_control.json')
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+logger = logging.getLogger('kdc_scheduler')
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+    logger.addHandler(_handler)
+logger.setLevel(LOG_LEVEL)
+
+# Per-poll traces are emitted whatever the main level is, but only for
+# polls listed in TRACED_POLLS, so they cost a set lookup when disabled
+trace_logger = logging.getLogger('kdc_scheduler.trace')
+trace_logger.setLevel(logging.DEBUG)
+TRACED_POLLS = set()
+
+_log_control = {'mtime': None, 'checked': 0.0}
+
+# Allowed answers for a time slot, matching the CHECK constraint on votes
+AVAILABILITY_CHOICES = ('yes', 'maybe', 'no')
+ANSWER_CODES = {'yes': 1, 'maybe': 2, 'no': 3}   # 0 = no answer
+
+# Database configuration. STORAGE_BACKEND picks where polls are kept:
+# 'sqlite' (the default) uses the DATABASE file, which suits a single host;
+# 'postgres' uses DATABASE_URL, so any number of app nodes can share one
+# database. Both run the same queries, written with ? placeholders.
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'sqlite')
+DATABASE = os.environ.get('DATABASE', 'polls.db')
+DATABASE_URL = os.environ.get('DATABASE_URL', '')
+DATABASE_POOL_MIN = int(os.environ.get('DATABASE_POOL_MIN', 1))
+DATABASE_POOL_MAX = int(os.environ.get('DATABASE_POOL_MAX', 10))
+DATABASE_POOL_TIMEOUT = float(os.environ.get('DATABASE_POOL_TIMEOUT', 30))   # seconds
+STREAM_FETCH_ROWS = int(os.environ.get('STREAM_FETCH_ROWS', 2000))           # rows per round trip of a streamed query
+
+# SQLite tuning applied to every connection, overridable through environment
+# variables. WAL lets readers proceed while a writer commits, so several
+# gunicorn workers can share one database file without "database is locked".
+# Every thread of every worker has a connection of its own with its own page
+# cache, so the caches take up to cache_size x threads x WEB_CONCURRENCY: 160
+# connections with start.sh's defaults. The memory map is the OS page cache,
+# shared by all of them, so mmap_size only reserves address space.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -8000)),         # negative = KiB
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),  # bytes
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),      # milliseconds
+}
+
+class SQLiteConnection(sqlite3.Connection):
+    """sqlite3 connection with the transaction helpers shared with PostgreSQL"""
+    
+    def begin_read(self):
+        """Start a transaction that reads from one consistent snapshot"""
+        self.execute('BEGIN')
+    
+    def begin_write(self, poll_id):
+        """Start a transaction that changes poll_id, holding the write lock up front"""
+        if not self.in_transaction:
+            self.execute('BEGIN IMMEDIATE')
+    
+    def lock_event_log(self):
+        """Make event IDs visible in commit order; SQLite writers are already serialized"""
+    
+    def stream(self, sql, params=()):
+        """Run a query whose rows are read from the database as they are iterated"""
+        return self.execute(sql, params)
+
+def connect_db(path=None):
+    """Open a new database connection with the tuning pragmas applied"""
+    db = sqlite3.connect(path or DATABASE, timeout=SQLITE_PRAGMAS['busy_timeout'] / 1000,
+                         factory=SQLiteConnection)
+    db.row_factory = sqlite3.Row
+    for name, value in SQLITE_PRAGMAS.items():
+        db.execute(f'PRAGMA {name} = {value}')
+    return db
+
+# Schema migrations, applied in order. Entry N produces schema version N + 1,
+# which is tracked in the database file with PRAGMA user_version so existing
+# polls.db files are upgraded in place on startup.
+MIGRATIONS = [
+    # 1: base schema
+    '''
+        CREATE TABLE IF NOT EXISTS polls (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        
+        CREATE TABLE IF NOT EXISTS time_slots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            poll_id TEXT NOT NULL,
+            slot_datetime TEXT NOT NULL,
+            FOREIGN KEY (poll_id) REFERENCES polls (id)
+        );
+        
+        CREATE TABLE IF NOT EXISTS votes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            poll_id TEXT NOT NULL,
+            voter_name TEXT NOT NULL,
+            time_slot_id INTEGER NOT NULL,
+            availability TEXT NOT NULL CHECK (availability IN ('yes', 'maybe', 'no')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (poll_id) REFERENCES polls (id),
+            FOREIGN KEY (time_slot_id) REFERENCES time_slots (id),
+            UNIQUE(poll_id, voter_name, time_slot_id)
+        );
+    ''',
+    # 2: covering indexes for the poll page, vote and results queries
+    '''
+        -- Slot list and tally join, ordered by slot_datetime (id is the rowid)
+        CREATE INDEX IF NOT EXISTS idx_time_slots_poll
+            ON time_slots (poll_id, slot_datetime);
+        
+        -- Vote matrix, DISTINCT voter scan and per-voter deletes
+        CREATE INDEX IF NOT EXISTS idx_votes_poll_voter
+            ON votes (poll_id, voter_name, time_slot_id, availability);
+        
+        -- Per-slot yes/maybe/no aggregation
+        CREATE INDEX IF NOT EXISTS idx_votes_poll_slot
+            ON votes (poll_id, time_slot_id, availability);
+    ''',
+    # 3: live update feed read by the /poll/<poll_id>/events streams
+    '''
+        CREATE TABLE IF NOT EXISTS poll_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            poll_id TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        
+        CREATE INDEX IF NOT EXISTS idx_poll_events_poll
+            ON poll_events (poll_id, id);
+    ''',
+    # 4: per-poll version counter, bumped by every write to votes or time_slots
+    '''
+        ALTER TABLE polls ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
+    ''',
+    # 5: packed ballots, one row per voter holding 2 bits per slot
+    '''
+        ALTER TABLE polls ADD COLUMN ballot_format TEXT NOT NULL DEFAULT 'rows'
+            CHECK (ballot_format IN ('rows', 'packed'));
+        
+        CREATE TABLE IF NOT EXISTS ballots (
+            poll_id TEXT NOT NULL,
+            voter_name TEXT NOT NULL,
+            answers BLOB NOT NULL,
+            PRIMARY KEY (poll_id, voter_name),
+            FOREIGN KEY (poll_id) REFERENCES polls (id)
+        ) WITHOUT ROWID;
+    ''',
+    # 6: per-slot answer counts, kept up to date by every ballot write
+    '''
+        CREATE TABLE IF NOT EXISTS slot_tallies (
+            time_slot_id INTEGER PRIMARY KEY,
+            yes INTEGER NOT NULL DEFAULT 0,
+            maybe INTEGER NOT NULL DEFAULT 0,
+            no INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (time_slot_id) REFERENCES time_slots (id)
+        );
+        
+        -- Backfill from the votes rows and the packed ballots, decoding each
+        -- slot's 2 bits from the hex of its byte
+        INSERT OR IGNORE INTO slot_tallies (time_slot_id, yes, maybe, no)
+        WITH positions AS (
+            SELECT id, poll_id, ROW_NUMBER() OVER (PARTITION BY poll_id ORDER BY id) - 1 AS position
+            FROM time_slots
+        ), packed_bytes AS (
+            SELECT p.id AS time_slot_id,
+                   2 * (p.position % 4) AS shift,
+                   hex(substr(b.answers, p.position / 4 + 1, 1)) AS hex_byte
+            FROM positions p
+            JOIN ballots b ON b.poll_id = p.poll_id
+        ), packed AS (
+            SELECT time_slot_id,
+                   (((instr('0123456789ABCDEF', substr(hex_byte, 1, 1)) - 1) * 16
+                     + instr('0123456789ABCDEF', substr(hex_byte, 2, 1)) - 1) >> shift) & 3 AS code
+            FROM packed_bytes
+        ), answers AS (
+            SELECT time_slot_id, availability FROM votes
+            UNION ALL
+            SELECT time_slot_id, CASE code WHEN 1 THEN 'yes' WHEN 2 THEN 'maybe' ELSE 'no' END
+            FROM packed
+            WHERE code > 0
+        )
+        SELECT ts.id,
+               COUNT(*) FILTER (WHERE a.availability = 'yes'),
+               COUNT(*) FILTER (WHERE a.availability = 'maybe'),
+               COUNT(*) FILTER (WHERE a.availability = 'no')
+        FROM time_slots ts
+        LEFT JOIN answers a ON a.time_slot_id = ts.id
+        GROUP BY ts.id;
+    ''',
+    # 7: participants with integer IDs, referenced by votes and ballots
+    # instead of repeating voter_name on every row
+    '''
+        CREATE TABLE IF NOT EXISTS participants (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            poll_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            FOREIGN KEY (poll_id) REFERENCES polls (id),
+            UNIQUE (poll_id, name)
+        );
+        
+        INSERT INTO participants (poll_id, name)
+            SELECT poll_id, voter_name FROM votes
+            UNION
+            SELECT poll_id, voter_name FROM ballots
+            ORDER BY 1, 2;
+        
+        -- SQLite can't drop a column that is part of a constraint, so both
+        -- tables are rebuilt; their indexes go with the old tables
+        CREATE TABLE votes_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            poll_id TEXT NOT NULL,
+            participant_id INTEGER NOT NULL,
+            time_slot_id INTEGER NOT NULL,
+            availability TEXT NOT NULL CHECK (availability IN ('yes', 'maybe', 'no')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (poll_id) REFERENCES polls (id),
+            FOREIGN KEY (participant_id) REFERENCES participants (id),
+            FOREIGN KEY (time_slot_id) REFERENCES time_slots (id),
+            UNIQUE (participant_id, time_slot_id)
+        );
+        
+        INSERT INTO votes_new (id, poll_id, participant_id, time_slot_id, availability, created_at)
+            SELECT v.id, v.poll_id, p.id, v.time_slot_id, v.availability, v.created_at
+            FROM votes v
+            JOIN participants p ON p.poll_id = v.poll_id AND p.name = v.voter_name;
+        
+        DROP TABLE votes;
+        ALTER TABLE votes_new RENAME TO votes;
+        
+        -- Vote matrix scan
+        CREATE INDEX IF NOT EXISTS idx_votes_poll_voter
+            ON votes (poll_id, participant_id, time_slot_id, availability);
+        
+        -- Per-slot yes/maybe/no recount
+        CREATE INDEX IF NOT EXISTS idx_votes_poll_slot
+            ON votes (poll_id, time_slot_id, availability);
+        
+        CREATE TABLE ballots_new (
+            poll_id TEXT NOT NULL,
+            participant_id INTEGER NOT NULL,
+            answers BLOB NOT NULL,
+            PRIMARY KEY (poll_id, participant_id),
+            FOREIGN KEY (poll_id) REFERENCES polls (id),
+            FOREIGN KEY (participant_id) REFERENCES participants (id)
+        ) WITHOUT ROWID;
+        
+        INSERT INTO ballots_new (poll_id, participant_id, answers)
+            SELECT b.poll_id, p.id, b.answers
+            FROM ballots b
+            JOIN participants p ON p.poll_id = b.poll_id AND p.name = b.voter_name;
+        
+        DROP TABLE ballots;
+        ALTER TABLE ballots_new RENAME TO ballots;
+        
+        -- Cached poll views were keyed by name; make every worker rebuild them
+        UPDATE polls SET version = version + 1;
+    ''',
+    # 8: slot start times as UTC epoch seconds, parsed from the labels when
+    # polls are created, for ordering and time range queries across polls
+    '''
+        ALTER TABLE time_slots ADD COLUMN starts_at INTEGER;
+        ALTER TABLE time_slots ADD COLUMN duration INTEGER;
+        ALTER TABLE time_slots ADD COLUMN time_zone TEXT;
+        
+        CREATE INDEX IF NOT EXISTS idx_time_slots_starts
+            ON time_slots (starts_at) WHERE starts_at IS NOT NULL;
+        
+        -- Cached tallies don't carry the new columns yet
+        UPDATE polls SET version = version + 1;
+    ''',
+]
+
+# The same schema versions for PostgreSQL; entry N must match MIGRATIONS[N].
+# The version is kept in the schema_version table.
+POSTGRES_MIGRATIONS = [
+    # 1: base schema
+    '''
+        CREATE TABLE IF NOT EXISTS polls (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMPTZ DEFAULT now()
+        );
+        
+        CREATE TABLE IF NOT EXISTS time_slots (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            poll_id TEXT NOT NULL REFERENCES polls (id),
+            slot_datetime TEXT NOT NULL
+        );
+        
+        CREATE TABLE IF NOT EXISTS votes (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            poll_id TEXT NOT NULL REFERENCES polls (id),
+            voter_name TEXT NOT NULL,
+            time_slot_id BIGINT NOT NULL REFERENCES time_slots (id),
+            availability TEXT NOT NULL CHECK (availability IN ('yes', 'maybe', 'no')),
+            created_at TIMESTAMPTZ DEFAULT now(),
+            UNIQUE (poll_id, voter_name, time_slot_id)
+        );
+    ''',
+    # 2: covering indexes for the poll page, vote and results queries
+    '''
+        CREATE INDEX IF NOT EXISTS idx_time_slots_poll
+            ON time_slots (poll_id, slot_datetime) INCLUDE (id);
+        
+        CREATE INDEX IF NOT EXISTS idx_votes_poll_voter
+            ON votes (poll_id, voter_name, time_slot_id, availability);
+        
+        CREATE INDEX IF NOT EXISTS idx_votes_poll_slot
+            ON votes (poll_id, time_slot_id, availability);
+    ''',
+    # 3: live update feed read by the /poll/<poll_id>/events streams
+    '''
+        CREATE TABLE IF NOT EXISTS poll_events (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            poll_id TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT now()
+        );
+        
+        CREATE INDEX IF NOT EXISTS idx_poll_events_poll
+            ON poll_events (poll_id, id);
+    ''',
+    # 4: per-poll version counter, bumped by every write to votes or time_slots
+    '''
+        ALTER TABLE polls ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
+    ''',
+    # 5: packed ballots, one row per voter holding 2 bits per slot
+    '''
+        ALTER TABLE polls ADD COLUMN IF NOT EXISTS ballot_format TEXT NOT NULL DEFAULT 'rows'
+            CHECK (ballot_format IN ('rows', 'packed'));
+        
+        CREATE TABLE IF NOT EXISTS ballots (
+            poll_id TEXT NOT NULL REFERENCES polls (id),
+            voter_name TEXT NOT NULL,
+            answers BYTEA NOT NULL,
+            PRIMARY KEY (poll_id, voter_name)
+        );
+    ''',
+    # 6: per-slot answer counts, kept up to date by every ballot write
+    '''
+        CREATE TABLE IF NOT EXISTS slot_tallies (
+            time_slot_id BIGINT PRIMARY KEY REFERENCES time_slots (id),
+            yes INTEGER NOT NULL DEFAULT 0,
+            maybe INTEGER NOT NULL DEFAULT 0,
+            no INTEGER NOT NULL DEFAULT 0
+        );
+        
+        INSERT INTO slot_tallies (time_slot_id, yes, maybe, no)
+        WITH positions AS (
+            SELECT id, poll_id, (ROW_NUMBER() OVER (PARTITION BY poll_id ORDER BY id) - 1)::int AS position
+            FROM time_slots
+        ), packed AS (
+            SELECT p.id AS time_slot_id,
+                   (get_byte(b.answers, p.position / 4) >> (2 * (p.position % 4))) & 3 AS code
+            FROM positions p
+            JOIN ballots b ON b.poll_id = p.poll_id
+            WHERE octet_length(b.answers) > p.position / 4
+        ), answers AS (
+            SELECT time_slot_id, availability FROM votes
+            UNION ALL
+            SELECT time_slot_id, (ARRAY['yes', 'maybe', 'no'])[code]
+            FROM packed
+            WHERE code > 0
+        )
+        SELECT ts.id,
+               COUNT(*) FILTER (WHERE a.availability = 'yes'),
+               COUNT(*) FILTER (WHERE a.availability = 'maybe'),
+               COUNT(*) FILTER (WHERE a.availability = 'no')
+        FROM time_slots ts
+        LEFT JOIN answers a ON a.time_slot_id = ts.id
+        GROUP BY ts.id
+        ON CONFLICT (time_slot_id) DO NOTHING;
+    ''',
+    # 7: participants with integer IDs, referenced by votes and ballots
+    # instead of repeating voter_name on every row
+    '''
+        CREATE TABLE IF NOT EXISTS participants (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            poll_id TEXT NOT NULL REFERENCES polls (id),
+            name TEXT NOT NULL,
+            UNIQUE (poll_id, name)
+        );
+        
+        INSERT INTO participants (poll_id, name)
+            SELECT poll_id, voter_name FROM votes
+            UNION
+            SELECT poll_id, voter_name FROM ballots
+            ORDER BY 1, 2;
+        
+        -- Dropping voter_name also drops the constraints and indexes using it
+        ALTER TABLE votes ADD COLUMN participant_id BIGINT REFERENCES participants (id);
+        UPDATE votes v SET participant_id = p.id
+            FROM participants p
+            WHERE p.poll_id = v.poll_id AND p.name = v.voter_name;
+        ALTER TABLE votes ALTER COLUMN participant_id SET NOT NULL;
+        ALTER TABLE votes DROP COLUMN voter_name;
+        ALTER TABLE votes ADD UNIQUE (participant_id, time_slot_id);
+        
+        CREATE INDEX IF NOT EXISTS idx_votes_poll_voter
+            ON votes (poll_id, participant_id, time_slot_id, availability);
+        
+        ALTER TABLE ballots ADD COLUMN participant_id BIGINT REFERENCES participants (id);
+        UPDATE ballots b SET participant_id = p.id
+            FROM participants p
+            WHERE p.poll_id = b.poll_id AND p.name = b.voter_name;
+        ALTER TABLE ballots ALTER COLUMN participant_id SET NOT NULL;
+        ALTER TABLE ballots DROP COLUMN voter_name;
+        ALTER TABLE ballots ADD PRIMARY KEY (poll_id, participant_id);
+        
+        -- Cached poll views were keyed by name; make every worker rebuild them
+        UPDATE polls SET version = version + 1;
+    ''',
+    # 8: slot start times as UTC epoch seconds, parsed from the labels when
+    # polls are created, for ordering and time range queries across polls
+    '''
+        ALTER TABLE time_slots ADD COLUMN IF NOT EXISTS starts_at BIGINT;
+        ALTER TABLE time_slots ADD COLUMN IF NOT EXISTS duration INTEGER;
+        ALTER TABLE time_slots ADD COLUMN IF NOT EXISTS time_zone TEXT;
+        
+        CREATE INDEX IF NOT EXISTS idx_time_slots_starts
+            ON time_slots (starts_at) WHERE starts_at IS NOT NULL;
+        
+        -- Cached tallies don't carry the new columns yet
+        UPDATE polls SET version = version + 1;
+    ''',
+]
+
+def split_sql(script):
+    """Split a SQL script into its statements"""
+    statements, current = [], ''
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ''
+    return statements
+
+def migrate_db(db, target=None):
+    """Apply pending schema migrations and return the resulting version"""
+    if target is None:
+        target = len(MIGRATIONS)
+    
+    while True:
+        # Each migration runs in its own transaction together with the
+        # version bump, so an interrupted upgrade can simply be re-run. The
+        # version is read under the write lock, so workers starting together
+        # wait for the first one instead of applying the same migration again.
+        # (executescript would commit the transaction, hence the splitting.)
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            version = db.execute('PRAGMA user_version').fetchone()[0]
+            if version >= target:
+                return version
+            for statement in split_sql(MIGRATIONS[version]):
+                db.execute(statement)
+            db.execute(f'PRAGMA user_version = {version + 1}')
+
+class Storage:
+    """Interface for the database holding polls, time slots, votes and events"""
+    
+    name = 'base'
+    Error = Exception   # base class of the errors raised by this backend's connections
+    
+    def connection(self):
+        """Get this thread's connection, opening or leasing one if needed"""
+        raise NotImplementedError
+    
+    def release(self):
+        """Finish this thread's use of its connection; called after every request"""
+        raise NotImplementedError
+    
+    def migrate(self, target=None):
+        """Apply pending schema migrations and return (version before, version after)"""
+        raise NotImplementedError
+
+class SQLiteStorage(Storage):
+    """Polls in a SQLite file, with one long-lived connection per thread"""
+    
+    name = 'sqlite'
+    Error = sqlite3.Error
+    
+    def __init__(self, path):
+        self.path = path
+        self.location = path
+        self._local = threading.local()
+    
+    def connection(self):
+        db = getattr(self._local, 'db', None)
+        # A connection inherited across fork() must not be reused by the child
+        if db is None or self._local.pid != os.getpid():
+            db = self._local.db = connect_db(self.path)
+            self._local.pid = os.getpid()
+        return db
+    
+    def release(self):
+        # The connection stays open; only roll back what a failed request left
+        db = getattr(self._local, 'db', None)
+        if db is not None and self._local.pid == os.getpid() and db.in_transaction:
+            db.rollback()
+    
+    def migrate(self, target=None):
+        db = self.connection()
+        before = db.execute('PRAGMA user_version').fetchone()[0]
+        return before, migrate_db(db, target)
+
+class PostgresRow(tuple):
+    """Result row readable by position or column name, like sqlite3.Row"""
+    
+    def __new__(cls, values, columns):
+        row = super().__new__(cls, values)
+        row._columns = columns
+        return row
+    
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = self._columns[key]
+        return super().__getitem__(key)
+    
+    def keys(self):
+        return list(self._columns)
+
+def postgres_row_factory(cursor):
+    """psycopg row factory producing PostgresRow"""
+    columns = {column.name: i for i, column in enumerate(cursor.description or ())}
+    return lambda values: PostgresRow(values, columns)
+
+class PostgresConnection:
+    """psycopg connection behaving like the sqlite3 connections the queries expect"""
+    
+    def __init__(self, conn):
+        from psycopg.pq import TransactionStatus
+        # The connection is in autocommit mode; transactions are opened here,
+        # on the first statement inside "with db:" or by begin_read/begin_write
+        self.conn = conn
+        self._idle = TransactionStatus.IDLE
+        self._depth = 0
+        self._cursor_ids = itertools.count()
+    
+    @property
+    def in_transaction(self):
+        return self.conn.info.transaction_status != self._idle
+    
+    @staticmethod
+    def _convert(sql):
+        """Rewrite ? placeholders into psycopg's %s"""
+        return sql.replace('%', '%%').replace('?', '%s')
+    
+    def _begin(self, statement='BEGIN'):
+        if not self.in_transaction:
+            self.conn.execute(statement)
+    
+    def execute(self, sql, params=()):
+        if self._depth:
+            self._begin()
+        return self.conn.execute(self._convert(sql), params)
+    
+    def executemany(self, sql, seq_of_params):
+        if self._depth:
+            self._begin()
+        cursor = self.conn.cursor()
+        cursor.executemany(self._convert(sql), seq_of_params)
+        return cursor
+    
+    def executescript(self, script):
+        if self._depth:
+            self._begin()
+        self.conn.execute(script)
+    
+    def begin_read(self):
+        """Start a transaction that reads from one consistent snapshot"""
+        self._begin('BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY')
+    
+    def begin_write(self, poll_id):
+        """Start a transaction that changes poll_id, or join the current one, locking the poll"""
+        self._begin()
+        self.conn.execute('SELECT 1 FROM polls WHERE id = %s FOR UPDATE', (poll_id,))
+    
+    def lock_event_log(self):
+        """Make event IDs visible in commit order, so watchers never skip one"""
+        self.conn.execute("SELECT pg_advisory_xact_lock(hashtext('kdc_scheduler.poll_events'))")
+    
+    def stream(self, sql, params=()):
+        """Run a query whose rows are read from the database as they are iterated"""
+        # A server-side cursor fetches STREAM_FETCH_ROWS rows at a time instead
+        # of the whole result. It only lives as long as the transaction, so
+        # read it to the end inside "with db:".
+        self._begin()
+        with self.conn.cursor(name=f'stream_{next(self._cursor_ids)}') as cursor:
+            cursor.itersize = STREAM_FETCH_ROWS
+            cursor.execute(self._convert(sql), params)
+            yield from cursor
+    
+    def commit(self):
+        if self.in_transaction:
+            self.conn.execute('COMMIT')
+    
+    def rollback(self):
+        if self.in_transaction:
+            self.conn.execute('ROLLBACK')
+    
+    def __enter__(self):
+        self._depth += 1
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+class PostgresStorage(Storage):
+    """Polls in a PostgreSQL database, with connections leased from a pool"""
+    
+    name = 'postgres'
+    
+    def __init__(self, url, min_size, max_size, timeout):
+        import psycopg
+        from psycopg.conninfo import conninfo_to_dict
+        from psycopg_pool import ConnectionPool
+        
+        self.Error = psycopg.Error
+        params = conninfo_to_dict(url)
+        self.location = f"{params.get('dbname', '')} on {params.get('host', 'localhost')}"
+        self._make_pool = lambda: ConnectionPool(
+            url, min_size=min_size, max_size=max_size, timeout=timeout, open=True,
+            kwargs={'autocommit': True, 'row_factory': postgres_row_factory})
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+    
+    def _get_pool(self):
+        # Pools are per process; one inherited across fork() is not reused
+        with self._pool_lock:
+            if self._pool_pid != os.getpid():
+                self._pool = self._make_pool()
+                self._pool_pid = os.getpid()
+            return self._pool
+    
+    def connection(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = self._local.db = PostgresConnection(self._get_pool().getconn())
+            self._local.pid = os.getpid()
+        return db
+    
+    def release(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            return
+        self._local.db = None
+        try:
+            db.rollback()
+        finally:
+            # The pool checks the connection and discards it if it is broken
+            self._pool.putconn(db.conn)
+    
+    def migrate(self, target=None):
+        if target is None:
+            target = len(POSTGRES_MIGRATIONS)
+        db = self.connection()
+        before = None
+        try:
+            while True:
+                # Each migration commits together with the version bump; the
+                # advisory lock keeps nodes starting together from racing
+                with db:
+                    db.execute("SELECT pg_advisory_xact_lock(hashtext('kdc_scheduler.migrate'))")
+                    db.execute('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)')
+                    row = db.execute('SELECT version FROM schema_version').fetchone()
+                    version = row['version'] if row else 0
+                    if before is None:
+                        before = version
+                    if version >= target:
+                        return before, version
+                    db.executescript(POSTGRES_MIGRATIONS[version])
+                    if row:
+                        db.execute('UPDATE schema_version SET version = ?', (version + 1,))
+                    else:
+                        db.execute('INSERT INTO schema_version (version) VALUES (?)', (version + 1,))
+        finally:
+            self.release()
+
+def create_storage(name=STORAGE_BACKEND):
+    """Build the storage backend selected by STORAGE_BACKEND"""
+    if name == 'sqlite':
+        return SQLiteStorage(DATABASE)
+    if name == 'postgres':
+        return PostgresStorage(DATABASE_URL, DATABASE_POOL_MIN, DATABASE_POOL_MAX,
+                               DATABASE_POOL_TIMEOUT)
+    raise ValueError(f'Unknown STORAGE_BACKEND: {name}')
+
+storage = create_storage()
 
 def get_db():
     """Get database connection"""
-    db = getattr(g, '_database', None)
-    if db is None:
-        db = g._database = sqlite3.connect(DATABASE)
-        db.row_factory = sqlite3.Row
-    return db
+    return storage.connection()
 
 @app.teardown_appcontext
 def close_connection(exception):
-    """Close database connection"""
-    db = getattr(g, '_database', None)
-    if db is not None:
-        db.close()
+    """Roll back anything a failed request left uncommitted and return pooled connections"""
+    storage.release()
 
 def init_db():
     """Initialize database with required tables"""
-    with app.app_context():
-        db = get_db()
-        db.executescript('''
-            CREATE TABLE IF NOT EXISTS polls (
-                id TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            
-            CREATE TABLE IF NOT EXISTS time_slots (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                poll_id TEXT NOT NULL,
-                slot_datetime TEXT NOT NULL,
-                FOREIGN KEY (poll_id) REFERENCES polls (id)
-            );
-            
-            CREATE TABLE IF NOT EXISTS votes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                poll_id TEXT NOT NULL,
-                voter_name TEXT NOT NULL,
-                time_slot_id INTEGER NOT NULL,
-                availability TEXT NOT NULL CHECK (availability IN ('yes', 'maybe', 'no')),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (poll_id) REFERENCES polls (id),
-                FOREIGN KEY (time_slot_id) REFERENCES time_slots (id),
-                UNIQUE(poll_id, voter_name, time_slot_id)
-            );
-        ''')
-        db.commit()
+    storage.migrate()
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create the database or upgrade it to the latest schema version"""
+    before, after = storage.migrate()
+    print(f"📊 Database {storage.location} at schema version {after} (was {before})")
+
+@app.before_request
+def refresh_log_control():
+    """Pick up logging changes made through any worker, at most once a second"""
+    now = time.monotonic()
+    if now - _log_control['checked'] < 1.0:
+        return
+    _log_control['checked'] = now
+    
+    try:
+        mtime = os.stat(LOG_CONTROL_FILE).st_mtime
+    except OSError:
+        return
+    if mtime == _log_control['mtime']:
+        return
+    
+    try:
+        with open(LOG_CONTROL_FILE) as f:
+            control = json.load(f)
+    except (OSError, ValueError):
+        logger.warning('Ignoring unreadable log control file %s', LOG_CONTROL_FILE)
+        return
+    _log_control['mtime'] = mtime
+    apply_log_control(control)
+
+def apply_log_control(control):
+    """Apply a log level and traced poll list to this worker"""
+    logger.setLevel(control.get('level', LOG_LEVEL))
+    TRACED_POLLS.clear()
+    TRACED_POLLS.update(control.get('trace_polls', []))
+
+def admin_required(view):
+    """Only allow requests carrying the ADMIN_TOKEN in X-Admin-Token"""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        token = request.headers.get('X-Admin-Token', '')
+        if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+            return "Not found", 404
+        return view(*args, **kwargs)
+    return wrapped
+
+# Packed ballots. Polls with ballot_format 'packed' keep one ballots row per
+# voter instead of one votes row per answer: answers holds 2 bits per slot
+# (the ANSWER_CODES, 0 = no answer), four slots to a byte starting from the
+# low bits, with slots in time_slots.id order. Big polls take a hundred times
+# less space than in the row format, and tallies are counted straight off the
+# blobs. New polls with at least PACKED_BALLOTS_MIN_SLOTS slots are created
+# packed (0 = never); existing polls are converted with "flask pack-ballots".
+PACKED_BALLOTS_MIN_SLOTS = int(os.environ.get('PACKED_BALLOTS_MIN_SLOTS', 0))
+
+# For each slot offset within a byte, a bytes.translate() table from the byte
+# to that slot's answer code
+PACKED_CODE_TABLES = [bytes((value >> (2 * offset)) & 3 for value in range(256))
+                      for offset in range(4)]
+
+def get_ballot_format(db, poll_id):
+    """Get how a poll's votes are stored: 'rows' or 'packed'"""
+    row = db.execute('SELECT ballot_format FROM polls WHERE id = ?', (poll_id,)).fetchone()
+    return row['ballot_format'] if row else 'rows'
+
+def get_slot_positions(db, poll_id):
+    """Get a poll's slot IDs in packed ballot order"""
+    return [row['id'] for row in db.execute(
+        'SELECT id FROM time_slots WHERE poll_id = ? ORDER BY id', (poll_id,))]
+
+def pack_ballot(ballot, positions):
+    """Encode {slot_id: availability} as a packed ballot over the given slot positions"""
+    packed = bytearray((len(positions) + 3) // 4)
+    for index, slot_id in enumerate(positions):
+        availability = ballot.get(slot_id)
+        if availability is not None:
+            packed[index >> 2] |= ANSWER_CODES[availability] << (2 * (index & 3))
+    return bytes(packed)
+
+def unpack_ballot(packed, positions):
+    """Decode a packed ballot into {slot_id: availability}"""
+    data = memoryview(packed)
+    ballot = {}
+    for index, slot_id in enumerate(positions[:4 * len(data)]):
+        code = (data[index >> 2] >> (2 * (index & 3))) & 3
+        if code:
+            ballot[slot_id] = AVAILABILITY_CHOICES[code - 1]
+    return ballot
+
+def count_packed_answers(ballots, slot_count):
+    """Count the answer codes of each slot over packed ballots: [(yes, maybe, no), ...]"""
+    width = (slot_count + 3) // 4
+    # Lay the ballots end to end so each slot's bytes are one strided slice
+    # (ballots written before a slot was added are shorter; pad them)
+    joined = b''.join(packed if len(packed) == width else bytes(packed[:width]).ljust(width, b'\0')
+                      for packed in ballots)
+    planes = [joined.translate(table) for table in PACKED_CODE_TABLES]
+    counts = []
+    for index in range(slot_count):
+        codes = planes[index & 3][index >> 2::width]
+        counts.append((codes.count(1), codes.count(2), codes.count(3)))
+    return counts
+
+def count_packed_tallies(db, poll_id):
+    """count_slot_tallies() for a poll with packed ballots"""
+    slots = db.execute('''
+        SELECT id, slot_datetime, starts_at, duration
+        FROM time_slots ts
+        WHERE poll_id = ?
+        ORDER BY ts.starts_at IS NULL, ts.starts_at, ts.slot_datetime, ts.id
+    ''', (poll_id,)).fetchall()
+    positions = sorted(slot['id'] for slot in slots)
+    ballots = [row['answers'] for row in db.execute(
+        'SELECT answers FROM ballots WHERE poll_id = ?', (poll_id,))]
+    counts = dict(zip(positions, count_packed_answers(ballots, len(positions))))
+    
+    rows = []
+    for slot in slots:
+        yes, maybe, no = counts[slot['id']]
+        rows.append({'slot_id': slot['id'], 'slot_datetime': slot['slot_datetime'],
+                     'starts_at': slot['starts_at'], 'duration': slot['duration'],
+                     'yes': yes, 'maybe': maybe, 'no': no})
+    return format_tallies(rows)
+
+def read_packed_votes(db, poll_id, positions):
+    """Yield (participant_id, {slot_id: availability}) for a packed poll"""
+    for row in db.execute('SELECT participant_id, answers FROM ballots WHERE poll_id = ?', (poll_id,)):
+        yield row['participant_id'], unpack_ballot(row['answers'], positions)
+
+def save_packed_ballot(db, poll_id, participant_id, ballot):
+    """save_ballot() for a poll with packed ballots"""
+    positions = get_slot_positions(db, poll_id)
+    row = db.execute('SELECT answers FROM ballots WHERE poll_id = ? AND participant_id = ?',
+                     (poll_id, participant_id)).fetchone()
+    current = unpack_ballot(row['answers'], positions) if row else {}
+    
+    changed = [slot_id for slot_id in positions if current.get(slot_id) != ballot.get(slot_id)]
+    if not changed:
+        return []
+    update_slot_tallies(db, current, ballot, changed)
+    if ballot:
+        db.execute('''
+            INSERT INTO ballots (poll_id, participant_id, answers)
+            VALUES (?, ?, ?)
+            ON CONFLICT (poll_id, participant_id)
+            DO UPDATE SET answers = excluded.answers
+        ''', (poll_id, participant_id, pack_ballot(ballot, positions)))
+    else:
+        db.execute('DELETE FROM ballots WHERE poll_id = ? AND participant_id = ?', (poll_id, participant_id))
+    return changed
+
+def convert_ballots(db, poll_id, ballot_format):
+    """Move a poll's votes into ballot_format inside its write transaction; return the voter count"""
+    if get_ballot_format(db, poll_id) == ballot_format:
+        return 0
+    positions = get_slot_positions(db, poll_id)
+    if ballot_format == 'packed':
+        ballots = {}
+        for row in db.execute('SELECT participant_id, time_slot_id, availability FROM votes WHERE poll_id = ?',
+                              (poll_id,)):
+            ballots.setdefault(row['participant_id'], {})[row['time_slot_id']] = row['availability']
+        db.executemany('INSERT INTO ballots (poll_id, participant_id, answers) VALUES (?, ?, ?)',
+                       [(poll_id, participant_id, pack_ballot(ballot, positions))
+                        for participant_id, ballot in ballots.items()])
+        db.execute('DELETE FROM votes WHERE poll_id = ?', (poll_id,))
+    else:
+        ballots = dict(read_packed_votes(db, poll_id, positions))
+        db.executemany('INSERT INTO votes (poll_id, participant_id, time_slot_id, availability) '
+                       'VALUES (?, ?, ?, ?)',
+                       [(poll_id, participant_id, slot_id, availability)
+                        for participant_id, ballot in ballots.items()
+                        for slot_id, availability in ballot.items()])
+        db.execute('DELETE FROM ballots WHERE poll_id = ?', (poll_id,))
+    db.execute('UPDATE polls SET ballot_format = ? WHERE id = ?', (ballot_format, poll_id))
+    return len(ballots)
+
+@app.cli.command('pack-ballots')
+@click.argument('poll_ids', nargs=-1)
+@click.option('--min-cells', type=int, default=0,
+              help='Only convert polls with at least this many voters x slots')
+@click.option('--unpack', is_flag=True, help='Convert back to one votes row per answer')
+def pack_ballots_command(poll_ids, min_cells, unpack):
+    """Convert polls (all of them unless POLL_IDS are given) to packed ballots"""
+    source, target = ('packed', 'rows') if unpack else ('rows', 'packed')
+    db = get_db()
+    candidates = db.execute('''
+        SELECT p.id,
+               (SELECT COUNT(*) FROM time_slots ts WHERE ts.poll_id = p.id)
+               * ((SELECT COUNT(DISTINCT v.participant_id) FROM votes v WHERE v.poll_id = p.id)
+                  + (SELECT COUNT(*) FROM ballots b WHERE b.poll_id = p.id)) AS cells
+        FROM polls p
+        WHERE p.ballot_format = ?
+    ''', (source,)).fetchall()
+    selected = [row['id'] for row in candidates
+                if row['cells'] >= min_cells and (not poll_ids or row['id'] in poll_ids)]
+    
+    voters = 0
+    for poll_id in selected:
+        # One transaction per poll, so a large run never holds the lock for long
+        with db:
+            db.begin_write(poll_id)
+            voters += convert_ballots(db, poll_id, target)
+    layout = 'one row per vote' if unpack else 'packed ballots'
+    print(f"📦 Converted {len(selected)} polls ({voters} voters) to {layout}")
+
+def format_tallies(rows):
+    """Turn (slot_id, slot_datetime, starts_at, duration, yes, maybe, no) rows into tally dicts"""
+    tallies = []
+    for row in rows:
+        counts = {'yes': row['yes'], 'maybe': row['maybe'], 'no': row['no']}
+        tallies.append({
+            'slot_id': row['slot_id'],
+            'slot_datetime': row['slot_datetime'],
+            'starts_at': row['starts_at'],
+            'duration': row['duration'],
+            'counts': counts,
+            'total': counts['yes'] + counts['maybe'] + counts['no']
+        })
+    return tallies
+
+# Slot tallies. slot_tallies holds the yes/maybe/no counts of every slot and
+# save_ballot() applies each voter's changes to it in the vote's transaction,
+# so reading a poll's tallies costs O(slots) whatever the number of votes.
+# count_slot_tallies() recounts from the votes themselves; "flask
+# check-tallies" compares the two and rebuilds any poll that has drifted.
+def get_slot_tallies(db, poll_id):
+    """Get yes/maybe/no counts for every time slot of a poll in one query"""
+    return format_tallies(db.execute('''
+        SELECT ts.id AS slot_id,
+               ts.slot_datetime AS slot_datetime,
+               ts.starts_at AS starts_at,
+               ts.duration AS duration,
+               COALESCE(st.yes, 0) AS yes,
+               COALESCE(st.maybe, 0) AS maybe,
+               COALESCE(st.no, 0) AS no
+        FROM time_slots ts
+        LEFT JOIN slot_tallies st ON st.time_slot_id = ts.id
+        WHERE ts.poll_id = ?
+        ORDER BY ts.starts_at IS NULL, ts.starts_at, ts.slot_datetime, ts.id
+    ''', (poll_id,)))
+
+def count_tally_deltas(deltas, before, after, slot_ids):
+    """Add one voter's answers on slot_ids changing from before to after to {slot_id: {answer: delta}}"""
+    for slot_id in slot_ids:
+        delta = deltas.setdefault(slot_id, dict.fromkeys(AVAILABILITY_CHOICES, 0))
+        if slot_id in before:
+            delta[before[slot_id]] -= 1
+        if slot_id in after:
+            delta[after[slot_id]] += 1
+    return deltas
+
+def update_slot_tallies(db, before, after, slot_ids):
+    """Apply one voter's answers on slot_ids changing from before to after to slot_tallies"""
+    apply_tally_deltas(db, count_tally_deltas({}, before, after, slot_ids))
+
+def apply_tally_deltas(db, deltas):
+    """Add {slot_id: {answer: delta}} to slot_tallies"""
+    db.executemany('''
+        INSERT INTO slot_tallies (time_slot_id, yes, maybe, no)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (time_slot_id)
+        DO UPDATE SET yes = slot_tallies.yes + excluded.yes,
+                      maybe = slot_tallies.maybe + excluded.maybe,
+                      no = slot_tallies.no + excluded.no
+    ''', [(slot_id, delta['yes'], delta['maybe'], delta['no']) for slot_id, delta in deltas.items()])
+
+def count_slot_tallies(db, poll_id):
+    """Count yes/maybe/no answers for every time slot of a poll from its votes or ballots"""
+    if get_ballot_format(db, poll_id) == 'packed':
+        return count_packed_tallies(db, poll_id)
+    return format_tallies(db.execute('''
+        SELECT ts.id AS slot_id,
+               ts.slot_datetime AS slot_datetime,
+               ts.starts_at AS starts_at,
+               ts.duration AS duration,
+               COUNT(*) FILTER (WHERE v.availability = 'yes') AS yes,
+               COUNT(*) FILTER (WHERE v.availability = 'maybe') AS maybe,
+               COUNT(*) FILTER (WHERE v.availability = 'no') AS no
+        FROM time_slots ts
+        LEFT JOIN votes v ON v.poll_id = ts.poll_id AND v.time_slot_id = ts.id
+        WHERE ts.poll_id = ?
+        GROUP BY ts.id
+        ORDER BY ts.starts_at IS NULL, ts.starts_at, ts.slot_datetime, ts.id
+    ''', (poll_id,)))
+
+def find_tally_drift(db, poll_id):
+    """Get the IDs of a poll's slots whose stored tallies differ from a recount"""
+    stored = {tally['slot_id']: tally['counts'] for tally in get_slot_tallies(db, poll_id)}
+    return [tally['slot_id'] for tally in count_slot_tallies(db, poll_id)
+            if stored.get(tally['slot_id']) != tally['counts']]
+
+def rebuild_slot_tallies(db, poll_id):
+    """Replace a poll's stored tallies with a recount; call inside its write transaction"""
+    tallies = count_slot_tallies(db, poll_id)
+    db.execute('DELETE FROM slot_tallies WHERE time_slot_id IN (SELECT id FROM time_slots WHERE poll_id = ?)',
+               (poll_id,))
+    db.executemany('INSERT INTO slot_tallies (time_slot_id, yes, maybe, no) VALUES (?, ?, ?, ?)',
+                   [(tally['slot_id'], tally['counts']['yes'], tally['counts']['maybe'], tally['counts']['no'])
+                    for tally in tallies])
+
+@app.cli.command('check-tallies')
+@click.argument('poll_ids', nargs=-1)
+@click.option('--fix', is_flag=True, help='Rebuild the tallies of polls that have drifted')
+def check_tallies_command(poll_ids, fix):
+    """Compare stored slot tallies with a recount of the votes (all polls unless POLL_IDS are given)"""
+    db = get_db()
+    if not poll_ids:
+        poll_ids = [row['id'] for row in db.execute('SELECT id FROM polls ORDER BY id')]
+    
+    drifted = 0
+    for poll_id in poll_ids:
+        # Check and rebuild under the poll's write lock, so no vote lands in between
+        with db:
+            db.begin_write(poll_id)
+            slot_ids = find_tally_drift(db, poll_id)
+            if slot_ids and fix:
+                rebuild_slot_tallies(db, poll_id)
+                bump_poll_version(db, poll_id)
+        if slot_ids:
+            drifted += 1
+            print(f"⚠️  Poll {poll_id}: {len(slot_ids)} slots differ{' (rebuilt)' if fix else ''}")
+    print(f"📊 Checked {len(poll_ids)} polls, {drifted} with drifted tallies")
+
+def bump_poll_version(db, poll_id):
+    """Mark a poll's votes or time slots as changed; call inside the write transaction"""
+    db.execute('UPDATE polls SET version = version + 1 WHERE id = ?', (poll_id,))
+
+def get_poll_version(db, poll_id):
+    """Get the current version of a poll, or None if it does not exist"""
+    row = db.execute('SELECT version FROM polls WHERE id = ?', (poll_id,)).fetchone()
+    return row['version'] if row else None
+
+def not_modified(etag):
+    """Return a 304 response if the client already has this ETag, else None"""
+    if not request.if_none_match.contains(etag):
+        return None
+    response = Response(status=304)
+    return with_etag(response, etag)
+
+def with_etag(response, etag):
+    """Tag a response so clients revalidate it with If-None-Match"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/')
 def index():
     """Home page with create poll form"""
     return render_template('index.html')
 
-@app.route('/create', methods=['POST'])
-def create_poll():
-    """Create a new poll"""
-    title = request.form.get('title', '').strip()
-    description = request.form.get('description', '').strip()
-    time_slots = request.form.getlist('time_slots')
+# Largest number of polls accepted by one /api/polls/batch request
+MAX_BATCH_POLLS = int(os.environ.get('MAX_BATCH_POLLS', 1000))
+
+# Slot labels are free text kept for display. When a label reads as a date
+# and time (ISO 8601, or the "Monday, October 20, 2026 at 3:00 PM - 4:00 PM"
+# the create form builds) its start is also stored as UTC epoch seconds with
+# its duration, which orders the slots and lets /api/slots find them by time.
+# Times without an offset are in the poll's time zone: the browser's for the
+# form, "timezone" in the batch API, otherwise SLOT_TIMEZONE.
+SLOT_TIMEZONE = os.environ.get('SLOT_TIMEZONE', 'UTC')
+SLOT_LABEL_FORMAT = '%A, %B %d, %Y at %I:%M %p'
+SLOT_CLOCK_FORMATS = ('%I:%M %p', '%H:%M')
+
+def get_time_zone(name):
+    """Get the time zone with an IANA name, or None if there is no such zone"""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return None
+
+def read_datetime(text):
+    """Parse an ISO 8601 or create form date and time, or return None"""
+    text = text.strip()
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(text, SLOT_LABEL_FORMAT)
+    except ValueError:
+        return None
+
+def read_end_time(text, start):
+    """Parse the end of a slot label: a full date and time, or a time after start"""
+    end = read_datetime(text)
+    if end is None:
+        for clock_format in SLOT_CLOCK_FORMATS:
+            try:
+                clock = datetime.strptime(text.strip(), clock_format).time()
+            except ValueError:
+                continue
+            end = datetime.combine(start.date(), clock)
+            if end.replace(tzinfo=start.tzinfo) <= start:
+                end += timedelta(days=1)   # runs past midnight
+            break
+    if end is not None and end.tzinfo is None:
+        end = end.replace(tzinfo=start.tzinfo)
+    return end
+
+def parse_slot_time(label, zone):
+    """Read a slot label as (starts_at, duration) in seconds, or (None, None) if it has no time"""
+    start_text, _, end_text = label.partition(' - ')
+    start = read_datetime(start_text)
+    if start is None:
+        return None, None
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=zone)
+    
+    duration = None
+    end = read_end_time(end_text, start) if end_text else None
+    if end is not None and end > start:
+        # Epoch arithmetic, so a slot spanning a DST change gets its real length
+        duration = int(end.timestamp()) - int(start.timestamp())
+    return int(start.timestamp()), duration
+
+def clean_poll(title, description, time_slots, time_zone=None):
+    """Normalize submitted poll fields, or return None if the poll is invalid"""
+    title = (title or '').strip()
+    description = (description or '').strip()
     
     # Filter out empty time slots
-    valid_time_slots = [slot.strip() for slot in time_slots if slot.strip()]
+    valid_time_slots = [slot.strip() for slot in time_slots if slot and slot.strip()]
     
     if not title or not valid_time_slots:
+        return None
+    
+    zone = get_time_zone(time_zone) if time_zone else None
+    if zone is None:
+        time_zone, zone = SLOT_TIMEZONE, get_time_zone(SLOT_TIMEZONE)
+    return {'title': title, 'description': description, 'time_slots': valid_time_slots,
+            'time_zone': time_zone, 'slot_times': [parse_slot_time(slot, zone) for slot in valid_time_slots]}
+
+def insert_polls(db, polls):
+    """Insert cleaned polls and their time slots, returning the new poll IDs"""
+    poll_rows = []
+    slot_rows = []
+    for poll in polls:
+        # Generate unique poll ID
+        poll_id = str(uuid.uuid4())[:8]
+        packed = PACKED_BALLOTS_MIN_SLOTS and len(poll['time_slots']) >= PACKED_BALLOTS_MIN_SLOTS
+        poll_rows.append((poll_id, poll['title'], poll['description'], 'packed' if packed else 'rows'))
+        slot_times = poll.get('slot_times') or [(None, None)] * len(poll['time_slots'])
+        slot_rows.extend((poll_id, slot, starts_at, duration,
+                          poll.get('time_zone') if starts_at is not None else None)
+                         for slot, (starts_at, duration) in zip(poll['time_slots'], slot_times))
+    
+    db.executemany('INSERT INTO polls (id, title, description, ballot_format) VALUES (?, ?, ?, ?)',
+                   poll_rows)
+    db.executemany('INSERT INTO time_slots (poll_id, slot_datetime, starts_at, duration, time_zone) '
+                   'VALUES (?, ?, ?, ?, ?)', slot_rows)
+    return [row[0] for row in poll_rows]
+
+@app.cli.command('parse-slot-times')
+@click.option('--timezone', 'time_zone', default=SLOT_TIMEZONE, show_default=True,
+              help='Time zone of labels without a UTC offset')
+def parse_slot_times_command(time_zone):
+    """Fill in the start times of slots created before they were parsed"""
+    zone = get_time_zone(time_zone)
+    if zone is None:
+        raise click.BadParameter(f'Unknown time zone {time_zone}', param_hint='--timezone')
+    
+    db = get_db()
+    with db:
+        slots = db.execute('SELECT id, poll_id, slot_datetime FROM time_slots WHERE starts_at IS NULL').fetchall()
+        updates, poll_ids = [], set()
+        for slot in slots:
+            starts_at, duration = parse_slot_time(slot['slot_datetime'], zone)
+            if starts_at is not None:
+                updates.append((starts_at, duration, time_zone, slot['id']))
+                poll_ids.add(slot['poll_id'])
+        db.executemany('UPDATE time_slots SET starts_at = ?, duration = ?, time_zone = ? WHERE id = ?', updates)
+        # Slots are now ordered by time, so cached pages of these polls are stale
+        for poll_id in sorted(poll_ids):
+            bump_poll_version(db, poll_id)
+    print(f"🕒 Parsed {len(updates)} of {len(slots)} slot times in {len(poll_ids)} polls")
+
+@app.route('/create', methods=['POST'])
+def create_poll():
+    """Create a new poll"""
+    poll = clean_poll(request.form.get('title'),
+                      request.form.get('description'),
+                      request.form.getlist('time_slots'),
+                      request.form.get('timezone'))
+    if poll is None:
         return redirect(url_for('index'))
     
-    # Generate unique poll ID
-    poll_id = str(uuid.uuid4())[:8]
+    db = get_db()
+    with db:
+        poll_id, = insert_polls(db, [poll])
+    logger.info('Created poll %s with %d time slots', poll_id, len(poll['time_slots']))
+    
+    return redirect(url_for('poll_detail', poll_id=poll_id))
+
+@app.route('/api/polls/batch', methods=['POST'])
+def api_create_polls():
+    """API endpoint for creating many polls in one request"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('polls'), list):
+        return jsonify({'error': 'Expected a JSON object with a "polls" list'}), 400
+    if len(data['polls']) > MAX_BATCH_POLLS:
+        return jsonify({'error': f'At most {MAX_BATCH_POLLS} polls per request'}), 400
+    
+    # Validate everything before writing, so a batch is created whole or not at all
+    polls = []
+    errors = []
+    for index, item in enumerate(data['polls']):
+        poll = None
+        wrong_types = [field for field in ('title', 'description')
+                       if isinstance(item, dict) and item.get(field) is not None and not isinstance(item[field], str)]
+        if wrong_types:
+            errors.append({'index': index, 'error': f'{wrong_types[0].capitalize()} must be a string'})
+            continue
+        if isinstance(item, dict) and item.get('timezone') is not None and get_time_zone(item['timezone']) is None:
+            errors.append({'index': index, 'error': f"Unknown timezone: {item['timezone']}"})
+            continue
+        if isinstance(item, dict) and isinstance(item.get('time_slots'), list):
+            poll = clean_poll(item.get('title'), item.get('description'),
+                              [slot for slot in item['time_slots'] if isinstance(slot, str)],
+                              item.get('timezone'))
+        if poll is None:
+            errors.append({'index': index, 'error': 'A title and at least one time slot are required'})
+        polls.append(poll)
+    if errors:
+        return jsonify({'errors': errors}), 400
     
     db = get_db()
+    with db:
+        poll_ids = insert_polls(db, polls)
+    logger.info('Created %d polls with %d time slots in one batch',
+                len(poll_ids), sum(len(poll['time_slots']) for poll in polls))
     
-    # Insert poll
-    db.execute('INSERT INTO polls (id, title, description) VALUES (?, ?, ?)',
-               (poll_id, title, description))
+    return jsonify({'polls': [
+        {'id': poll_id, 'url': url_for('poll_detail', poll_id=poll_id, _external=True)}
+        for poll_id in poll_ids
+    ]}), 201
+
+# Assembled poll view models are cached through a pluggable backend chosen
+# with CACHE_BACKEND: 'local' keeps them per worker, 'sqlite' shares them
+# between the workers of one host through a file, and 'redis' shares them
+# between hosts. Entries are tagged with the poll's version, so a cached view
+# is only served while it is current, whichever worker wrote newer votes.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'local')
+CACHE_URL = os.environ.get('CACHE_URL', '')
+CACHE_TTL = int(os.environ.get('CACHE_TTL', 3600))   # seconds, shared backends only
+POLL_CACHE_MAX_ENTRIES = int(os.environ.get('POLL_CACHE_MAX_ENTRIES', 1000))
+POLL_CACHE_MAX_BYTES = int(os.environ.get('POLL_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+class CacheBackend:
+    """Interface shared by the cache backends"""
     
-    # Insert time slots (only valid ones)
-    for slot in valid_time_slots:
-        db.execute('INSERT INTO time_slots (poll_id, slot_datetime) VALUES (?, ?)',
-                  (poll_id, slot))
+    name = None
     
-    db.commit()
+    def __init__(self):
+        self._counter_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
     
-    return redirect(url_for('poll_detail', poll_id=poll_id))
+    def get(self, key, tag=None):
+        """Return the cached value for key if its tag matches, else None"""
+        raise NotImplementedError
+    
+    def set(self, key, value, tag=None, size=1):
+        """Store value under key"""
+        raise NotImplementedError
+    
+    def delete(self, key):
+        """Drop key from the cache after its data changed"""
+        raise NotImplementedError
+    
+    def _count(self, counter, amount=1):
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+    
+    def stats(self):
+        """Return this worker's hit, miss and eviction counters"""
+        with self._counter_lock:
+            return {
+                'backend': self.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+class LRUCache(CacheBackend):
+    """Thread-safe in-process LRU cache bounded by entry count and approximate size"""
+    
+    name = 'local'
+    
+    def __init__(self, max_entries, max_bytes):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (tag, value, size)
+        self._bytes = 0
+    
+    def get(self, key, tag=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != tag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key, value, tag=None, size=1):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (tag, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+    
+    def delete(self, key):
+        with self._lock:
+            if self._remove(key):
+                self.invalidations += 1
+    
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+        return entry is not None
+    
+    def stats(self):
+        with self._lock:
+            stats = super().stats()
+            stats.update({
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes
+            })
+            return stats
+
+class SQLiteCacheBackend(CacheBackend):
+    """Cache shared by all workers on one host through a SQLite file"""
+    
+    name = 'sqlite'
+    
+    def __init__(self, path, max_entries):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+    
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            # Autocommit: every statement is its own short transaction, and
+            # losing the newest entries on a crash is harmless for a cache
+            db = sqlite3.connect(self.path, timeout=SQLITE_PRAGMAS['busy_timeout'] / 1000,
+                                 isolation_level=None)
+            db.execute('PRAGMA journal_mode = WAL')
+            db.execute('PRAGMA synchronous = OFF')
+            db.execute('''
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    tag,
+                    value BLOB NOT NULL,
+                    stored REAL NOT NULL
+                )
+            ''')
+            db.execute('CREATE INDEX IF NOT EXISTS idx_cache_stored ON cache (stored)')
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+    
+    def get(self, key, tag=None):
+        try:
+            row = self._db().execute('SELECT value FROM cache WHERE key = ? AND tag IS ?',
+                                     (key, tag)).fetchone()
+        except sqlite3.Error:
+            logger.warning('Cache file %s unavailable', self.path, exc_info=True)
+            row = None
+        if row is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return pickle.loads(row[0])
+    
+    def set(self, key, value, tag=None, size=1):
+        try:
+            db = self._db()
+            db.execute('INSERT OR REPLACE INTO cache (key, tag, value, stored) VALUES (?, ?, ?, ?)',
+                       (key, tag, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time()))
+            # Keep only the newest max_entries entries
+            evicted = db.execute('''
+                DELETE FROM cache WHERE key IN (
+                    SELECT key FROM cache ORDER BY stored DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,)).rowcount
+        except sqlite3.Error:
+            logger.warning('Cache file %s unavailable', self.path, exc_info=True)
+            return
+        if evicted > 0:
+            self._count('evictions', evicted)
+    
+    def delete(self, key):
+        try:
+            deleted = self._db().execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount
+        except sqlite3.Error:
+            logger.warning('Cache file %s unavailable', self.path, exc_info=True)
+            return
+        if deleted > 0:
+            self._count('invalidations')
+    
+    def stats(self):
+        stats = super().stats()
+        try:
+            stats['entries'] = self._db().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        except sqlite3.Error:
+            stats['entries'] = None
+        stats.update({'path': self.path, 'max_entries': self.max_entries})
+        return stats
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by workers on any host through a Redis-protocol server"""
+    
+    name = 'redis'
+    
+    def __init__(self, url, ttl):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.database = int(parsed.path.lstrip('/') or 0)
+        self.ttl = ttl
+        self.prefix = 'kdc:'
+        self._local = threading.local()
+    
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            sock = socket.create_connection((self.host, self.port), timeout=2)
+            conn = self._local.conn = (sock, sock.makefile('rb'))
+            self._local.pid = os.getpid()
+            if self.password:
+                self._command('AUTH', self.password)
+            if self.database:
+                self._command('SELECT', self.database)
+        return conn
+    
+    def _command(self, *args):
+        """Send one command and return its decoded reply"""
+        sock, reader = self._connection()
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        sock.sendall(b''.join(parts))
+        return self._read_reply(reader)
+    
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('Connection closed by Redis server')
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload
+        if kind == b'-':
+            raise RedisError(payload.decode('utf-8', 'replace'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            return None if count < 0 else [self._read_reply(reader) for _ in range(count)]
+        raise RedisError(f'Unexpected reply type {kind!r}')
+    
+    def _call(self, *args):
+        """Run a command, dropping the connection if it failed"""
+        try:
+            return self._command(*args)
+        except (OSError, RedisError):
+            logger.warning('Redis cache at %s:%s unavailable', self.host, self.port, exc_info=True)
+            conn = getattr(self._local, 'conn', None)
+            if conn is not None:
+                conn[0].close()
+            self._local.conn = None
+            return None
+    
+    def get(self, key, tag=None):
+        data = self._call('GET', self.prefix + key)
+        entry = pickle.loads(data) if data is not None else None
+        if entry is None or entry[0] != tag:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return entry[1]
+    
+    def set(self, key, value, tag=None, size=1):
+        data = pickle.dumps((tag, value), pickle.HIGHEST_PROTOCOL)
+        self._call('SET', self.prefix + key, data, 'EX', self.ttl)
+    
+    def delete(self, key):
+        if self._call('DEL', self.prefix + key):
+            self._count('invalidations')
+    
+    def stats(self):
+        stats = super().stats()
+        stats.update({'server': f'{self.host}:{self.port}/{self.database}', 'ttl': self.ttl})
+        return stats
+
+def create_cache_backend(name=CACHE_BACKEND, url=CACHE_URL):
+    """Build the cache backend selected by CACHE_BACKEND and CACHE_URL"""
+    if name == 'local':
+        return LRUCache(POLL_CACHE_MAX_ENTRIES, POLL_CACHE_MAX_BYTES)
+    if name == 'sqlite':
+        return SQLiteCacheBackend(url or 'cache.db', POLL_CACHE_MAX_ENTRIES)
+    if name == 'redis':
+        return RedisCacheBackend(url or 'redis://localhost:6379/0', CACHE_TTL)
+    raise ValueError(f'Unknown CACHE_BACKEND: {name}')
+
+poll_view_cache = create_cache_backend()
+
+def load_poll_view(db, poll_id):
+    """Read a poll, its slots, vote matrix and tallies from the database"""
+    # Read everything from one snapshot so the version matches the data
+    with db:
+        db.begin_read()
+        
+        # Get poll info
+        poll = db.execute('SELECT * FROM polls WHERE id = ?', (poll_id,)).fetchone()
+        if not poll:
+            return None
+        
+        # Get time slots together with their vote counts in one query
+        tallies = get_slot_tallies(db, poll_id)
+        
+        time_slots = []
+        for tally in tallies:
+            time_slots.append({
+                'id': tally['slot_id'],
+                'poll_id': poll_id, 
+                'slot_datetime': tally['slot_datetime']
+            })
+        
+        # Build the voter x slot availability matrix in a single pass over the
+        # votes, keyed by participant ID, so the template can look up each
+        # cell directly
+        vote_matrix = {}
+        if poll['ballot_format'] == 'packed':
+            positions = sorted(slot['id'] for slot in time_slots)
+            for participant_id, ballot in read_packed_votes(db, poll_id, positions):
+                for slot_id, availability in ballot.items():
+                    vote_matrix[(participant_id, slot_id)] = availability
+        else:
+            for vote in db.execute(
+                    'SELECT participant_id, time_slot_id, availability FROM votes WHERE poll_id = ?',
+                    (poll_id,)):
+                vote_matrix[(vote['participant_id'], vote['time_slot_id'])] = vote['availability']
+        
+        # Voters in name order; participants who withdrew every answer are left out
+        voted = {participant_id for participant_id, _ in vote_matrix}
+        voters = [{'id': row['id'], 'voter_name': row['name']} for row in db.execute(
+            'SELECT id, name FROM participants WHERE poll_id = ? ORDER BY name', (poll_id,))
+            if row['id'] in voted]
+        
+        last_event_id = get_last_event_id(db, poll_id)
+    
+    return {
+        'poll': dict(poll),
+        'version': poll['version'],
+        'time_slots': time_slots,
+        'voters': voters,
+        'vote_matrix': vote_matrix,
+        'tallies': tallies,
+        'last_event_id': last_event_id
+    }
+
+def estimate_view_size(view):
+    """Approximate the memory held by a poll view model, in bytes"""
+    return (2048
+            + 300 * len(view['time_slots'])
+            + 150 * len(view['voters'])
+            + 120 * len(view['vote_matrix']))
+
+def get_poll_view(db, poll_id, version):
+    """Get a poll's view model, from the cache when it is at the given version"""
+    view = poll_view_cache.get(poll_id, tag=version)
+    if view is None:
+        view = load_poll_view(db, poll_id)
+        if view is not None:
+            poll_view_cache.set(poll_id, view, tag=view['version'], size=estimate_view_size(view))
+    return view
+
+# The results grid and summary table are the same for every viewer until
+# someone votes, so they are rendered once per poll version and cached as HTML
+fragment_cache = create_cache_backend()
+_fragment_lock = threading.Lock()
+_fragment_renders = {'count': 0, 'seconds': 0.0}
+
+def get_results_fragments(poll_id, view):
+    """Get the rendered results grid and summary table for a poll view"""
+    key = f'fragments:{poll_id}'
+    tag = f"{view['version']}-{TEMPLATES_DIGEST}"
+    fragments = fragment_cache.get(key, tag=tag)
+    if fragments is None:
+        start = time.perf_counter()
+        if len(view['voters']) > RESULTS_PAGE_SIZE:
+            # Too many rows to send at once: the page fetches them as the grid scrolls
+            results_grid = render_template('_results_pages.html', poll_id=poll_id,
+                                           time_slots=view['time_slots'],
+                                           voter_count=len(view['voters']),
+                                           page_size=RESULTS_PAGE_SIZE)
+        else:
+            results_grid = render_template('_results_grid.html',
+                                           time_slots=view['time_slots'],
+                                           voters=view['voters'],
+                                           vote_matrix=view['vote_matrix'])
+        fragments = {
+            'results_grid': results_grid,
+            'summary_table': render_template('_summary_table.html', tallies=view['tallies'])
+        }
+        elapsed = time.perf_counter() - start
+        with _fragment_lock:
+            _fragment_renders['count'] += 1
+            _fragment_renders['seconds'] += elapsed
+        fragment_cache.set(key, fragments, tag=tag, size=sum(len(html) for html in fragments.values()))
+    return fragments
+
+def fragment_stats():
+    """Return fragment cache counters with the render time hits have saved"""
+    stats = fragment_cache.stats()
+    with _fragment_lock:
+        renders, seconds = _fragment_renders['count'], _fragment_renders['seconds']
+    average_ms = seconds * 1000 / renders if renders else 0.0
+    stats.update({
+        'renders': renders,
+        'render_ms_total': round(seconds * 1000, 3),
+        'render_ms_average': round(average_ms, 3),
+        'render_ms_saved': round(stats['hits'] * average_ms, 3)
+    })
+    return stats
+
+def trace_vote_matrix(poll_id, time_slots, voters, vote_matrix):
+    """Log every cell of a poll's vote matrix for troubleshooting"""
+    trace_logger.debug('Poll %s slots: %s', poll_id, time_slots)
+    for voter in voters:
+        cells = {slot['id']: vote_matrix.get((voter['id'], slot['id'])) for slot in time_slots}
+        trace_logger.debug('Poll %s voter %r: %s', poll_id, voter['voter_name'], cells)
 
 @app.route('/poll/<poll_id>')
 def poll_detail(poll_id):
     """Display poll voting page"""
     db = get_db()
     
-    # Get poll info
-    poll = db.execute('SELECT * FROM polls WHERE id = ?', (poll_id,)).fetchone()
-    if not poll:
+    version = get_poll_version(db, poll_id)
+    if version is None:
         return "Poll not found", 404
     
-    # Get time slots - convert to dictionaries for consistency
-    time_slots_raw = db.execute('SELECT * FROM time_slots WHERE poll_id = ? ORDER BY slot_datetime',
-                               (poll_id,)).fetchall()
+    # The page only changes when the poll's version or the templates change
+    etag = f"{poll_id}-{version}-{TEMPLATES_DIGEST}"
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    time_slots = []
-    for slot in time_slots_raw:
-        time_slots.append({
-            'id': slot['id'],
-            'poll_id': slot['poll_id'], 
-            'slot_datetime': slot['slot_datetime']
-        })
+    view = get_poll_view(db, poll_id, version)
+    if view is None:
+        return "Poll not found", 404
     
-    # Get all votes - convert to dictionaries for easier template access
-    votes_raw = db.execute('''
-        SELECT voter_name, time_slot_id, availability
-        FROM votes
-        WHERE poll_id = ?
-        ORDER BY voter_name, time_slot_id
-    ''', (poll_id,)).fetchall()
+    logger.debug('Rendering poll %s: %d slots, %d votes, %d voters', poll_id,
+                 len(view['time_slots']), len(view['vote_matrix']), len(view['voters']))
+    if poll_id in TRACED_POLLS:
+        trace_vote_matrix(poll_id, view['time_slots'], view['voters'], view['vote_matrix'])
     
-    # Convert votes to list of dictionaries
-    votes = []
-    for vote in votes_raw:
-        votes.append({
-            'voter_name': vote['voter_name'],
-            'time_slot_id': vote['time_slot_id'], 
-            'availability': vote['availability']
-        })
+    # Only the voting form is rendered per request; the results tables are
+    # spliced in from the fragment cache
+    fragments = get_results_fragments(poll_id, view)
+    page = render_template('poll_detail.html', 
+                         poll=view['poll'], 
+                         time_slots=view['time_slots'], 
+                         voters=view['voters'],
+                         results_grid=Markup(fragments['results_grid']),
+                         summary_table=Markup(fragments['summary_table']),
+                         last_event_id=view['last_event_id'])
+    # Tag with the version actually rendered, which may be newer than the check
+    return with_etag(make_response(page), f"{poll_id}-{view['version']}-{TEMPLATES_DIGEST}")
+
+def parse_ballot(form, slot_ids):
+    """Collect the valid slot_<id> fields of a vote form as {slot_id: availability}"""
+    ballot = {}
+    for key, value in form.items():
+        if not key.startswith('slot_') or value not in AVAILABILITY_CHOICES:
+            continue
+        try:
+            slot_id = int(key[len('slot_'):])
+        except ValueError:
+            continue
+        if slot_id in slot_ids:
+            ballot[slot_id] = value
+    return ballot
+
+def get_participant_id(db, poll_id, voter_name, create=False):
+    """Get the ID of a poll's participant, adding them if create is set; call inside the write transaction"""
+    row = db.execute('SELECT id FROM participants WHERE poll_id = ? AND name = ?',
+                     (poll_id, voter_name)).fetchone()
+    if row:
+        return row['id']
+    if not create:
+        return None
+    return db.execute('INSERT INTO participants (poll_id, name) VALUES (?, ?) RETURNING id',
+                      (poll_id, voter_name)).fetchone()['id']
+
+def save_ballot(db, poll_id, voter_name, ballot):
+    """Replace a voter's votes with ballot and return the IDs of the slots that changed"""
+    participant_id = get_participant_id(db, poll_id, voter_name, create=bool(ballot))
+    if participant_id is None:
+        return []
+    if get_ballot_format(db, poll_id) == 'packed':
+        return save_packed_ballot(db, poll_id, participant_id, ballot)
+    current = {row['time_slot_id']: row['availability'] for row in db.execute(
+        'SELECT time_slot_id, availability FROM votes WHERE poll_id = ? AND participant_id = ?',
+        (poll_id, participant_id))}
+    
+    removed = [slot_id for slot_id in current if slot_id not in ballot]
+    updated = {slot_id: availability for slot_id, availability in ballot.items()
+               if current.get(slot_id) != availability}
     
-    # Get unique voters
-    voters_raw = db.execute('SELECT DISTINCT voter_name FROM votes WHERE poll_id = ? ORDER BY voter_name',
-                           (poll_id,)).fetchall()
+    if removed:
+        db.executemany('DELETE FROM votes WHERE participant_id = ? AND time_slot_id = ?',
+                       [(participant_id, slot_id) for slot_id in removed])
+    if updated:
+        db.executemany('''
+            INSERT INTO votes (poll_id, participant_id, time_slot_id, availability)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (participant_id, time_slot_id)
+            DO UPDATE SET availability = excluded.availability
+        ''', [(poll_id, participant_id, slot_id, availability)
+              for slot_id, availability in updated.items()])
+    changed = removed + list(updated)
+    if changed:
+        update_slot_tallies(db, current, ballot, changed)
+    return changed
+
+# Most rows written by one multi-row INSERT of merge_ballots()
+MERGE_INSERT_ROWS = 500
+
+def merge_ballots(db, poll_id, ballots):
+    """Merge {voter_name: {slot_id: availability}} into a poll's votes in bulk; return the number of answers changed"""
+    # Like save_ballot() with each voter's other answers kept, but with one
+    # read, a few multi-row writes and one tally update for all of them
+    participant_ids = {voter_name: get_participant_id(db, poll_id, voter_name, create=True)
+                       for voter_name, ballot in ballots.items() if ballot}
+    packed = get_ballot_format(db, poll_id) == 'packed'
+    positions = get_slot_positions(db, poll_id) if packed else None
     
-    # Convert voters to list of dictionaries
-    voters = []
-    for voter in voters_raw:
-        voters.append({'voter_name': voter['voter_name']})
+    current = {participant_id: {} for participant_id in participant_ids.values()}
+    ids = list(current)
+    for start in range(0, len(ids), MERGE_INSERT_ROWS):
+        chunk = ids[start:start + MERGE_INSERT_ROWS]
+        placeholders = ', '.join('?' * len(chunk))
+        if packed:
+            for row in db.execute(f'''
+                    SELECT participant_id, answers FROM ballots
+                    WHERE poll_id = ? AND participant_id IN ({placeholders})
+                    ''', (poll_id, *chunk)):
+                current[row['participant_id']] = unpack_ballot(row['answers'], positions)
+        else:
+            for row in db.execute(f'''
+                    SELECT participant_id, time_slot_id, availability FROM votes
+                    WHERE poll_id = ? AND participant_id IN ({placeholders})
+                    ''', (poll_id, *chunk)):
+                current[row['participant_id']][row['time_slot_id']] = row['availability']
     
-    # Debug: Print vote data to console for troubleshooting
-    print(f"Debug - Poll ID: {poll_id}")
-    print(f"Debug - Time slots: {time_slots}")
-    print(f"Debug - Votes: {votes}")
-    print(f"Debug - Voters: {voters}")
+    deltas, rows, changed = {}, [], 0
+    for voter_name, participant_id in participant_ids.items():
+        before = current[participant_id]
+        updated = {slot_id: availability for slot_id, availability in ballots[voter_name].items()
+                   if before.get(slot_id) != availability}
+        if not updated:
+            continue
+        count_tally_deltas(deltas, before, updated, updated)
+        changed += len(updated)
+        if packed:
+            rows.append((poll_id, participant_id, pack_ballot({**before, **updated}, positions)))
+        else:
+            rows.extend((poll_id, participant_id, slot_id, availability)
+                        for slot_id, availability in updated.items())
     
-    # Test the matching logic in Python
-    print("\n=== TESTING VOTE MATCHING ===")
-    for voter in voters:
-        print(f"Voter: {voter['voter_name']}")
-        for slot in time_slots:
-            print(f"  Checking slot {slot['id']}")
-            matching_votes = [v for v in votes if v['voter_name'] == voter['voter_name'] and v['time_slot_id'] == slot['id']]
-            if matching_votes:
-                print(f"    FOUND MATCH: {matching_votes[0]}")
-            else:
-                print(f"    NO MATCH")
-    print("=== END TEST ===\n")
+    if packed:
+        db.executemany('''
+            INSERT INTO ballots (poll_id, participant_id, answers)
+            VALUES (?, ?, ?)
+            ON CONFLICT (poll_id, participant_id)
+            DO UPDATE SET answers = excluded.answers
+        ''', rows)
+    else:
+        for start in range(0, len(rows), MERGE_INSERT_ROWS):
+            chunk = rows[start:start + MERGE_INSERT_ROWS]
+            db.execute(f'''
+                INSERT INTO votes (poll_id, participant_id, time_slot_id, availability)
+                VALUES {', '.join(['(?, ?, ?, ?)'] * len(chunk))}
+                ON CONFLICT (participant_id, time_slot_id)
+                DO UPDATE SET availability = excluded.availability
+            ''', [value for row in chunk for value in row])
+    if deltas:
+        apply_tally_deltas(db, deltas)
+    return changed
+
+def record_ballot(db, poll_id, voter_name, ballot):
+    """Save a ballot inside a write transaction; return (changed slot IDs, event ID or None)"""
+    changed = save_ballot(db, poll_id, voter_name, ballot)
+    event_id = None
+    if changed:
+        bump_poll_version(db, poll_id)
+        event_id = record_poll_event(db, poll_id, voter_name, ballot, changed)
+    return changed, event_id
+
+def publish_ballot(poll_id, event_id):
+    """Drop cached views of a poll and wake its live streams after a committed change"""
+    poll_view_cache.delete(poll_id)
+    fragment_cache.delete(f'fragments:{poll_id}')
+    poll_event_broker.notify(poll_id, event_id)
+
+# Write-behind vote ingestion. With VOTE_GROUP_COMMIT=1, validated ballots are
+# queued to one writer thread per worker, which commits everything queued
+# within VOTE_BATCH_WAIT_MS in a single transaction, so a burst of votes costs
+# one commit per batch instead of one per ballot. That only pays where commits
+# wait for the disk: PostgreSQL, or SQLite with SQLITE_SYNCHRONOUS=FULL. In
+# the default WAL mode with synchronous=NORMAL a commit does not fsync, and
+# batching mostly adds latency. Each request still waits until its own batch
+# has committed before answering.
+VOTE_GROUP_COMMIT = os.environ.get('VOTE_GROUP_COMMIT', '0') == '1'
+VOTE_BATCH_MAX = int(os.environ.get('VOTE_BATCH_MAX', 256))                 # ballots
+VOTE_BATCH_WAIT_MS = float(os.environ.get('VOTE_BATCH_WAIT_MS', 2))         # milliseconds
+
+class VoteWriter:
+    """Commits queued ballots in groups from a single writer thread"""
+    
+    def __init__(self, max_batch, max_wait):
+        self._queue = queue.Queue()
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._lock = threading.Lock()
+        self._writer_pid = None
+    
+    def submit(self, poll_id, voter_name, ballot):
+        """Queue a ballot and wait until it is committed; return the changed slot IDs"""
+        self._ensure_writer()
+        pending = {'poll_id': poll_id, 'voter_name': voter_name, 'ballot': ballot,
+                   'changed': None, 'event_id': None, 'error': None, 'done': threading.Event()}
+        self._queue.put(pending)
+        pending['done'].wait()
+        if pending['error'] is not None:
+            raise pending['error']
+        return pending['changed']
+    
+    def _ensure_writer(self):
+        """Start the writer thread once per process"""
+        with self._lock:
+            if self._writer_pid == os.getpid():
+                return
+            self._writer_pid = os.getpid()
+        threading.Thread(target=self._run, name='vote-writer', daemon=True).start()
     
-    return render_template('poll_detail.html', 
-                         poll=poll, 
-                         time_slots=time_slots, 
-                         votes=votes,
-                         voters=voters)
+    def _run(self):
+        """Collect ballots into batches and commit them, forever"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._commit(batch)
+    
+    def _commit(self, batch):
+        """Write a batch in one transaction, then publish it and wake the submitters"""
+        db = get_db()
+        try:
+            with db:
+                # Lock the polls in a fixed order so concurrent writers can't deadlock
+                for poll_id in sorted({pending['poll_id'] for pending in batch}):
+                    db.begin_write(poll_id)
+                for pending in batch:
+                    # A ballot that fails is rolled back alone, without the rest of its batch
+                    db.execute('SAVEPOINT ballot')
+                    try:
+                        pending['changed'], pending['event_id'] = record_ballot(
+                            db, pending['poll_id'], pending['voter_name'], pending['ballot'])
+                    except storage.Error as error:
+                        db.execute('ROLLBACK TO ballot')
+                        pending['error'] = error
+                    db.execute('RELEASE ballot')
+            logger.debug('Committed a batch of %d ballots', len(batch))
+            for pending in batch:
+                if pending['event_id'] is not None:
+                    publish_ballot(pending['poll_id'], pending['event_id'])
+        except Exception as error:
+            logger.exception('Vote writer failed to commit a batch of %d ballots', len(batch))
+            for pending in batch:
+                pending['error'] = pending['error'] or error
+        finally:
+            storage.release()
+            for pending in batch:
+                pending['done'].set()
+
+vote_writer = VoteWriter(VOTE_BATCH_MAX, VOTE_BATCH_WAIT_MS / 1000)
 
 @app.route('/vote', methods=['POST'])
 def submit_vote():
@@ -184,51 +1990,1214 @@ def submit_vote():
     
     db = get_db()
     
-    # Delete existing votes from this voter for this poll
-    db.execute('DELETE FROM votes WHERE poll_id = ? AND voter_name = ?',
-               (poll_id, voter_name))
+    # Only accept votes for time slots that belong to this poll
+    slot_ids = {row['id'] for row in db.execute('SELECT id FROM time_slots WHERE poll_id = ?',
+                                                (poll_id,))}
+    if not slot_ids:
+        return "Poll not found", 404
     
-    # Insert new votes
-    for key, value in request.form.items():
-        if key.startswith('slot_') and value in ['yes', 'maybe', 'no']:
-            time_slot_id = key.replace('slot_', '')
-            db.execute('INSERT INTO votes (poll_id, voter_name, time_slot_id, availability) VALUES (?, ?, ?, ?)',
-                      (poll_id, voter_name, int(time_slot_id), value))
+    ballot = parse_ballot(request.form, slot_ids)
     
-    db.commit()
+    if VOTE_GROUP_COMMIT:
+        # Don't hold a pooled connection while waiting for the writer thread
+        storage.release()
+        changed = vote_writer.submit(poll_id, voter_name, ballot)
+    else:
+        # Write the whole ballot in one transaction. The write lock is taken up
+        # front so the diff is computed against what is actually stored.
+        with db:
+            db.begin_write(poll_id)
+            changed, event_id = record_ballot(db, poll_id, voter_name, ballot)
+        if event_id is not None:
+            publish_ballot(poll_id, event_id)
+    logger.info('Recorded votes from %r on poll %s (%d cells changed)', voter_name, poll_id, len(changed))
     
     return redirect(url_for('poll_detail', poll_id=poll_id))
 
+# Live result updates. Each committed ballot change is appended to
+# poll_events in the same transaction, and open poll pages receive it over
+# Server-Sent Events. Streams in the worker that wrote the ballot are woken
+# immediately; one background thread per worker picks up events written by
+# other workers, so idle viewers cost no queries of their own.
+EVENT_POLL_INTERVAL = float(os.environ.get('EVENT_POLL_INTERVAL', 1.0))   # seconds
+EVENT_HISTORY = int(os.environ.get('EVENT_HISTORY', 10000))               # events kept
+SSE_KEEPALIVE = float(os.environ.get('SSE_KEEPALIVE', 15))                # seconds
+SSE_MAX_DURATION = float(os.environ.get('SSE_MAX_DURATION', 300))         # seconds
+SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', 16))              # per worker, 0 = unlimited
+
+def record_poll_event(db, poll_id, voter_name, ballot, changed_slot_ids):
+    """Append a live update for a changed ballot and return its event ID"""
+    changed = set(changed_slot_ids)
+    payload = {
+        'voter_name': voter_name,
+        'votes': ballot,
+        'tallies': [
+            {'slot_id': tally['slot_id'], 'counts': tally['counts'], 'total': tally['total']}
+            for tally in get_slot_tallies(db, poll_id) if tally['slot_id'] in changed
+        ]
+    }
+    db.lock_event_log()
+    return db.execute('INSERT INTO poll_events (poll_id, payload) VALUES (?, ?) RETURNING id',
+                      (poll_id, json.dumps(payload))).fetchone()[0]
+
+def record_poll_reload(db, poll_id):
+    """Append a live update telling open pages to reload, after a bulk change; return its ID"""
+    db.lock_event_log()
+    return db.execute('INSERT INTO poll_events (poll_id, payload) VALUES (?, ?) RETURNING id',
+                      (poll_id, json.dumps({'reload': True}))).fetchone()[0]
+
+def get_last_event_id(db, poll_id):
+    """Get the ID of the newest live update for a poll, or 0"""
+    return db.execute('SELECT COALESCE(MAX(id), 0) FROM poll_events WHERE poll_id = ?',
+                      (poll_id,)).fetchone()[0]
+
+def read_poll_events(db, poll_id, after):
+    """Get a poll's live updates newer than the given event ID, oldest first"""
+    return db.execute(
+        'SELECT id, payload FROM poll_events WHERE poll_id = ? AND id > ? ORDER BY id',
+        (poll_id, after)).fetchall()
+
+def collect_event_heads(db, seen):
+    """Get (poll_id, newest event ID) for polls updated after seen, pruning old events"""
+    rows = db.execute('''
+        SELECT poll_id, MAX(id) AS last_id FROM poll_events
+        WHERE id > ? GROUP BY poll_id
+    ''', (seen,)).fetchall()
+    heads = [(row['poll_id'], row['last_id']) for row in rows]
+    if heads:
+        newest = max(last_id for _, last_id in heads)
+        with db:
+            db.execute('DELETE FROM poll_events WHERE id <= ?', (newest - EVENT_HISTORY,))
+    return heads
+
+class PollEventBroker:
+    """Wakes the event streams of a poll when a newer update is available"""
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._latest = {}
+        self._listeners = []
+        self._watcher_pid = None
+    
+    def add_listener(self, callback):
+        """Also call callback(poll_id, event_id) whenever a poll has a newer update"""
+        with self._condition:
+            self._listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        """Stop calling a callback given to add_listener"""
+        with self._condition:
+            self._listeners.remove(callback)
+    
+    def notify(self, poll_id, event_id):
+        """Record that poll_id has updates up to event_id and wake its streams"""
+        with self._condition:
+            if event_id <= self._latest.get(poll_id, 0):
+                return
+            self._latest[poll_id] = event_id
+            self._condition.notify_all()
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback(poll_id, event_id)
+    
+    def latest(self, poll_id):
+        """Get the newest event ID this worker knows of for poll_id"""
+        with self._condition:
+            return self._latest.get(poll_id, 0)
+    
+    def wait(self, poll_id, after, timeout):
+        """Wait until poll_id has an update newer than after; False on timeout"""
+        self.start_watcher()
+        with self._condition:
+            return self._condition.wait_for(lambda: self._latest.get(poll_id, 0) > after, timeout)
+    
+    def start_watcher(self):
+        """Start the cross-worker watcher thread once per process"""
+        with self._condition:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+        threading.Thread(target=self._watch, name='poll-event-watcher', daemon=True).start()
+    
+    def _watch(self):
+        """Poll for events written by other workers and prune old ones"""
+        seen = None
+        failing = False
+        while True:
+            try:
+                seen = self._check(seen)
+            except storage.Error:
+                # Log an outage once rather than on every check until it ends
+                if not failing:
+                    logger.exception('Live update watcher failed to read poll_events')
+                failing = True
+            else:
+                if failing:
+                    logger.info('Live update watcher is reading poll_events again')
+                failing = False
+            time.sleep(EVENT_POLL_INTERVAL)
+    
+    def _check(self, seen):
+        """Notify streams of events newer than seen (None: from now on) and return the newest event ID"""
+        # Lease a connection per check, so one the server dropped is replaced
+        # by the pool instead of failing every check after it
+        try:
+            db = get_db()
+            if seen is None:
+                return db.execute('SELECT COALESCE(MAX(id), 0) FROM poll_events').fetchone()[0]
+            for poll_id, last_id in collect_event_heads(db, seen):
+                self.notify(poll_id, last_id)
+                seen = max(seen, last_id)
+            return seen
+        finally:
+            storage.release()
+
+poll_event_broker = PollEventBroker()
+
+# Under a threaded WSGI server every open stream holds a worker thread, so
+# only some of them may stream; the rest are left to serve pages and votes.
+# Turned away browsers fall back to reloading the page periodically.
+sse_stream_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS) if SSE_MAX_STREAMS > 0 else None
+
+class PollEventStream:
+    """Where one live update stream is up to; shared by the Flask view and asgi.py"""
+    
+    RETRY = 'retry: 3000\n\n'
+    KEEPALIVE = ': keepalive\n\n'
+    
+    def __init__(self, poll_id, after, latest):
+        self.poll_id = poll_id
+        self.after = after          # ID of the last update sent
+        self._latest = latest       # latest(poll_id) of the broker that wakes this stream
+        # Streams are recycled periodically; the browser reconnects on its own
+        self.deadline = time.monotonic() + SSE_MAX_DURATION
+    
+    @staticmethod
+    def resume_after(value):
+        """Parse a Last-Event-ID header or after parameter, or return None"""
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    
+    def expired(self):
+        return time.monotonic() >= self.deadline
+    
+    def read(self, db):
+        """Get the updates after the last one sent, as event stream text"""
+        # Every update the broker knew of before this read is in it, unless it
+        # was pruned from the log; those are skipped rather than waited for
+        known = self._latest(self.poll_id)
+        chunks = []
+        for row in read_poll_events(db, self.poll_id, self.after):
+            self.after = row['id']
+            chunks.append(f"id: {row['id']}\nevent: update\ndata: {row['payload']}\n\n")
+        self.after = max(self.after, known)
+        return ''.join(chunks)
+
+@app.route('/poll/<poll_id>/events')
+def poll_events(poll_id):
+    """Stream live result updates for a poll as Server-Sent Events"""
+    # EventSource sends Last-Event-ID when reconnecting; the page passes the
+    # newest event it was rendered with on the first connection
+    after = PollEventStream.resume_after(request.headers.get('Last-Event-ID') or request.args.get('after'))
+    if after is None:
+        after = get_last_event_id(get_db(), poll_id)
+    
+    if sse_stream_slots is not None and not sse_stream_slots.acquire(blocking=False):
+        logger.warning('Refused a live update stream for poll %s: %d streams already open',
+                       poll_id, SSE_MAX_STREAMS)
+        return Response('Too many live update streams\n', 503, mimetype='text/plain',
+                        headers={'Retry-After': str(int(SSE_MAX_DURATION))})
+    
+    def stream(events):
+        yield events.RETRY
+        
+        # Catch up on anything missed since the page was rendered, then only
+        # touch the database when this poll is known to have a newer update
+        woken = True
+        while not events.expired():
+            if woken:
+                text = events.read(get_db())
+                # Streams outlive the request, so hand back a pooled connection
+                storage.release()
+                if text:
+                    yield text
+            
+            woken = poll_event_broker.wait(poll_id, events.after, SSE_KEEPALIVE)
+            if not woken:
+                yield events.KEEPALIVE
+    
+    response = Response(stream(PollEventStream(poll_id, after, poll_event_broker.latest)),
+                        mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    if sse_stream_slots is not None:
+        response.call_on_close(sse_stream_slots.release)
+    return response
+
+def format_epoch(epoch):
+    """Render epoch seconds as an ISO 8601 UTC timestamp, passing None through"""
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat() if epoch is not None else None
+
+def format_slot_result(tally):
+    """Build the API entry for one slot's tally"""
+    starts_at, duration = tally['starts_at'], tally['duration']
+    return {
+        'slot_id': tally['slot_id'],
+        'slot_datetime': tally['slot_datetime'],
+        'starts_at': format_epoch(starts_at),
+        'ends_at': format_epoch(starts_at + duration) if starts_at is not None and duration else None,
+        'counts': tally['counts']
+    }
+
+def format_results(view):
+    """Build the results API payload from a poll view model"""
+    return [format_slot_result(tally) for tally in (view['tallies'] if view else [])]
+
+def read_poll_results(db, poll_id, if_none_match):
+    """Get (ETag, results API payload) for a poll; the payload is None if if_none_match has the ETag"""
+    # Answer unchanged polls from the version counter alone
+    version = get_poll_version(db, poll_id)
+    etag = f'{poll_id}-{version}'
+    if if_none_match.contains(etag):
+        return etag, None
+    view = get_poll_view(db, poll_id, version) if version is not None else None
+    return etag, format_results(view)
+
 @app.route('/api/poll/<poll_id>/results')
 def api_poll_results(poll_id):
     """API endpoint for poll results"""
+    etag, results = read_poll_results(get_db(), poll_id, request.if_none_match)
+    if results is None:
+        return with_etag(Response(status=304), etag)
+    return with_etag(jsonify(results), etag)
+
+# Results pages. Polls with more voters than fit on one page load their
+# results grid from these endpoints as it is scrolled, so the poll page stays
+# the same size however many people vote. Each page starts after the last
+# voter name (or slot) of the previous one rather than at an offset, so it
+# is one index range scan wherever it falls.
+RESULTS_PAGE_SIZE = int(os.environ.get('RESULTS_PAGE_SIZE', 100))   # voters
+MAX_RESULTS_PAGE_SIZE = 1000
+
+def read_voter_page(db, poll_id, after, limit):
+    """Get up to limit voters named after `after` with their answers, in name order"""
+    packed = get_ballot_format(db, poll_id) == 'packed'
+    # Participants who withdrew every answer are left out, as on the poll page
+    rows = db.execute(f'''
+        SELECT p.id, p.name
+        FROM participants p
+        WHERE p.poll_id = ? AND p.name > ?
+          AND EXISTS (SELECT 1 FROM {'ballots' if packed else 'votes'} a
+                      WHERE a.poll_id = p.poll_id AND a.participant_id = p.id)
+        ORDER BY p.name
+        LIMIT ?
+    ''', (poll_id, after, limit + 1)).fetchall()
+    
+    voters = {row['id']: {'voter_name': row['name'], 'votes': {}} for row in rows[:limit]}
+    if voters:
+        placeholders = ', '.join('?' * len(voters))
+        if packed:
+            positions = get_slot_positions(db, poll_id)
+            for row in db.execute(f'''
+                    SELECT participant_id, answers FROM ballots
+                    WHERE poll_id = ? AND participant_id IN ({placeholders})
+                    ''', (poll_id, *voters)):
+                voters[row['participant_id']]['votes'] = unpack_ballot(row['answers'], positions)
+        else:
+            for row in db.execute(f'''
+                    SELECT participant_id, time_slot_id, availability FROM votes
+                    WHERE poll_id = ? AND participant_id IN ({placeholders})
+                    ''', (poll_id, *voters)):
+                voters[row['participant_id']]['votes'][row['time_slot_id']] = row['availability']
+    
+    voters = list(voters.values())
+    return voters, voters[-1]['voter_name'] if len(rows) > limit else None
+
+def read_slot_page(db, poll_id, after, limit):
+    """Get up to limit slot tallies following slot ID `after` (None = first), in time order"""
+    key = 'ts.starts_at IS NULL, COALESCE(ts.starts_at, 0), ts.slot_datetime, ts.id'
+    condition, params = '', ()
+    if after is not None:
+        condition = f'''AND ({key}) > (SELECT {key} FROM time_slots ts
+                                      WHERE ts.id = ? AND ts.poll_id = ?)'''
+        params = (after, poll_id)
+    tallies = format_tallies(db.execute(f'''
+        SELECT ts.id AS slot_id,
+               ts.slot_datetime AS slot_datetime,
+               ts.starts_at AS starts_at,
+               ts.duration AS duration,
+               COALESCE(st.yes, 0) AS yes,
+               COALESCE(st.maybe, 0) AS maybe,
+               COALESCE(st.no, 0) AS no
+        FROM time_slots ts
+        LEFT JOIN slot_tallies st ON st.time_slot_id = ts.id
+        WHERE ts.poll_id = ? {condition}
+        ORDER BY ts.starts_at IS NULL, ts.starts_at, ts.slot_datetime, ts.id
+        LIMIT ?
+    ''', (poll_id, *params, limit + 1)))
+    slots = [format_slot_result(tally) for tally in tallies[:limit]]
+    return slots, slots[-1]['slot_id'] if len(tallies) > limit else None
+
+def results_page(poll_id, name, read_page, after):
+    """Serve one page of a poll's voters or slots as {name: [...], 'next': cursor}"""
+    limit = min(max(request.args.get('limit', RESULTS_PAGE_SIZE, type=int), 1), MAX_RESULTS_PAGE_SIZE)
+    db = get_db()
+    
+    version = get_poll_version(db, poll_id)
+    if version is None:
+        return jsonify({'error': 'Poll not found'}), 404
+    cached = not_modified(f'{poll_id}-{version}')
+    if cached:
+        return cached
+    
+    # Read the page and the version it belongs to from one snapshot
+    with db:
+        db.begin_read()
+        version = get_poll_version(db, poll_id)
+        items, cursor = read_page(db, poll_id, after, limit)
+    return with_etag(jsonify({name: items, 'next': cursor}), f'{poll_id}-{version}')
+
+@app.route('/api/poll/<poll_id>/voters')
+def api_poll_voters(poll_id):
+    """API endpoint listing a poll's voters and their answers a page at a time"""
+    return results_page(poll_id, 'voters', read_voter_page, request.args.get('after', ''))
+
+@app.route('/api/poll/<poll_id>/slots')
+def api_poll_slots(poll_id):
+    """API endpoint listing a poll's time slots and their tallies a page at a time"""
+    after = request.args.get('after')
+    if after is not None:
+        # Slot IDs are positive database integers; anything else is no cursor of ours
+        try:
+            after = int(after)
+            valid = 0 < after < 2 ** 63
+        except ValueError:
+            valid = False
+        if not valid:
+            return jsonify({'error': 'after must be the slot ID of a previous page'}), 400
+    return results_page(poll_id, 'slots', read_slot_page, after)
+
+# Exports. Every answer becomes one row of EXPORT_COLUMNS, read from a
+# streaming cursor and written out in chunks as it arrives, so memory stays
+# flat and the first bytes go out before the poll has been read. Each poll is
+# read from its own snapshot; the admin export walks every poll in ID order.
+EXPORT_COLUMNS = ('poll_id', 'voter_name', 'slot_id', 'slot_datetime', 'starts_at', 'availability')
+EXPORT_CHUNK_SIZE = 64 * 1024   # characters per chunk of response body
+EXPORT_POLL_BATCH = 500         # poll IDs read at a time by the admin export
+
+def read_poll_export(db, poll_id):
+    """Yield a poll's answers as EXPORT_COLUMNS tuples, voter by voter"""
+    slots = {row['id']: (row['slot_datetime'], format_epoch(row['starts_at'])) for row in db.execute(
+        'SELECT id, slot_datetime, starts_at FROM time_slots WHERE poll_id = ?', (poll_id,))}
+    
+    def export_row(voter_name, slot_id, availability):
+        return (poll_id, voter_name, slot_id, *slots[slot_id], availability)
+    
+    if get_ballot_format(db, poll_id) == 'packed':
+        positions = sorted(slots)
+        for row in db.stream('''
+                SELECT p.name, b.answers
+                FROM ballots b
+                JOIN participants p ON p.id = b.participant_id
+                WHERE b.poll_id = ?
+                ORDER BY b.participant_id
+                ''', (poll_id,)):
+            for slot_id, availability in unpack_ballot(row['answers'], positions).items():
+                yield export_row(row['name'], slot_id, availability)
+    else:
+        # Index order, so the rows come straight off idx_votes_poll_voter without a sort
+        for row in db.stream('''
+                SELECT p.name, v.time_slot_id, v.availability
+                FROM votes v
+                JOIN participants p ON p.id = v.participant_id
+                WHERE v.poll_id = ?
+                ORDER BY v.participant_id, v.time_slot_id
+                ''', (poll_id,)):
+            yield export_row(row['name'], row['time_slot_id'], row['availability'])
+
+def iter_poll_ids():
+    """Yield the ID of every poll, a batch at a time"""
+    after = ''
+    while True:
+        batch = [row['id'] for row in get_db().execute(
+            'SELECT id FROM polls WHERE id > ? ORDER BY id LIMIT ?', (after, EXPORT_POLL_BATCH))]
+        if not batch:
+            return
+        yield from batch
+        after = batch[-1]
+
+def read_export(poll_ids):
+    """Yield the export rows of some polls, each read from one snapshot"""
+    # Runs while the response is sent, after the request's connection was released
+    try:
+        for poll_id in poll_ids:
+            db = get_db()
+            with db:
+                db.begin_read()
+                yield from read_poll_export(db, poll_id)
+    finally:
+        storage.release()
+
+def write_chunks(lines):
+    """Join lines into chunks of about EXPORT_CHUNK_SIZE characters"""
+    # The first line goes out on its own so the response starts straight away
+    lines = iter(lines)
+    yield next(lines, '')
+    chunk, size = [], 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield ''.join(chunk)
+
+def write_csv(rows):
+    """Render export rows as CSV, header first"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in itertools.chain([EXPORT_COLUMNS], rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue()
+
+def write_ndjson(rows):
+    """Render export rows as newline-delimited JSON objects"""
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_COLUMNS, row))) + '\n'
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', write_csv),
+    'ndjson': ('application/x-ndjson', write_ndjson)
+}
+
+def export_response(poll_ids, export_format, filename):
+    """Stream an export of some polls in the given format"""
+    mimetype, write = EXPORT_FORMATS[export_format]
+    return Response(write_chunks(write(read_export(poll_ids))), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}.{export_format}"',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/poll/<poll_id>/export.<export_format>')
+def api_poll_export(poll_id, export_format):
+    """API endpoint streaming every answer of a poll as CSV or NDJSON"""
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Export formats: {', '.join(EXPORT_FORMATS)}"}), 404
+    if get_poll_version(get_db(), poll_id) is None:
+        return jsonify({'error': 'Poll not found'}), 404
+    return export_response([poll_id], export_format, f'poll-{poll_id}')
+
+# Bulk imports. Availability comes from a CSV of voter, slot and
+# availability rows (an export can be imported again) or from one voter's
+# iCalendar file, whose busy times make the slots they overlap "no" ("maybe"
+# when tentative) and the other slots it covers "yes". Files are parsed as
+# they are read, and answers are merged into the stored ballots
+# IMPORT_BATCH_ROWS at a time, one transaction each. Rows that can't be used
+# are reported by line and skipped; the rest of the file still goes in.
+IMPORT_BATCH_ROWS = int(os.environ.get('IMPORT_BATCH_ROWS', 5000))
+MAX_IMPORT_ERRORS = 100   # errors listed per import; the rest are only counted
+IMPORT_FORMATS = ('csv', 'ics')
+CSV_VOTER_COLUMNS = ('voter_name', 'voter', 'name')
+CSV_SLOT_COLUMNS = ('slot_id', 'starts_at', 'slot_datetime', 'slot')   # tried in this order
+CSV_AVAILABILITY_COLUMNS = ('availability', 'answer')
+ICS_DURATION = re.compile(r'([-+])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?')
+
+class ImportReport:
+    """What one import read, wrote and skipped"""
+    
+    def __init__(self, unit='rows'):
+        self.unit = unit   # what rows counts: 'rows' of a CSV, or the 'busy_times' of a calendar
+        self.rows = 0
+        self.imported = 0   # slot answers written
+        self.voters = set()
+        self.changed = 0
+        self.errors = []
+        self.error_count = 0
+    
+    def error(self, line, message):
+        """Record a row that was skipped"""
+        self.error_count += 1
+        if len(self.errors) < MAX_IMPORT_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+    
+    def write(self, db, poll_id, ballots):
+        """Merge {voter_name: {slot_id: availability}} into a poll in one transaction"""
+        event_id = None
+        with db:
+            db.begin_write(poll_id)
+            changed = merge_ballots(db, poll_id, ballots)
+            if changed:
+                bump_poll_version(db, poll_id)
+                # One update for the whole batch rather than one per voter
+                event_id = record_poll_reload(db, poll_id)
+        if event_id is not None:
+            publish_ballot(poll_id, event_id)
+        self.imported += sum(len(ballot) for ballot in ballots.values())
+        self.voters.update(ballots)
+        self.changed += changed
+    
+    def as_dict(self):
+        """Summary for the API response"""
+        return {self.unit: self.rows, 'imported': self.imported, 'voters': len(self.voters),
+                'changed': self.changed, 'error_count': self.error_count, 'errors': self.errors}
+
+def slot_finder(slots, zone):
+    """Make find(column, value) matching a CSV slot column against a poll's slots"""
+    by_id = {slot['id'] for slot in slots}
+    by_label, by_start = {}, {}
+    for slot in slots:
+        by_label.setdefault(slot['slot_datetime'], slot['id'])
+        if slot['starts_at'] is not None:
+            by_start.setdefault(slot['starts_at'], slot['id'])
+    
+    def find(column, value):
+        if column == 'slot_id':
+            return int(value) if value.isdigit() and int(value) in by_id else None
+        if column == 'starts_at':
+            return by_start.get(parse_time_param(value, zone))
+        # A label: the exact text, or the same start time written another way
+        return by_label.get(value) or by_start.get(parse_slot_time(value, zone)[0])
+    return find
+
+def import_csv(db, poll_id, lines, slots, zone, report):
+    """Import (voter, slot, availability) rows from a CSV file with a header"""
+    reader = csv.reader(lines)
+    header = [name.strip().lower() for name in next(reader, [])]
+    voter_column = next((header.index(name) for name in CSV_VOTER_COLUMNS if name in header), None)
+    answer_column = next((header.index(name) for name in CSV_AVAILABILITY_COLUMNS if name in header), None)
+    slot_columns = [(name, header.index(name)) for name in CSV_SLOT_COLUMNS if name in header]
+    if voter_column is None or answer_column is None or not slot_columns:
+        raise ValueError('The CSV header needs voter_name, availability and slot_id, starts_at or '
+                         'slot_datetime columns')
+    find_slot = slot_finder(slots, zone)
+    
+    batch, size = {}, 0
+    for row in reader:
+        if not any(field.strip() for field in row):
+            continue
+        report.rows += 1
+        cells = [field.strip() for field in row] + [''] * len(header)
+        voter_name, availability = cells[voter_column], cells[answer_column].lower()
+        slot_id = None
+        for name, index in slot_columns:
+            if cells[index]:
+                slot_id = find_slot(name, cells[index])
+                if slot_id is not None:
+                    break
+        
+        if not voter_name:
+            report.error(reader.line_num, 'No voter name')
+        elif availability not in AVAILABILITY_CHOICES:
+            report.error(reader.line_num, f"Availability must be yes, maybe or no, not '{availability}'")
+        elif slot_id is None:
+            report.error(reader.line_num, 'No time slot of this poll matches')
+        else:
+            batch.setdefault(voter_name, {})[slot_id] = availability
+            size += 1
+            if size >= IMPORT_BATCH_ROWS:
+                report.write(db, poll_id, batch)
+                batch, size = {}, 0
+    if batch:
+        report.write(db, poll_id, batch)
+
+def read_ics_properties(lines):
+    """Yield (line number, NAME, {PARAM: value}, value) for each unfolded iCalendar content line"""
+    pending = None
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and pending:
+            pending[1] += line[1:]
+            continue
+        if pending:
+            yield split_ics_property(*pending)
+        pending = [number, line]
+    if pending:
+        yield split_ics_property(*pending)
+
+def split_ics_property(number, line):
+    """Split 'NAME;PARAM=value:VALUE' at the first colon outside quotes"""
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ':' and not quoted:
+            break
+    else:
+        return number, line.upper(), {}, ''
+    name, *params = line[:index].split(';')
+    params = {key.upper(): value.strip('"') for key, _, value in (param.partition('=') for param in params)}
+    return number, name.upper(), params, line[index + 1:]
+
+def read_ics_time(value, params, zone):
+    """Parse an iCalendar DATE or DATE-TIME as (epoch seconds, whether it is a whole day)"""
+    if params.get('TZID'):
+        # Calendars from some clients use Windows zone names; those fall back to zone
+        zone = get_time_zone(params['TZID']) or zone
+    try:
+        if len(value) == 8:
+            return int(datetime.strptime(value, '%Y%m%d').replace(tzinfo=zone).timestamp()), True
+        if value.endswith('Z'):
+            moment = datetime.strptime(value, '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc)
+        else:
+            moment = datetime.strptime(value, '%Y%m%dT%H%M%S').replace(tzinfo=zone)
+    except ValueError:
+        raise ValueError(f'Unreadable date or time: {value}') from None
+    return int(moment.timestamp()), False
+
+def read_ics_duration(value):
+    """Parse an iCalendar DURATION such as PT1H30M into seconds"""
+    match = ICS_DURATION.fullmatch(value)
+    if not match or not any(match.groups()[1:]):
+        raise ValueError(f'Unreadable duration: {value}')
+    sign, weeks, days, hours, minutes, seconds = (group or 0 for group in match.groups())
+    total = ((int(weeks) * 7 + int(days)) * 24 + int(hours)) * 3600 + int(minutes) * 60 + int(seconds)
+    return -total if sign == '-' else total
+
+def read_ics_period(value, zone):
+    """Parse a FREEBUSY period, start/end or start/duration, as (start, end)"""
+    start_text, _, end_text = value.partition('/')
+    start, _ = read_ics_time(start_text, {}, zone)
+    if end_text.lstrip('+-').startswith('P'):
+        return start, start + read_ics_duration(end_text)
+    return start, read_ics_time(end_text, {}, zone)[0]
+
+def import_ics(db, poll_id, lines, slots, zone, report, voter_name=None):
+    """Import one voter's availability from the busy times of an iCalendar file"""
+    timed = sorted((slot['starts_at'], slot['starts_at'] + (slot['duration'] or 0), slot['id'])
+                   for slot in slots if slot['starts_at'] is not None)
+    starts = [start for start, _, _ in timed]
+    longest = max((end - start for start, end, _ in timed), default=0)
+    marks, windows, names = {}, [], []
+    
+    def mark(start, end, availability):
+        # Slots overlapping [start, end); a slot without a duration counts if it starts inside
+        report.rows += 1
+        for slot_start, slot_end, slot_id in timed[bisect.bisect_left(starts, start - longest):
+                                                   bisect.bisect_left(starts, end)]:
+            if max(slot_end, slot_start + 1) > start:
+                current = marks.get(slot_id, 'yes')
+                if AVAILABILITY_CHOICES.index(availability) > AVAILABILITY_CHOICES.index(current):
+                    marks[slot_id] = availability
+    
+    def finish(component, props):
+        if component == 'VFREEBUSY':
+            # The span a free/busy file covers; slots outside it are left unanswered
+            if 'DTSTART' in props and 'DTEND' in props:
+                windows.append((read_ics_time(props['DTSTART'][2], props['DTSTART'][1], zone)[0],
+                                read_ics_time(props['DTEND'][2], props['DTEND'][1], zone)[0]))
+            return
+        status = props.get('STATUS', (0, {}, ''))[2].upper()
+        if props.get('TRANSP', (0, {}, ''))[2].upper() == 'TRANSPARENT' or status == 'CANCELLED':
+            return
+        if 'RRULE' in props:
+            raise ValueError('Repeating events are not expanded; export free/busy times instead')
+        if 'DTSTART' not in props:
+            raise ValueError('Event without DTSTART')
+        start, whole_day = read_ics_time(props['DTSTART'][2], props['DTSTART'][1], zone)
+        if 'DTEND' in props:
+            end = read_ics_time(props['DTEND'][2], props['DTEND'][1], zone)[0]
+        elif 'DURATION' in props:
+            end = start + read_ics_duration(props['DURATION'][2])
+        else:
+            end = start + 86400 if whole_day else start
+        mark(start, end, 'maybe' if status == 'TENTATIVE' else 'no')
+    
+    component, props, begun, nested = None, {}, 0, 0
+    for line, name, params, value in read_ics_properties(lines):
+        try:
+            if component is None:
+                if name == 'BEGIN' and value.upper() in ('VEVENT', 'VFREEBUSY'):
+                    component, props, begun, nested = value.upper(), {}, line, 0
+            elif name == 'BEGIN':
+                # A component inside this one, such as an event's VALARM; its
+                # properties (a DURATION, say) are not the event's
+                nested += 1
+            elif nested:
+                if name == 'END':
+                    nested -= 1
+            elif name == 'END' and value.upper() == component:
+                component = None
+                finish(value.upper(), props)
+            elif name == 'FREEBUSY' and component == 'VFREEBUSY':
+                fbtype = params.get('FBTYPE', 'BUSY').upper()
+                if fbtype != 'FREE':
+                    for period in value.split(','):
+                        mark(*read_ics_period(period, zone), 'maybe' if fbtype == 'BUSY-TENTATIVE' else 'no')
+            elif name in ('ATTENDEE', 'ORGANIZER') and component == 'VFREEBUSY' and params.get('CN'):
+                names.append(params['CN'])
+            else:
+                props[name] = (line, params, value)
+        except ValueError as exc:
+            report.error(begun if name == 'END' else line, str(exc))
+    
+    voter_name = voter_name or (names[0] if names else None)
+    if not voter_name:
+        raise ValueError('The calendar names no one; say whose it is with voter')
+    ballot = {slot_id: marks.get(slot_id, 'yes') for start, _, slot_id in timed
+              if not windows or any(low <= start < high for low, high in windows)}
+    if len(timed) < len(slots):
+        report.error(None, f'Slots left unanswered for having no start time: {len(slots) - len(timed)}')
+    if ballot:
+        report.write(db, poll_id, {voter_name: ballot})
+
+def import_votes(db, poll_id, stream, import_format, voter_name=None, zone=None):
+    """Merge availability from a binary CSV or iCalendar stream into a poll and return an ImportReport"""
+    slots = db.execute('SELECT id, slot_datetime, starts_at, duration, time_zone FROM time_slots '
+                       'WHERE poll_id = ?', (poll_id,)).fetchall()
+    # Times without a zone are read in the zone the poll's labels were written in
+    zone = zone or get_time_zone(next((slot['time_zone'] for slot in slots if slot['time_zone']),
+                                      SLOT_TIMEZONE)) or timezone.utc
+    lines = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+    report = ImportReport('busy_times' if import_format == 'ics' else 'rows')
+    if import_format == 'ics':
+        import_ics(db, poll_id, lines, slots, zone, report, voter_name)
+    else:
+        import_csv(db, poll_id, lines, slots, zone, report)
+    return report
+
+def guess_import_format(filename, mimetype):
+    """Tell an iCalendar upload from a CSV one by its name or type"""
+    if (filename or '').lower().endswith(('.ics', '.ifb')) or mimetype == 'text/calendar':
+        return 'ics'
+    return 'csv'
+
+@app.route('/api/poll/<poll_id>/import', methods=['POST'])
+def api_poll_import(poll_id):
+    """API endpoint merging availability from an uploaded CSV or iCalendar file into a poll"""
+    # The file comes as a multipart "file" field or as the raw request body
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'error': 'Send the file as the "file" field or as the request body'}), 400
+        stream, import_format = upload.stream, guess_import_format(upload.filename, upload.mimetype)
+        options = request.values
+    else:
+        # Nothing may parse the body as a form before it is read: curl
+        # --data-binary sends it as application/x-www-form-urlencoded. So its
+        # options come from the query string only, and the file streams in.
+        stream, import_format = request.stream, guess_import_format('', request.mimetype)
+        options = request.args
+    import_format = options.get('format', import_format)
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({'error': f"Import formats: {', '.join(IMPORT_FORMATS)}"}), 400
+    zone = None
+    if options.get('timezone'):
+        zone = get_time_zone(options['timezone'])
+        if zone is None:
+            return jsonify({'error': f"Unknown timezone: {options['timezone']}"}), 400
+    
+    db = get_db()
+    if get_poll_version(db, poll_id) is None:
+        return jsonify({'error': 'Poll not found'}), 404
+    try:
+        report = import_votes(db, poll_id, stream, import_format, options.get('voter'), zone)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    logger.info('Imported %d answers from %d %s into poll %s (%d cells changed, %d errors)', report.imported,
+                report.rows, report.unit.replace('_', ' '), poll_id, report.changed, report.error_count)
+    return jsonify(report.as_dict())
+
+@app.cli.command('import-votes')
+@click.argument('poll_id')
+@click.argument('file', type=click.File('rb'))
+@click.option('--format', 'import_format', type=click.Choice(IMPORT_FORMATS),
+              help='File format  [default: from the file name]')
+@click.option('--voter', help='Voter an iCalendar file belongs to  [default: its CN]')
+@click.option('--timezone', 'time_zone', help="Time zone of times without one  [default: the poll's]")
+def import_votes_command(poll_id, file, import_format, voter, time_zone):
+    """Merge availability from a CSV or iCalendar FILE ("-" for stdin) into a poll"""
+    zone = None
+    if time_zone:
+        zone = get_time_zone(time_zone)
+        if zone is None:
+            raise click.BadParameter(f'Unknown time zone {time_zone}', param_hint='--timezone')
+    db = get_db()
+    if get_poll_version(db, poll_id) is None:
+        raise click.BadParameter(f'No poll {poll_id}', param_hint='POLL_ID')
+    try:
+        report = import_votes(db, poll_id, file, import_format or guess_import_format(file.name, None),
+                              voter, zone)
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+    for error in report.errors:
+        print(f"  line {error['line']}: {error['error']}" if error['line'] else f"  {error['error']}")
+    print(f"📥 Imported {report.imported} answers from {report.rows} {report.unit.replace('_', ' ')} "
+          f"({len(report.voters)} voters, {report.changed} answers changed, {report.error_count} errors)")
+
+# Most slots returned by one /api/slots request
+MAX_SLOT_RANGE_RESULTS = int(os.environ.get('MAX_SLOT_RANGE_RESULTS', 1000))
+
+def parse_time_param(value, zone):
+    """Parse a time query parameter given as epoch seconds or ISO 8601, or return None"""
+    if not value:
+        return None
+    try:
+        epoch = int(value)
+    except ValueError:
+        moment = read_datetime(value)
+        if moment is None:
+            return None
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=zone)
+        epoch = int(moment.timestamp())
+    # Only times a datetime can hold, which also fit a database integer
+    try:
+        datetime.fromtimestamp(epoch, timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        return None
+    return epoch
+
+@app.route('/api/slots')
+def api_slots_in_range():
+    """API endpoint listing the time slots of some polls that start in a time range"""
+    zone = get_time_zone(request.args.get('timezone', SLOT_TIMEZONE))
+    if zone is None:
+        return jsonify({'error': f"Unknown timezone: {request.args['timezone']}"}), 400
+    start = parse_time_param(request.args.get('start'), zone)
+    end = parse_time_param(request.args.get('end'), zone)
+    if start is None or end is None:
+        return jsonify({'error': 'start and end are required, as epoch seconds or ISO 8601'}), 400
+    
+    # Poll IDs are what grants access to a poll, so the caller names the polls to search
+    poll_ids = request.args.getlist('poll')
+    if not poll_ids:
+        return jsonify({'error': 'Name the polls to search with poll=<id>'}), 400
+    if len(poll_ids) > MAX_BATCH_POLLS:
+        return jsonify({'error': f'At most {MAX_BATCH_POLLS} polls per request'}), 400
+    limit = min(max(request.args.get('limit', MAX_SLOT_RANGE_RESULTS, type=int), 1), MAX_SLOT_RANGE_RESULTS)
+    
+    rows = get_db().execute(f'''
+        SELECT ts.poll_id, p.title, ts.id, ts.slot_datetime, ts.starts_at, ts.duration, ts.time_zone
+        FROM time_slots ts
+        JOIN polls p ON p.id = ts.poll_id
+        WHERE ts.starts_at >= ? AND ts.starts_at < ?
+          AND ts.poll_id IN ({', '.join('?' * len(poll_ids))})
+        ORDER BY ts.starts_at, ts.id
+        LIMIT ?
+    ''', (start, end, *poll_ids, limit + 1)).fetchall()
+    
+    return jsonify({
+        'start': format_epoch(start),
+        'end': format_epoch(end),
+        'truncated': len(rows) > limit,
+        'slots': [{
+            'poll_id': row['poll_id'],
+            'poll_title': row['title'],
+            'slot_id': row['id'],
+            'slot_datetime': row['slot_datetime'],
+            'starts_at': format_epoch(row['starts_at']),
+            'ends_at': format_epoch(row['starts_at'] + row['duration']) if row['duration'] else None,
+            'timezone': row['time_zone']
+        } for row in rows[:limit]]
+    })
+
+# Slot recommendations. Every answer is worth a weight (yes=1, maybe=0.5 and
+# no=0 unless the request overrides them) and a slot scores the weighted sum
+# over all voters, with optional participants counting optional_weight times.
+# Slots a required participant can't make (no or no answer) are left out.
+# Scoring runs on a voters x slots matrix of answer codes built once per poll
+# version from the cached view model.
+DEFAULT_SLOT_WEIGHTS = {'yes': 1.0, 'maybe': 0.5, 'no': 0.0}
+DEFAULT_OPTIONAL_WEIGHT = 0.5
+MAX_SLOT_WEIGHT = 1e6   # keeps every score finite, as JSON requires
+
+answer_matrices = LRUCache(POLL_CACHE_MAX_ENTRIES, POLL_CACHE_MAX_BYTES)
+
+def get_answer_matrix(poll_id, view):
+    """Get the voters x slots answer codes of a poll view, in view order"""
+    matrix = answer_matrices.get(poll_id, tag=view['version'])
+    if matrix is not None:
+        return matrix
+    
+    voter_rows = {voter['id']: i for i, voter in enumerate(view['voters'])}
+    slot_columns = {slot['id']: j for j, slot in enumerate(view['time_slots'])}
+    matrix = [bytearray(len(slot_columns)) for _ in voter_rows]
+    for (participant_id, slot_id), answer in view['vote_matrix'].items():
+        matrix[voter_rows[participant_id]][slot_columns[slot_id]] = ANSWER_CODES[answer]
+    if numpy is not None:
+        matrix = numpy.frombuffer(b''.join(matrix), dtype=numpy.int8).reshape(
+            len(voter_rows), len(slot_columns))
+    
+    answer_matrices.set(poll_id, matrix, tag=view['version'],
+                        size=1024 + len(voter_rows) * len(slot_columns))
+    return matrix
+
+def rank_slots(matrix, slot_count, weights, voter_weights, required_rows, k):
+    """Return (column, score) of the k best slots every required voter can make, best first"""
+    table = (0.0, weights['yes'], weights['maybe'], weights['no'])
+    
+    if numpy is not None:
+        scores = numpy.asarray(voter_weights) @ numpy.asarray(table)[matrix]
+        eligible = numpy.ones(slot_count, dtype=bool)
+        if required_rows:
+            codes = matrix[required_rows]
+            eligible = ((codes == ANSWER_CODES['yes']) | (codes == ANSWER_CODES['maybe'])).all(axis=0)
+        columns = numpy.flatnonzero(eligible)
+        best = columns[numpy.argsort(-scores[columns], kind='stable')[:k]]
+        return [(int(column), float(scores[column])) for column in best]
+    
+    scores = [0.0] * slot_count
+    for row, voter_weight in zip(matrix, voter_weights):
+        for column, code in enumerate(row):
+            if code:
+                scores[column] += voter_weight * table[code]
+    available = (ANSWER_CODES['yes'], ANSWER_CODES['maybe'])
+    columns = [column for column in range(slot_count)
+               if all(matrix[row][column] in available for row in required_rows)]
+    best = sorted(columns, key=lambda column: -scores[column])[:k]
+    return [(column, scores[column]) for column in best]
+
+@app.route('/api/poll/<poll_id>/best')
+def api_poll_best(poll_id):
+    """API endpoint ranking a poll's time slots by weighted availability"""
+    try:
+        weights = {answer: float(request.args.get(answer, default))
+                   for answer, default in DEFAULT_SLOT_WEIGHTS.items()}
+        optional_weight = float(request.args.get('optional_weight', DEFAULT_OPTIONAL_WEIGHT))
+        k = int(request.args.get('k', 5))
+    except ValueError:
+        return jsonify({'error': 'Weights must be numbers and k a whole number'}), 400
+    # Also false for NaN
+    if not all(abs(weight) <= MAX_SLOT_WEIGHT for weight in (*weights.values(), optional_weight)):
+        return jsonify({'error': f'Weights must be finite numbers between -{MAX_SLOT_WEIGHT:g} '
+                                 f'and {MAX_SLOT_WEIGHT:g}'}), 400
+    if k < 1:
+        return jsonify({'error': 'k must be at least 1'}), 400
+    required = request.args.getlist('required')
+    optional = request.args.getlist('optional')
+    
     db = get_db()
+    version = get_poll_version(db, poll_id)
+    if version is None:
+        return jsonify({'error': 'Poll not found'}), 404
     
-    # Get time slots
-    time_slots = db.execute('SELECT * FROM time_slots WHERE poll_id = ? ORDER BY slot_datetime',
-                           (poll_id,)).fetchall()
-    
-    # Get vote counts for each time slot
-    results = []
-    for slot in time_slots:
-        counts = db.execute('''
-            SELECT availability, COUNT(*) as count
-            FROM votes
-            WHERE poll_id = ? AND time_slot_id = ?
-            GROUP BY availability
-        ''', (poll_id, slot['id'])).fetchall()
-        
-        count_dict = {'yes': 0, 'maybe': 0, 'no': 0}
-        for count in counts:
-            count_dict[count['availability']] = count['count']
-        
-        results.append({
-            'slot_id': slot['id'],
-            'slot_datetime': slot['slot_datetime'],
-            'counts': count_dict
+    # The ranking only changes with the votes, for a given query string
+    etag = f'{poll_id}-{version}'
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    view = get_poll_view(db, poll_id, version)
+    voter_rows = {voter['voter_name']: i for i, voter in enumerate(view['voters'])}
+    unknown = [name for name in required + optional if name not in voter_rows]
+    if unknown:
+        return jsonify({'error': 'These participants have not voted', 'participants': unknown}), 400
+    
+    voter_weights = [1.0] * len(voter_rows)
+    for name in optional:
+        voter_weights[voter_rows[name]] = optional_weight
+    ranked = rank_slots(get_answer_matrix(poll_id, view), len(view['time_slots']), weights,
+                        voter_weights, [voter_rows[name] for name in required], k)
+    
+    slots = []
+    for rank, (column, score) in enumerate(ranked, start=1):
+        tally = view['tallies'][column]
+        slots.append({
+            'rank': rank,
+            'slot_id': tally['slot_id'],
+            'slot_datetime': tally['slot_datetime'],
+            'score': round(score, 6),
+            'counts': tally['counts']
+        })
+    
+    return with_etag(jsonify({
+        'poll_id': poll_id,
+        'weights': weights,
+        'required': required,
+        'optional': optional,
+        'slots': slots
+    }), f"{poll_id}-{view['version']}")
+
+# Session coverage. For a session run in several time slots, find the fewest
+# slots such that every voter can attend one of them. Each slot is a bitset of
+# the voters available then (bit i = voter i), so coverage checks are integer
+# ANDs and popcounts. A greedy cover is always computed; polls with at most
+# COVER_EXACT_MAX_SLOTS slots are then solved exactly by branch and bound,
+# which stops at the request's time budget with the best cover found so far.
+COVER_EXACT_MAX_SLOTS = int(os.environ.get('COVER_EXACT_MAX_SLOTS', 64))
+COVER_DEFAULT_BUDGET_MS = 200
+COVER_MAX_BUDGET_MS = 2000
+
+def slot_bitsets(matrix, slot_count, codes):
+    """Get one int per slot with bit i set when voter i gave one of the answer codes"""
+    if numpy is not None:
+        packed = numpy.packbits(numpy.isin(matrix, codes), axis=0, bitorder='little')
+        return [int.from_bytes(packed[:, column].tobytes(), 'little') for column in range(slot_count)]
+    
+    bitsets = [0] * slot_count
+    for row, answers in enumerate(matrix):
+        bit = 1 << row
+        for column, code in enumerate(answers):
+            if code in codes:
+                bitsets[column] |= bit
+    return bitsets
+
+def cover_greedily(bitsets, universe):
+    """Repeatedly take the slot covering the most uncovered voters"""
+    cover = []
+    uncovered = universe
+    while uncovered:
+        column = max(range(len(bitsets)), key=lambda column: (bitsets[column] & uncovered).bit_count())
+        cover.append(column)
+        uncovered &= ~bitsets[column]
+    return cover
+
+def iter_bits(bits):
+    """Yield the positions of the set bits of an int, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+def cover_exactly(bitsets, universe, best, deadline):
+    """Search for a smaller cover than best; return (cover, True if proven smallest)"""
+    # A slot whose voters are all available in another slot is never needed
+    columns = [column for column, bits in enumerate(bitsets) if bits and not any(
+        other != column and bits | bitsets[other] == bitsets[other]
+        and (bits != bitsets[other] or other < column)
+        for other in range(len(bitsets)))]
+    # For each voter, the slots (as a bitset of columns) they could attend
+    options = {}
+    for column in columns:
+        for voter in iter_bits(bitsets[column]):
+            options[voter] = options.get(voter, 0) | 1 << column
+    best = list(best)
+    chosen = []
+    
+    def search(uncovered, allowed):
+        nonlocal best
+        if not uncovered:
+            best = list(chosen)
+            return True
+        if time.monotonic() > deadline:
+            return False
+        
+        # Even the slots covering the most remaining voters need this many picks
+        largest = max((bitsets[column] & uncovered).bit_count() for column in iter_bits(allowed))
+        if not largest or len(chosen) + -(-uncovered.bit_count() // largest) >= len(best):
+            return True
+        
+        # Some chosen slot has to cover the voter with the fewest slots left
+        branch = min((options[voter] & allowed for voter in iter_bits(uncovered)), key=int.bit_count)
+        for column in sorted(iter_bits(branch), key=lambda column: -(bitsets[column] & uncovered).bit_count()):
+            chosen.append(column)
+            finished = search(uncovered & ~bitsets[column], allowed)
+            chosen.pop()
+            if not finished:
+                return False
+            # Every cover using this slot has been tried
+            allowed &= ~(1 << column)
+        return True
+    
+    finished = search(universe, sum(1 << column for column in columns))
+    return best, finished
+
+def solve_cover(bitsets, universe, deadline):
+    """Return (slot columns covering universe, whether the cover is proven smallest)"""
+    cover = cover_greedily(bitsets, universe)
+    if len(cover) <= 1:
+        return cover, True
+    if len(bitsets) > COVER_EXACT_MAX_SLOTS:
+        return cover, False
+    return cover_exactly(bitsets, universe, cover, deadline)
+
+@app.route('/api/poll/<poll_id>/cover')
+def api_poll_cover(poll_id):
+    """API endpoint choosing the fewest time slots that let every voter attend one"""
+    include_maybe = request.args.get('maybe', '0') == '1'
+    try:
+        budget_ms = float(request.args.get('budget_ms', COVER_DEFAULT_BUDGET_MS))
+        # NaN would slip through the clamp below and never reach the deadline
+        if not math.isfinite(budget_ms):
+            raise ValueError(budget_ms)
+    except ValueError:
+        return jsonify({'error': 'budget_ms must be a number'}), 400
+    budget_ms = min(max(budget_ms, 0), COVER_MAX_BUDGET_MS)
+    
+    db = get_db()
+    version = get_poll_version(db, poll_id)
+    if version is None:
+        return jsonify({'error': 'Poll not found'}), 404
+    etag = f'{poll_id}-{version}'
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    start = time.monotonic()
+    view = get_poll_view(db, poll_id, version)
+    codes = (ANSWER_CODES['yes'], ANSWER_CODES['maybe']) if include_maybe else (ANSWER_CODES['yes'],)
+    bitsets = slot_bitsets(get_answer_matrix(poll_id, view), len(view['time_slots']), codes)
+    
+    # Voters who can make no slot at all are reported instead of covered
+    universe = 0
+    for bits in bitsets:
+        universe |= bits
+    voter_names = [voter['voter_name'] for voter in view['voters']]
+    cover, optimal = solve_cover(bitsets, universe, start + budget_ms / 1000)
+    
+    sessions = []
+    for column in sorted(cover):
+        tally = view['tallies'][column]
+        sessions.append({
+            'slot_id': tally['slot_id'],
+            'slot_datetime': tally['slot_datetime'],
+            'participants': [name for row, name in enumerate(voter_names) if bitsets[column] >> row & 1]
         })
     
-    return jsonify(results)
+    return with_etag(jsonify({
+        'poll_id': poll_id,
+        'include_maybe': include_maybe,
+        'optimal': optimal,
+        'elapsed_ms': round((time.monotonic() - start) * 1000, 3),
+        'sessions': sessions,
+        'uncovered': [name for row, name in enumerate(voter_names) if not universe >> row & 1]
+    }), f"{poll_id}-{view['version']}")
+
+@app.route('/admin/cache')
+@admin_required
+def admin_cache():
+    """Show poll view and fragment cache statistics"""
+    return jsonify({'poll_views': poll_view_cache.stats(), 'fragments': fragment_stats()})
+
+@app.route('/admin/export.<export_format>')
+@admin_required
+def admin_export(export_format):
+    """Stream every answer of every poll as CSV or NDJSON"""
+    if export_format not in EXPORT_FORMATS:
+        return "Not found", 404
+    return export_response(iter_poll_ids(), export_format, 'polls')
+
+@app.route('/admin/logging', methods=['GET', 'POST'])
+@admin_required
+def admin_logging():
+    """Show or change the log level and the polls being traced"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        level = str(data.get('level', logging.getLevelName(logger.level))).upper()
+        if not isinstance(logging.getLevelName(level), int):
+            return jsonify({'error': f'Unknown log level: {level}'}), 400
+        
+        trace_polls = set(TRACED_POLLS)
+        trace_polls.update(data.get('trace', []))
+        trace_polls.difference_update(data.get('untrace', []))
+        control = {'level': level, 'trace_polls': sorted(trace_polls)}
+        
+        # Write atomically so other workers never read a partial file
+        tmp_path = f'{LOG_CONTROL_FILE}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(control, f)
+        os.replace(tmp_path, LOG_CONTROL_FILE)
+        apply_log_control(control)
+        logger.info('Log control updated: level=%s trace_polls=%s', level, control['trace_polls'])
+    
+    return jsonify({
+        'level': logging.getLevelName(logger.level),
+        'trace_polls': sorted(TRACED_POLLS)
+    })
 
 # HTML Templates embedded in Python (for single-file distribution)
 @app.route('/templates/<template_name>')
@@ -236,18 +3205,12 @@ def serve_template(template_name):
     """Serve templates (fallback for development)"""
     return "Template not found", 404
 
-# Create templates directory and files
-def create_templates():
-    """Create template files with KDC branding"""
-    if not os.path.exists('templates'):
-        os.makedirs('templates')
-    
-    # Always recreate templates to ensure latest branding
-    print("🎨 Creating KDC branded templates...")
-    
-    # Base template
-    with open('templates/base.html', 'w') as f:
-        f.write('''<!DOCTYPE html>
+# Templates are served from memory through a DictLoader, so importing the app
+# (once per gunicorn worker) never writes template files to disk
+TEMPLATES = {}
+
+# Base template
+TEMPLATES['base.html'] = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -292,6 +3255,9 @@ def create_templates():
         .vote-no:hover, .vote-no:focus { background-color: var(--kdc-dark-gray); border-color: var(--kdc-dark-gray); }
         
         .vote-table th { background-color: var(--kdc-light-gray); color: var(--kdc-dark-gray); }
+        .results-pages { max-height: 70vh; overflow-y: auto; }
+        .results-pages thead th { position: sticky; top: 0; background-color: white; z-index: 1; }
+        .results-pages .spacer td { padding: 0; border: 0; }
         .time-slot-input { margin-bottom: 15px; }
         
         /* Header with brand colors */
@@ -306,7 +3272,7 @@ def create_templates():
             border-color: var(--kdc-red);
         }
         
-        .btn-primary:hover, .btn-primary:focus {
+        .btn-primary:hover, .btn-primary:focus, .btn-primary:active {
             background-color: var(--kdc-dark-red);
             border-color: var(--kdc-dark-red);
         }
@@ -430,11 +3396,10 @@ def create_templates():
     <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
     {% block scripts %}{% endblock %}
 </body>
-</html>''')
+</html>'''
     
-    # Index template
-    with open('templates/index.html', 'w') as f:
-        f.write('''{% extends "base.html" %}
+# Index template
+TEMPLATES['index.html'] = '''{% extends "base.html" %}
 
 {% block title %}Create Meeting Poll{% endblock %}
 
@@ -448,6 +3413,7 @@ def create_templates():
             </div>
             <div class="card-body p-4">
                 <form method="POST" action="{{ url_for('create_poll') }}" id="pollForm">
+                    <input type="hidden" name="timezone" id="timezone">
                     <div class="mb-4">
                         <label for="title" class="form-label fw-bold">
                             <i class="fas fa-heading"></i> Poll Title *
@@ -676,15 +3642,16 @@ document.getElementById('pollForm').addEventListener('submit', function(e) {
 // Initialize
 document.addEventListener('DOMContentLoaded', function() {
     setMinDate();
+    // Slot times are entered in the browser's time zone
+    document.getElementById('timezone').value = Intl.DateTimeFormat().resolvedOptions().timeZone || '';
     addTimeSlotListeners(document.querySelector('.time-slot-input'));
     updateRemoveButtons();
 });
 </script>
-{% endblock %}''')
+{% endblock %}'''
     
-    # Poll detail template
-    with open('templates/poll_detail.html', 'w') as f:
-        f.write('''{% extends "base.html" %}
+# Poll detail template
+TEMPLATES['poll_detail.html'] = '''{% extends "base.html" %}
 
 {% block title %}{{ poll.title }} - Meeting Poll{% endblock %}
 
@@ -779,85 +3746,11 @@ document.addEventListener('DOMContentLoaded', function() {
             </div>
             <div class="card-body">
                 {% if voters %}
-                <div class="table-responsive">
-                    <table class="table table-bordered">
-                        <thead>
-                            <tr>
-                                <th>Participant</th>
-                                {% for slot in time_slots %}
-                                    <th class="text-center">{{ slot.slot_datetime }}</th>
-                                {% endfor %}
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for voter in voters %}
-                            <tr>
-                                <td class="fw-bold">{{ voter.voter_name }}</td>
-                                {% for slot in time_slots %}
-                                    <td class="text-center">
-                                        {% set found_vote = false %}
-                                        {% for vote in votes %}
-                                            {% if not found_vote and vote.voter_name == voter.voter_name and vote.time_slot_id == slot.id %}
-                                                {% set found_vote = true %}
-                                                {% if vote.availability == 'yes' %}
-                                                    <span class="badge bg-success"><i class="fas fa-check"></i> Yes</span>
-                                                {% elif vote.availability == 'maybe' %}
-                                                    <span class="badge bg-warning text-dark"><i class="fas fa-question"></i> Maybe</span>
-                                                {% elif vote.availability == 'no' %}
-                                                    <span class="badge bg-danger"><i class="fas fa-times"></i> No</span>
-                                                {% else %}
-                                                    <span class="text-muted">UNKNOWN: {{ vote.availability }}</span>
-                                                {% endif %}
-                                            {% endif %}
-                                        {% endfor %}
-                                        {% if not found_vote %}
-                                            <span class="text-muted">-</span>
-                                        {% endif %}
-                                    </td>
-                                {% endfor %}
-                            </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
-                </div>
+                <!-- Results grid and summary are rendered once per poll version -->
+                {{ results_grid }}
                 
                 <!-- Summary Row -->
-                <div class="mt-4">
-                    <h5>Summary</h5>
-                    <div class="table-responsive">
-                        <table class="table table-sm">
-                            <thead>
-                                <tr>
-                                    <th>Time Option</th>
-                                    <th class="text-center text-success">Yes</th>
-                                    <th class="text-center text-warning">Maybe</th>
-                                    <th class="text-center text-danger">No</th>
-                                    <th class="text-center">Total</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {% for slot in time_slots %}
-                                <tr>
-                                    <td class="fw-bold">{{ slot.slot_datetime }}</td>
-                                    {% set yes_count = votes | selectattr('time_slot_id', 'equalto', slot.id) | selectattr('availability', 'equalto', 'yes') | list | length %}
-                                    {% set maybe_count = votes | selectattr('time_slot_id', 'equalto', slot.id) | selectattr('availability', 'equalto', 'maybe') | list | length %}
-                                    {% set no_count = votes | selectattr('time_slot_id', 'equalto', slot.id) | selectattr('availability', 'equalto', 'no') | list | length %}
-                                    <td class="text-center">
-                                        <span class="badge bg-success">{{ yes_count }}</span>
-                                    </td>
-                                    <td class="text-center">
-                                        <span class="badge bg-warning text-dark">{{ maybe_count }}</span>
-                                    </td>
-                                    <td class="text-center">
-                                        <span class="badge bg-danger">{{ no_count }}</span>
-                                    </td>
-                                    <td class="text-center fw-bold">{{ yes_count + maybe_count + no_count }}</td>
-                                </tr>
-                                {% endfor %}
-                            </tbody>
-                        </table>
-                    </div>
-                </div>
+                {{ summary_table }}
                 {% else %}
                 <div class="text-center py-4">
                     <i class="fas fa-inbox fa-3x text-muted mb-3"></i>
@@ -909,25 +3802,328 @@ function showNotification(message, type) {
     }, 3000);
 }
 
-// Auto-refresh results every 30 seconds
-setInterval(function() {
-    location.reload();
-}, 30000);
+// Badge markup for one results grid cell, matching the server-rendered grid
+const AVAILABILITY_BADGES = {
+    yes: '<span class="badge bg-success"><i class="fas fa-check"></i> Yes</span>',
+    maybe: '<span class="badge bg-warning text-dark"><i class="fas fa-question"></i> Maybe</span>',
+    no: '<span class="badge bg-danger"><i class="fas fa-times"></i> No</span>'
+};
+const EMPTY_CELL = '<span class="text-muted">-</span>';
+
+// Update the summary counts of the slots that changed
+function applyTallies(tallies) {
+    tallies.forEach(tally => {
+        const row = document.querySelector(`tr[data-slot-id="${tally.slot_id}"]`);
+        if (!row) return;
+        row.querySelector('.tally-yes').textContent = tally.counts.yes;
+        row.querySelector('.tally-maybe').textContent = tally.counts.maybe;
+        row.querySelector('.tally-no').textContent = tally.counts.no;
+        row.querySelector('.tally-total').textContent = tally.total;
+    });
+}
+
+// Insert or rewrite one participant's row of the results grid
+function applyBallot(voterName, votes) {
+    const grid = document.getElementById('resultsGrid');
+    const body = grid.tBodies[0];
+    const rows = Array.from(body.rows);
+    let row = rows.find(r => r.dataset.voter === voterName);
+    
+    if (!row) {
+        // Keep participants sorted by name, as the server renders them
+        row = document.createElement('tr');
+        row.dataset.voter = voterName;
+        const nameCell = row.insertCell();
+        nameCell.className = 'fw-bold';
+        nameCell.textContent = voterName;
+        Array.from(grid.tHead.rows[0].cells).slice(1).forEach(header => {
+            const cell = row.insertCell();
+            cell.className = 'text-center';
+            cell.dataset.slotId = header.dataset.slotId;
+        });
+        const next = rows.find(r => r.dataset.voter > voterName);
+        body.insertBefore(row, next || null);
+    }
+    
+    row.querySelectorAll('td[data-slot-id]').forEach(cell => {
+        cell.innerHTML = AVAILABILITY_BADGES[votes[cell.dataset.slotId]] || EMPTY_CELL;
+    });
+}
+
+// Results grid of a large poll. Voters are kept in name order as they are
+// fetched a page at a time, and only the rows in view (plus a few either
+// side) are in the table; spacer rows stand in for the rest.
+const OVERSCAN_ROWS = 10;
+
+class ResultsPages {
+    constructor(container) {
+        this.container = container;
+        this.body = container.querySelector('tbody');
+        this.slotIds = Array.from(container.querySelectorAll('thead th[data-slot-id]'))
+            .map(header => header.dataset.slotId);
+        this.url = container.dataset.url;
+        this.pageSize = Number(container.dataset.pageSize);
+        this.total = Number(container.dataset.voterCount);
+        this.voters = [];
+        this.after = '';
+        this.complete = false;
+        this.loading = null;
+        this.pending = new Map();
+        this.rowHeight = 41;
+        this.frame = null;
+        container.addEventListener('scroll', () => this.schedule());
+        window.addEventListener('resize', () => this.schedule());
+        this.schedule();
+    }
+    
+    schedule() {
+        if (this.frame === null) {
+            this.frame = requestAnimationFrame(() => {
+                this.frame = null;
+                this.render();
+            });
+        }
+    }
+    
+    // Pages can only be read in order, each after the last name of the one before
+    async load(count) {
+        while (!this.complete && this.voters.length < count) {
+            if (!this.loading) {
+                const url = `${this.url}?limit=${this.pageSize}&after=${encodeURIComponent(this.after)}`;
+                this.loading = fetch(url).then(response => response.json()).then(page => {
+                    const pending = this.pending;
+                    this.pending = new Map();
+                    this.voters.push(...page.voters);
+                    this.complete = page.next === null;
+                    this.after = page.next || this.after;
+                    this.total = this.complete ? this.voters.length : Math.max(this.total, this.voters.length + 1);
+                    // Ballots that changed while the page was on its way win
+                    pending.forEach((votes, voterName) => this.update(voterName, votes));
+                }).finally(() => {
+                    this.loading = null;
+                });
+            }
+            await this.loading;
+        }
+    }
+    
+    render() {
+        const first = Math.max(0, Math.floor(this.container.scrollTop / this.rowHeight) - OVERSCAN_ROWS);
+        const last = Math.min(this.total,
+            first + Math.ceil(this.container.clientHeight / this.rowHeight) + 2 * OVERSCAN_ROWS);
+        if (last > this.voters.length && !this.complete) {
+            this.load(last).then(() => this.schedule(), () => {});
+        }
+        
+        const end = Math.min(last, this.voters.length);
+        const rows = [this.spacer(first * this.rowHeight)];
+        for (let index = first; index < end; index++) {
+            rows.push(this.row(this.voters[index]));
+        }
+        rows.push(this.spacer((this.total - Math.max(first, end)) * this.rowHeight));
+        this.body.replaceChildren(...rows);
+        
+        if (end > first) {
+            this.rowHeight = rows[1].getBoundingClientRect().height || this.rowHeight;
+        }
+    }
+    
+    spacer(height) {
+        const row = document.createElement('tr');
+        row.className = 'spacer';
+        const cell = row.insertCell();
+        cell.colSpan = this.slotIds.length + 1;
+        cell.style.height = `${height}px`;
+        return row;
+    }
+    
+    row(voter) {
+        const row = document.createElement('tr');
+        row.dataset.voter = voter.voter_name;
+        const nameCell = row.insertCell();
+        nameCell.className = 'fw-bold';
+        nameCell.textContent = voter.voter_name;
+        this.slotIds.forEach(slotId => {
+            const cell = row.insertCell();
+            cell.className = 'text-center';
+            cell.innerHTML = AVAILABILITY_BADGES[voter.votes[slotId]] || EMPTY_CELL;
+        });
+        return row;
+    }
+    
+    // Apply a live update; voters past the loaded pages arrive with them
+    applyBallot(voterName, votes) {
+        if (this.loading) {
+            this.pending.set(voterName, votes);
+        }
+        this.update(voterName, votes);
+    }
+    
+    update(voterName, votes) {
+        const voter = this.voters.find(voter => voter.voter_name === voterName);
+        if (voter) {
+            voter.votes = votes;
+        } else {
+            const index = this.voters.findIndex(voter => voter.voter_name > voterName);
+            if (index >= 0 || this.complete) {
+                this.voters.splice(index >= 0 ? index : this.voters.length, 0, {voter_name: voterName, votes: votes});
+                this.total += 1;
+            }
+        }
+        this.schedule();
+    }
+}
+
+const resultsPagesContainer = document.getElementById('resultsPages');
+const resultsPages = resultsPagesContainer ? new ResultsPages(resultsPagesContainer) : null;
+
+function reloadPeriodically() {
+    // Auto-refresh results every 30 seconds
+    setInterval(function() {
+        location.reload();
+    }, 30000);
+}
+
+// Live results: the server pushes changed tallies and ballots as they are
+// submitted, so the page never has to be reloaded
+if (window.EventSource) {
+    const events = new EventSource('{{ url_for('poll_events', poll_id=poll.id, after=last_event_id) }}');
+    events.addEventListener('update', function(e) {
+        const update = JSON.parse(e.data);
+        if (update.reload || !document.getElementById('resultsGrid')) {
+            // A bulk import, or the first vote on this poll: the results
+            // tables are out of date or do not exist yet
+            location.reload();
+            return;
+        }
+        applyTallies(update.tallies);
+        if (resultsPages) {
+            resultsPages.applyBallot(update.voter_name, update.votes);
+        } else {
+            applyBallot(update.voter_name, update.votes);
+        }
+    });
+    events.addEventListener('error', function() {
+        // The browser retries dropped streams itself and only gives up when
+        // the server refuses one, e.g. because it is streaming to too many pages
+        if (events.readyState === EventSource.CLOSED) {
+            reloadPeriodically();
+        }
+    });
+} else {
+    reloadPeriodically();
+}
 </script>
-{% endblock %}''')
+{% endblock %}'''
+
+# Results grid partial, rendered once per poll version and cached as HTML
+TEMPLATES['_results_grid.html'] = '''<div class="table-responsive">
+    <table class="table table-bordered" id="resultsGrid">
+        <thead>
+            <tr>
+                <th>Participant</th>
+                {% for slot in time_slots %}
+                    <th class="text-center" data-slot-id="{{ slot.id }}">{{ slot.slot_datetime }}</th>
+                {% endfor %}
+            </tr>
+        </thead>
+        <tbody>
+            {% for voter in voters %}
+            <tr data-voter="{{ voter.voter_name }}">
+                <td class="fw-bold">{{ voter.voter_name }}</td>
+                {% for slot in time_slots %}
+                    <td class="text-center" data-slot-id="{{ slot.id }}">
+                        {% set availability = vote_matrix.get((voter.id, slot.id)) %}
+                        {% if availability == 'yes' %}
+                            <span class="badge bg-success"><i class="fas fa-check"></i> Yes</span>
+                        {% elif availability == 'maybe' %}
+                            <span class="badge bg-warning text-dark"><i class="fas fa-question"></i> Maybe</span>
+                        {% elif availability == 'no' %}
+                            <span class="badge bg-danger"><i class="fas fa-times"></i> No</span>
+                        {% elif availability %}
+                            <span class="text-muted">UNKNOWN: {{ availability }}</span>
+                        {% else %}
+                            <span class="text-muted">-</span>
+                        {% endif %}
+                    </td>
+                {% endfor %}
+            </tr>
+            {% endfor %}
+        </tbody>
+    </table>
+</div>
+'''
+
+# Results grid of a poll with more voters than RESULTS_PAGE_SIZE: only the
+# header is rendered here and the rows are fetched from /api/poll/<id>/voters
+TEMPLATES['_results_pages.html'] = '''<div class="table-responsive results-pages" id="resultsPages"
+     data-url="{{ url_for('api_poll_voters', poll_id=poll_id) }}"
+     data-voter-count="{{ voter_count }}" data-page-size="{{ page_size }}">
+    <table class="table table-bordered" id="resultsGrid">
+        <thead>
+            <tr>
+                <th>Participant</th>
+                {% for slot in time_slots %}
+                    <th class="text-center" data-slot-id="{{ slot.id }}">{{ slot.slot_datetime }}</th>
+                {% endfor %}
+            </tr>
+        </thead>
+        <tbody></tbody>
+    </table>
+</div>
+<p class="text-muted small mt-2">{{ voter_count }} participants</p>
+'''
+
+# Summary table partial, rendered once per poll version and cached as HTML
+TEMPLATES['_summary_table.html'] = '''<div class="mt-4">
+    <h5>Summary</h5>
+    <div class="table-responsive">
+        <table class="table table-sm">
+            <thead>
+                <tr>
+                    <th>Time Option</th>
+                    <th class="text-center text-success">Yes</th>
+                    <th class="text-center text-warning">Maybe</th>
+                    <th class="text-center text-danger">No</th>
+                    <th class="text-center">Total</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for tally in tallies %}
+                <tr data-slot-id="{{ tally.slot_id }}">
+                    <td class="fw-bold">{{ tally.slot_datetime }}</td>
+                    <td class="text-center">
+                        <span class="badge bg-success tally-yes">{{ tally.counts.yes }}</span>
+                    </td>
+                    <td class="text-center">
+                        <span class="badge bg-warning text-dark tally-maybe">{{ tally.counts.maybe }}</span>
+                    </td>
+                    <td class="text-center">
+                        <span class="badge bg-danger tally-no">{{ tally.counts.no }}</span>
+                    </td>
+                    <td class="text-center fw-bold tally-total">{{ tally.total }}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
+    </div>
+</div>
+'''
+
+app.jinja_loader = DictLoader(TEMPLATES)
+
+# Part of every page ETag, so a deploy with changed templates invalidates them
+TEMPLATES_DIGEST = hashlib.sha1(
+    ''.join(TEMPLATES[name] for name in sorted(TEMPLATES)).encode('utf-8')).hexdigest()[:12]
 
 if __name__ == '__main__':
     # Get port from environment variable for production
     port = int(os.environ.get('PORT', 5000))
     
-    # Always ensure templates exist - especially important for production
-    create_templates()
-    
     # Initialize database
     init_db()
     
     print("🚀 KDC Meeting Scheduler Starting...")
-    print("🎨 KDC branded templates created")
     print("📊 Database initialized")
     print(f"🌐 Server starting on port {port}")
     print("💡 Press Ctrl+C to stop the server")
@@ -940,6 +4136,5 @@ if __name__ == '__main__':
         # Development settings
         app.run(debug=True, host='0.0.0.0', port=port)
 
-# Also ensure templates are created when module is imported (for gunicorn)
-create_templates()
+# Also ensure the database is ready when module is imported (for gunicorn)
 init_db()
\ No newline at end of file
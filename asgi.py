@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for the Meeting Poll App
+Serves live updates and the results API natively on an asyncio event loop
+and hands every other request to the Flask app.
+
+Usage:
+    uvicorn asgi:app --workers 4
+"""
+
+import asyncio
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.http import parse_etags, quote_etag
+
+import app as scheduler
+
+# Database work from the async handlers runs on a small thread pool through
+# get_db(), handing pooled connections back after each call; open event
+# streams hold no thread at all while they wait.
+ASGI_DB_THREADS = int(os.environ.get('ASGI_DB_THREADS', 8))
+
+# Every other route runs the Flask app on its own thread pool
+ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 32))
+
+db_executor = ThreadPoolExecutor(max_workers=ASGI_DB_THREADS, thread_name_prefix='asgi-db')
+flask_app = WSGIMiddleware(scheduler.app, workers=ASGI_WSGI_THREADS)
+
+async def run_db(func, *args):
+    """Run func(db, *args) on the database thread pool"""
+    def call():
+        try:
+            return func(scheduler.get_db(), *args)
+        finally:
+            scheduler.storage.release()
+    return await asyncio.get_running_loop().run_in_executor(db_executor, call)
+
+class AsyncPollEvents:
+    """asyncio counterpart of PollEventBroker for the native event streams"""
+
+    def __init__(self):
+        self._latest = {}
+        self._waiters = defaultdict(set)
+        self._loop = None
+
+    def start(self):
+        """Attach to the running loop; call once per process before streaming"""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        # The threaded broker hears of votes handled by the Flask app in this
+        # process at once, and of other workers' votes through its watcher
+        # thread; forward both to the loop
+        scheduler.poll_event_broker.add_listener(self._forward)
+        scheduler.poll_event_broker.start_watcher()
+
+    def stop(self):
+        """Stop forwarding updates to the loop"""
+        if self._loop is not None:
+            scheduler.poll_event_broker.remove_listener(self._forward)
+
+    def _forward(self, poll_id, event_id):
+        self._loop.call_soon_threadsafe(self.notify, poll_id, event_id)
+
+    def notify(self, poll_id, event_id):
+        """Record that poll_id has updates up to event_id and wake its streams"""
+        if event_id <= self._latest.get(poll_id, 0):
+            return
+        self._latest[poll_id] = event_id
+        for waiter in self._waiters.pop(poll_id, ()):
+            if not waiter.done():
+                waiter.set_result(True)
+
+    def latest(self, poll_id):
+        """Get the newest event ID this worker knows of for poll_id"""
+        return self._latest.get(poll_id, 0)
+
+    async def wait(self, poll_id, after, timeout, disconnected):
+        """Wait until poll_id has an update newer than after; False on timeout or disconnect"""
+        if self._latest.get(poll_id, 0) > after:
+            return True
+        waiter = self._loop.create_future()
+        self._waiters[poll_id].add(waiter)
+        try:
+            done, _ = await asyncio.wait({waiter, disconnected}, timeout=timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            return waiter in done
+        finally:
+            waiter.cancel()
+            waiters = self._waiters.get(poll_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[poll_id]
+
+poll_events = AsyncPollEvents()
+
+async def send_response(send, status, headers, body=b''):
+    """Send a complete HTTP response"""
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+async def wait_for_disconnect(receive):
+    """Return once the client has gone away"""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+def load_results(db, poll_id, if_none_match):
+    """Same as api_poll_results(): (status, etag, body) for a poll's results"""
+    etag, results = scheduler.read_poll_results(db, poll_id, parse_etags(if_none_match))
+    if results is None:
+        return 304, etag, b''
+    return 200, etag, (scheduler.app.json.dumps(results) + '\n').encode()
+
+async def poll_results(scope, receive, send, poll_id):
+    """Serve /api/poll/<poll_id>/results"""
+    headers = dict(scope['headers'])
+    if_none_match = headers.get(b'if-none-match', b'').decode('latin-1')
+    status, etag, body = await run_db(load_results, poll_id, if_none_match)
+    response_headers = [(b'etag', quote_etag(etag).encode()), (b'cache-control', b'no-cache')]
+    if status == 200:
+        response_headers += [(b'content-type', b'application/json'),
+                             (b'content-length', str(len(body)).encode())]
+    await send_response(send, status, response_headers, body)
+
+async def poll_event_stream(scope, receive, send, poll_id):
+    """Serve /poll/<poll_id>/events; same stream as the Flask poll_events() view"""
+    headers = dict(scope['headers'])
+    query = parse_qs(scope['query_string'].decode('latin-1'))
+    after = scheduler.PollEventStream.resume_after(
+        headers.get(b'last-event-id', b'').decode('latin-1') or query.get('after', [None])[0])
+    if after is None:
+        after = await run_db(scheduler.get_last_event_id, poll_id)
+    events = scheduler.PollEventStream(poll_id, after, poll_events.latest)
+
+    poll_events.start()
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [
+        (b'content-type', b'text/event-stream; charset=utf-8'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no'),
+    ]})
+
+    async def emit(text):
+        await send({'type': 'http.response.body', 'body': text.encode(), 'more_body': True})
+
+    try:
+        await emit(events.RETRY)
+
+        woken = True
+        while not events.expired() and not disconnected.done():
+            if woken:
+                text = await run_db(events.read)
+                if text:
+                    await emit(text)
+
+            woken = await poll_events.wait(poll_id, events.after, scheduler.SSE_KEEPALIVE, disconnected)
+            if not woken and not disconnected.done():
+                await emit(events.KEEPALIVE)
+
+        if not disconnected.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnected.cancel()
+
+ROUTES = [
+    (re.compile(r'/poll/(?P<poll_id>[^/]+)/events'), poll_event_stream),
+    (re.compile(r'/api/poll/(?P<poll_id>[^/]+)/results'), poll_results),
+]
+
+async def lifespan(scope, receive, send):
+    """Start and stop the per-process live update watcher"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            poll_events.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            poll_events.stop()
+            db_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(scope, receive, send)
+
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        for pattern, handler in ROUTES:
+            match = pattern.fullmatch(scope['path'])
+            if match:
+                return await handler(scope, receive, send, **match.groupdict())
+
+    # Pages, forms and admin endpoints run through the Flask app on a thread
+    return await flask_app(scope, receive, send)
@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Meeting Poll App
+Builds synthetic poll databases and times the queries app.py runs.
+
+Usage:
+    python bench.py indexes [--sizes 10000 100000 1000000]
+    python bench.py participants [--polls 50] [--voters 200] [--slots 100]
+    python bench.py create [--polls 500] [--slots 20]
+    python bench.py votes [--threads 32] [--ballots 2000]
+    python bench.py best [--voters 1000] [--slots 500]
+    python bench.py cover [--voters 200] [--slots 10 20 40 100]
+    python bench.py ballots [--voters 1000] [--slots 500]
+    python bench.py grid [--voters 1000] [--slots 100]
+    python bench.py load --url http://127.0.0.1:8000 --poll <id> [--streams 500]
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlparse
+
+import app
+
+def build_db(path, polls, slots_per_poll, voters_per_poll, schema_version):
+    """Create a synthetic poll database at the given schema version (6 or earlier)"""
+    db = sqlite3.connect(path)
+    app.migrate_db(db, target=schema_version)
+    db.execute('PRAGMA synchronous = OFF')
+
+    slot_id = 0
+    batch_polls, batch_slots, batch_votes = [], [], []
+    for n in range(polls):
+        poll_id = f'{n:08x}'
+        batch_polls.append((poll_id, f'Poll {n}', ''))
+        slot_ids = []
+        for s in range(slots_per_poll):
+            slot_id += 1
+            slot_ids.append(slot_id)
+            batch_slots.append((slot_id, poll_id, f'Slot {s}'))
+        for v in range(voters_per_poll):
+            for sid in slot_ids:
+                batch_votes.append((poll_id, f'Voter {v}', sid,
+                                    random.choice(('yes', 'maybe', 'no'))))
+
+        if len(batch_votes) >= 100000 or n == polls - 1:
+            with db:
+                db.executemany('INSERT INTO polls (id, title, description) VALUES (?, ?, ?)',
+                               batch_polls)
+                db.executemany('INSERT INTO time_slots (id, poll_id, slot_datetime) VALUES (?, ?, ?)',
+                               batch_slots)
+                db.executemany('INSERT INTO votes (poll_id, voter_name, time_slot_id, availability) '
+                               'VALUES (?, ?, ?, ?)', batch_votes)
+            batch_polls, batch_slots, batch_votes = [], [], []
+    return db
+
+# The read queries issued by poll_detail() and api_poll_results()
+QUERIES = {
+    'poll': 'SELECT * FROM polls WHERE id = ?',
+    'tallies': '''
+        SELECT ts.id, ts.slot_datetime,
+               COUNT(*) FILTER (WHERE v.availability = 'yes'),
+               COUNT(*) FILTER (WHERE v.availability = 'maybe'),
+               COUNT(*) FILTER (WHERE v.availability = 'no')
+        FROM time_slots ts
+        LEFT JOIN votes v ON v.poll_id = ts.poll_id AND v.time_slot_id = ts.id
+        WHERE ts.poll_id = ?
+        GROUP BY ts.id
+        ORDER BY ts.slot_datetime
+    ''',
+    'votes': '''
+        SELECT voter_name, time_slot_id, availability
+        FROM votes
+        WHERE poll_id = ?
+        ORDER BY voter_name, time_slot_id
+    ''',
+    'voters': 'SELECT DISTINCT voter_name FROM votes WHERE poll_id = ? ORDER BY voter_name',
+}
+
+def time_queries(db, polls, samples):
+    """Return the median latency in milliseconds of each query"""
+    results = {}
+    for name, sql in QUERIES.items():
+        timings = []
+        for _ in range(samples):
+            poll_id = f'{random.randrange(polls):08x}'
+            start = time.perf_counter()
+            db.execute(sql, (poll_id,)).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = statistics.median(timings)
+    return results
+
+def bench_indexes(args):
+    """Compare query latency before and after the index migration"""
+    print(f"{'polls':>10} {'query':>8} {'v1 (ms)':>10} {'v2 (ms)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            db = build_db(path, size, args.slots, args.voters, schema_version=1)
+            before = time_queries(db, size, args.samples)
+
+            # Upgrade the same file in place, as init_db() does on startup
+            app.migrate_db(db, target=2)
+            after = time_queries(db, size, args.samples)
+            db.close()
+
+        for name in QUERIES:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            print(f"{size:>10} {name:>8} {before[name]:>10.3f} {after[name]:>12.3f} {speedup:>7.1f}x")
+
+# Voter reads before and after the participants migration, which replaced
+# votes.voter_name with participant_id
+PARTICIPANT_QUERIES = {
+    'voters': (
+        'SELECT DISTINCT voter_name FROM votes WHERE poll_id = :poll_id ORDER BY voter_name',
+        'SELECT id, name FROM participants WHERE poll_id = :poll_id ORDER BY name',
+    ),
+    'matrix': (
+        'SELECT voter_name, time_slot_id, availability FROM votes WHERE poll_id = :poll_id',
+        'SELECT participant_id, time_slot_id, availability FROM votes WHERE poll_id = :poll_id',
+    ),
+    'ballot': (
+        '''SELECT time_slot_id, availability FROM votes
+           WHERE poll_id = :poll_id AND voter_name = :voter_name''',
+        '''SELECT v.time_slot_id, v.availability
+           FROM participants p
+           JOIN votes v ON v.poll_id = p.poll_id AND v.participant_id = p.id
+           WHERE p.poll_id = :poll_id AND p.name = :voter_name''',
+    ),
+}
+
+def votes_storage(db):
+    """Return {object name: KiB} for the votes and participants tables and their indexes"""
+    names = [row[0] for row in db.execute(
+        "SELECT name FROM sqlite_master WHERE tbl_name IN ('votes', 'participants') ORDER BY tbl_name DESC, name")]
+    sizes = dict(db.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name').fetchall())
+    return {name: sizes.get(name, 0) / 1024 for name in names}
+
+def time_participant_queries(db, polls, voters, samples, version):
+    """Return the median latency in milliseconds of each query for one schema version"""
+    results = {}
+    for name, sql in PARTICIPANT_QUERIES.items():
+        timings = []
+        for _ in range(samples):
+            params = {'poll_id': f'{random.randrange(polls):08x}',
+                      'voter_name': f'Voter {random.randrange(voters)}'}
+            start = time.perf_counter()
+            db.execute(sql[version], params).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = statistics.median(timings)
+    return results
+
+def bench_participants(args):
+    """Compare index size and per-voter reads before and after the participants migration"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        db = build_db(path, args.polls, args.slots, args.voters, schema_version=6)
+        db.execute('VACUUM')
+        before_sizes = votes_storage(db)
+        before = time_participant_queries(db, args.polls, args.voters, args.samples, 0)
+        
+        app.migrate_db(db, target=7)
+        db.execute('VACUUM')
+        after_sizes = votes_storage(db)
+        after = time_participant_queries(db, args.polls, args.voters, args.samples, 1)
+        db.close()
+    
+    print(f"{args.polls} polls x {args.voters} voters x {args.slots} slots")
+    print(f"{'object':>28} {'v6 (KiB)':>10} {'v7 (KiB)':>10}")
+    for name in sorted(set(before_sizes) | set(after_sizes)):
+        print(f"{name:>28} {before_sizes.get(name, 0):>10.0f} {after_sizes.get(name, 0):>10.0f}")
+    print(f"{'total':>28} {sum(before_sizes.values()):>10.0f} {sum(after_sizes.values()):>10.0f}")
+    print()
+    print(f"{'query':>8} {'v6 (ms)':>10} {'v7 (ms)':>10} {'speedup':>8}")
+    for name in PARTICIPANT_QUERIES:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f"{name:>8} {before[name]:>10.3f} {after[name]:>10.3f} {speedup:>7.1f}x")
+
+def bench_create(args):
+    """Compare bulk poll creation with the per-row insert loop"""
+    polls = [{'title': f'Office hours {n}', 'description': '',
+              'time_slots': [f'Slot {s}' for s in range(args.slots)]}
+             for n in range(args.polls)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = app.connect_db(os.path.join(tmp, 'loop.db'))
+        app.migrate_db(db)
+        start = time.perf_counter()
+        for poll in polls:
+            # One statement per row and one commit per poll, like a form post
+            poll_id = app.uuid.uuid4().hex[:8]
+            db.execute('INSERT INTO polls (id, title, description) VALUES (?, ?, ?)',
+                       (poll_id, poll['title'], poll['description']))
+            for slot in poll['time_slots']:
+                db.execute('INSERT INTO time_slots (poll_id, slot_datetime) VALUES (?, ?)',
+                           (poll_id, slot))
+            db.commit()
+        loop_seconds = time.perf_counter() - start
+        db.close()
+
+        db = app.connect_db(os.path.join(tmp, 'batch.db'))
+        app.migrate_db(db)
+        start = time.perf_counter()
+        with db:
+            app.insert_polls(db, polls)
+        batch_seconds = time.perf_counter() - start
+        db.close()
+
+    rows = args.polls * (args.slots + 1)
+    print(f"{'mode':>8} {'seconds':>9} {'polls/s':>10} {'rows/s':>11}")
+    for mode, seconds in (('loop', loop_seconds), ('batch', batch_seconds)):
+        print(f"{mode:>8} {seconds:>9.3f} {args.polls / seconds:>10.0f} {rows / seconds:>11.0f}")
+    print(f"speedup: {loop_seconds / batch_seconds:.1f}x")
+
+def bench_votes(args):
+    """Compare vote submission throughput with and without group commit"""
+    app.SQLITE_PRAGMAS['synchronous'] = args.synchronous
+    app.logger.setLevel('WARNING')
+    print(f"{'mode':>8} {'seconds':>9} {'ballots/s':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'errors':>7}")
+    for mode in ('direct', 'group'):
+        with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+            app.storage = app.SQLiteStorage(os.path.join(tmp, 'votes.db'))
+            app.storage.migrate()
+            app.VOTE_GROUP_COMMIT = mode == 'group'
+            db = app.get_db()
+            with db:
+                poll_ids = app.insert_polls(db, [
+                    {'title': f'All hands {n}', 'description': '',
+                     'time_slots': [f'Slot {s}' for s in range(args.slots)]}
+                    for n in range(args.polls)])
+            polls = [(poll_id, [tally['slot_id'] for tally in app.get_slot_tallies(db, poll_id)])
+                     for poll_id in poll_ids]
+            
+            timings, errors = [], []
+            def submit(worker):
+                client = app.app.test_client()
+                for n in range(worker, args.ballots, args.threads):
+                    poll_id, slot_ids = polls[n % len(polls)]
+                    form = {'poll_id': poll_id, 'voter_name': f'Voter {n}'}
+                    form.update({f'slot_{slot_id}': random.choice(('yes', 'maybe', 'no'))
+                                 for slot_id in slot_ids})
+                    start = time.perf_counter()
+                    if client.post('/vote', data=form).status_code != 302:
+                        errors.append(n)
+                    timings.append((time.perf_counter() - start) * 1000)
+            
+            threads = [threading.Thread(target=submit, args=(worker,)) for worker in range(args.threads)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            seconds = time.perf_counter() - start
+        
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{mode:>8} {seconds:>9.3f} {len(timings) / seconds:>10.0f} "
+              f"{statistics.median(timings):>9.2f} {p95:>9.2f} {len(errors):>7}")
+
+def time_call(func, samples):
+    """Return the median latency of func() in milliseconds"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def fill_poll(db, poll_id, voters):
+    """Give voters random answers on every slot of a poll, writing the tables directly"""
+    slot_ids = app.get_slot_positions(db, poll_id)
+    for v in range(voters):
+        participant_id = app.get_participant_id(db, poll_id, f'Voter {v:04d}', create=True)
+        db.executemany('INSERT INTO votes (poll_id, participant_id, time_slot_id, availability) '
+                       'VALUES (?, ?, ?, ?)',
+                       [(poll_id, participant_id, slot_id, random.choice(('yes', 'maybe', 'no')))
+                        for slot_id in slot_ids])
+    app.rebuild_slot_tallies(db, poll_id)
+    return slot_ids
+
+def bench_best(args):
+    """Time slot recommendations for one large poll, with and without NumPy"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app.storage = app.SQLiteStorage(os.path.join(tmp, 'best.db'))
+        app.storage.migrate()
+        db = app.get_db()
+        with db:
+            poll_id, = app.insert_polls(db, [{'title': 'All hands', 'description': '',
+                                              'time_slots': [f'Slot {s:04d}' for s in range(args.slots)]}])
+            fill_poll(db, poll_id, args.voters)
+            app.bump_poll_version(db, poll_id)
+        
+        view = app.get_poll_view(db, poll_id, app.get_poll_version(db, poll_id))
+        required = list(range(0, args.voters, max(1, args.voters // 5)))[:5]
+        voter_weights = [1.0] * args.voters
+        client = app.app.test_client()
+        url = f'/api/poll/{poll_id}/best?k=10&required=Voter%200000&optional=Voter%200001'
+        
+        print(f"{args.voters} voters x {args.slots} slots")
+        print(f"{'backend':>8} {'matrix (ms)':>12} {'rank (ms)':>10} {'request (ms)':>13}")
+        numpy = app.numpy
+        for name, module in (('numpy', numpy), ('python', None)):
+            if name == 'numpy' and module is None:
+                print(f"{name:>8} {'not installed':>12}")
+                continue
+            app.numpy = module
+            def build():
+                app.answer_matrices.delete(poll_id)
+                return app.get_answer_matrix(poll_id, view)
+            build_ms = time_call(build, 3)
+            matrix = build()
+            rank_ms = time_call(lambda: app.rank_slots(matrix, args.slots, app.DEFAULT_SLOT_WEIGHTS,
+                                                       voter_weights, required, 10), args.samples)
+            request_ms = time_call(lambda: client.get(url), args.samples)
+            print(f"{name:>8} {build_ms:>12.2f} {rank_ms:>10.2f} {request_ms:>13.2f}")
+        app.numpy = numpy
+
+def synthetic_view(poll_id, voters, slots, yes_rate):
+    """Build a poll view model where each voter says yes to each slot with yes_rate"""
+    return {
+        'version': 0,
+        'voters': [{'id': v, 'voter_name': f'Voter {v:04d}'} for v in range(1, voters + 1)],
+        'time_slots': [{'id': slot_id, 'poll_id': poll_id, 'slot_datetime': f'Slot {slot_id}'}
+                       for slot_id in range(1, slots + 1)],
+        'vote_matrix': {(v, slot_id): 'yes' if random.random() < yes_rate else 'no'
+                        for v in range(1, voters + 1) for slot_id in range(1, slots + 1)},
+    }
+
+def bench_cover(args):
+    """Time the session coverage solver on synthetic polls"""
+    print(f"{'voters':>7} {'slots':>6} {'greedy':>7} {'exact':>6} {'proven':>7} "
+          f"{'bitsets (ms)':>13} {'greedy (ms)':>12} {'exact (ms)':>11}")
+    yes = (app.ANSWER_CODES['yes'],)
+    for slots in args.slots:
+        sizes, exact_sizes, proven = [], [], 0
+        build_ms, greedy_ms, exact_ms = [], [], []
+        for n in range(args.polls):
+            poll_id = f'cover-{slots}-{n}'
+            view = synthetic_view(poll_id, args.voters, slots, args.yes_rate)
+            
+            start = time.perf_counter()
+            bitsets = app.slot_bitsets(app.get_answer_matrix(poll_id, view), slots, yes)
+            universe = 0
+            for bits in bitsets:
+                universe |= bits
+            build_ms.append((time.perf_counter() - start) * 1000)
+            
+            start = time.perf_counter()
+            cover = app.cover_greedily(bitsets, universe)
+            greedy_ms.append((time.perf_counter() - start) * 1000)
+            sizes.append(len(cover))
+            
+            if slots <= app.COVER_EXACT_MAX_SLOTS:
+                start = time.perf_counter()
+                cover, finished = app.cover_exactly(bitsets, universe, cover,
+                                                    time.monotonic() + args.budget_ms / 1000)
+                exact_ms.append((time.perf_counter() - start) * 1000)
+                exact_sizes.append(len(cover))
+                proven += finished
+        
+        exact = f"{statistics.mean(exact_sizes):>6.2f}" if exact_sizes else f"{'-':>6}"
+        exact_time = f"{statistics.median(exact_ms):>11.2f}" if exact_ms else f"{'-':>11}"
+        print(f"{args.voters:>7} {slots:>6} {statistics.mean(sizes):>7.2f} {exact} "
+              f"{proven:>3}/{args.polls:<3} {statistics.median(build_ms):>13.2f} "
+              f"{statistics.median(greedy_ms):>12.3f} {exact_time}")
+
+def bench_ballots(args):
+    """Compare database size and tally speed of row-per-vote and packed ballots"""
+    print(f"{args.voters} voters x {args.slots} slots")
+    print(f"{'format':>8} {'db (KiB)':>9} {'recount (ms)':>13} {'stored (ms)':>12} {'view (ms)':>10} "
+          f"{'vote (ms)':>10}")
+    for ballot_format in ('rows', 'packed'):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ballots.db')
+            app.storage = app.SQLiteStorage(path)
+            app.storage.migrate()
+            db = app.get_db()
+            with db:
+                poll_id, = app.insert_polls(db, [{'title': 'All hands', 'description': '',
+                                                  'time_slots': [f'Slot {s:04d}' for s in range(args.slots)]}])
+                slot_ids = fill_poll(db, poll_id, args.voters)
+                app.convert_ballots(db, poll_id, ballot_format)
+            db.execute('VACUUM')
+            db.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            size_kib = os.path.getsize(path) / 1024
+            
+            recount_ms = time_call(lambda: app.count_slot_tallies(db, poll_id), args.samples)
+            stored_ms = time_call(lambda: app.get_slot_tallies(db, poll_id), args.samples)
+            view_ms = time_call(lambda: app.load_poll_view(db, poll_id), args.samples)
+            # Alternate between two full ballots so every save changes every slot
+            ballots = itertools.cycle([{slot_id: answer for slot_id in slot_ids} for answer in ('yes', 'no')])
+            def vote():
+                with db:
+                    db.begin_write(poll_id)
+                    app.save_ballot(db, poll_id, 'Voter 0000', next(ballots))
+            vote_ms = time_call(vote, args.samples)
+        print(f"{ballot_format:>8} {size_kib:>9.0f} {recount_ms:>13.2f} {stored_ms:>12.2f} {view_ms:>10.2f} "
+              f"{vote_ms:>10.2f}")
+
+def bench_grid(args):
+    """Compare the poll page with the whole results grid and with its rows fetched in pages"""
+    print(f"{args.voters} voters x {args.slots} slots")
+    with tempfile.TemporaryDirectory() as tmp:
+        app.storage = app.SQLiteStorage(os.path.join(tmp, 'grid.db'))
+        app.storage.migrate()
+        db = app.get_db()
+        with db:
+            poll_id, = app.insert_polls(db, [{'title': 'All hands', 'description': '',
+                                              'time_slots': [f'Slot {s:04d}' for s in range(args.slots)]}])
+            fill_poll(db, poll_id, args.voters)
+            app.bump_poll_version(db, poll_id)
+        client = app.app.test_client()
+        
+        def render():
+            app.fragment_cache.delete(f'fragments:{poll_id}')
+            return client.get(f'/poll/{poll_id}')
+        
+        page_size = app.RESULTS_PAGE_SIZE
+        print(f"{'grid':>6} {'page (KiB)':>11} {'render (ms)':>12} {'cached (ms)':>12}")
+        for grid, voters_per_page in (('whole', args.voters), ('paged', page_size)):
+            app.RESULTS_PAGE_SIZE = voters_per_page
+            page_kib = len(render().data) / 1024
+            render_ms = time_call(render, args.samples)
+            cached_ms = time_call(lambda: client.get(f'/poll/{poll_id}'), args.samples)
+            print(f"{grid:>6} {page_kib:>11.1f} {render_ms:>12.2f} {cached_ms:>12.2f}")
+        app.RESULTS_PAGE_SIZE = page_size
+        
+        # Walk every page once to find where the last one starts
+        cursors = ['']
+        while True:
+            cursor = client.get(f'/api/poll/{poll_id}/voters?after={quote(cursors[-1])}').get_json()['next']
+            if cursor is None:
+                break
+            cursors.append(cursor)
+        for label, cursor in (('first', cursors[0]), ('last', cursors[-1])):
+            url = f'/api/poll/{poll_id}/voters?after={quote(cursor)}'
+            page_ms = time_call(lambda: client.get(url), args.samples)
+            print(f"{label} voters page: {page_ms:.2f} ms, {len(client.get(url).data) / 1024:.1f} KiB "
+                  f"({len(cursors)} pages of {page_size})")
+
+async def http_get(host, port, path, timeout):
+    """Issue one GET on a fresh connection and return (status, seconds)"""
+    start = time.perf_counter()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+        return int(status_line.split()[1]), time.perf_counter() - start
+    finally:
+        writer.close()
+
+async def hold_stream(host, port, path, opened, timeout):
+    """Open a live update stream and keep reading it until cancelled"""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return
+    if status_line.split()[1:2] == [b'200']:
+        opened.append(path)
+    try:
+        while await reader.read(4096):
+            pass
+    finally:
+        writer.close()
+
+async def run_load(args):
+    """Hold args.streams event streams open and time results requests alongside them"""
+    url = urlparse(args.url)
+    host, port = url.hostname, url.port or 80
+    opened = []
+    streams = [asyncio.create_task(hold_stream(host, port, f'/poll/{args.poll}/events', opened,
+                                               args.timeout))
+               for _ in range(args.streams)]
+    await asyncio.sleep(args.settle)
+
+    timings, errors = [], 0
+    pending = iter(range(args.requests))
+    async def client():
+        nonlocal errors
+        for _ in pending:
+            try:
+                status, seconds = await http_get(host, port, f'/api/poll/{args.poll}/results',
+                                                 args.timeout)
+            except (OSError, asyncio.TimeoutError):
+                errors += 1
+                continue
+            if status == 200:
+                timings.append(seconds * 1000)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    for task in streams:
+        task.cancel()
+    await asyncio.gather(*streams, return_exceptions=True)
+    return len(opened), timings, errors, elapsed
+
+def bench_load(args):
+    """Time results API requests while many live update streams are open"""
+    opened, timings, errors, elapsed = asyncio.run(run_load(args))
+    print(f"streams open: {opened}/{args.streams}")
+    print(f"requests: {len(timings)} ok, {errors} failed in {elapsed:.2f}s "
+          f"({len(timings) / elapsed:.0f} req/s)")
+    if timings:
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"latency (ms): p50 {statistics.median(timings):.1f}  p95 {p95:.1f}  max {timings[-1]:.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    indexes = commands.add_parser('indexes', help=bench_indexes.__doc__)
+    indexes.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                         help='number of polls in each synthetic database')
+    indexes.add_argument('--slots', type=int, default=4, help='time slots per poll')
+    indexes.add_argument('--voters', type=int, default=3, help='voters per poll')
+    indexes.add_argument('--samples', type=int, default=200, help='queries timed per size')
+    indexes.set_defaults(func=bench_indexes)
+
+    participants = commands.add_parser('participants', help=bench_participants.__doc__)
+    participants.add_argument('--polls', type=int, default=50, help='polls in the database')
+    participants.add_argument('--slots', type=int, default=100, help='time slots per poll')
+    participants.add_argument('--voters', type=int, default=200, help='voters per poll')
+    participants.add_argument('--samples', type=int, default=50, help='queries timed per kind')
+    participants.set_defaults(func=bench_participants)
+
+    create = commands.add_parser('create', help=bench_create.__doc__)
+    create.add_argument('--polls', type=int, default=500, help='polls created per run')
+    create.add_argument('--slots', type=int, default=20, help='time slots per poll')
+    create.set_defaults(func=bench_create)
+
+    votes = commands.add_parser('votes', help=bench_votes.__doc__)
+    votes.add_argument('--threads', type=int, default=32, help='concurrent submitters')
+    votes.add_argument('--ballots', type=int, default=2000, help='ballots submitted per mode')
+    votes.add_argument('--polls', type=int, default=5, help='polls the ballots are spread over')
+    votes.add_argument('--slots', type=int, default=10, help='time slots per poll')
+    votes.add_argument('--synchronous', default=app.SQLITE_PRAGMAS['synchronous'].upper(),
+                       choices=['OFF', 'NORMAL', 'FULL'],
+                       help="SQLite synchronous setting; FULL syncs every commit  [default: the app's]")
+    votes.add_argument('--dir', help='directory for the database, on the disk to measure')
+    votes.set_defaults(func=bench_votes)
+
+    best = commands.add_parser('best', help=bench_best.__doc__)
+    best.add_argument('--voters', type=int, default=1000, help='voters in the poll')
+    best.add_argument('--slots', type=int, default=500, help='time slots in the poll')
+    best.add_argument('--samples', type=int, default=20, help='rankings timed per backend')
+    best.set_defaults(func=bench_best)
+
+    cover = commands.add_parser('cover', help=bench_cover.__doc__)
+    cover.add_argument('--voters', type=int, default=200, help='voters per poll')
+    cover.add_argument('--slots', type=int, nargs='+', default=[10, 20, 40, 100],
+                       help='time slots per poll, one row per value')
+    cover.add_argument('--yes-rate', type=float, default=0.15, help='chance of a yes in each cell')
+    cover.add_argument('--polls', type=int, default=10, help='synthetic polls per size')
+    cover.add_argument('--budget-ms', type=float, default=2000, help='time budget of the exact search')
+    cover.set_defaults(func=bench_cover)
+
+    ballots = commands.add_parser('ballots', help=bench_ballots.__doc__)
+    ballots.add_argument('--voters', type=int, default=1000, help='voters in the poll')
+    ballots.add_argument('--slots', type=int, default=500, help='time slots in the poll')
+    ballots.add_argument('--samples', type=int, default=10, help='calls timed per operation')
+    ballots.set_defaults(func=bench_ballots)
+
+    grid = commands.add_parser('grid', help=bench_grid.__doc__)
+    grid.add_argument('--voters', type=int, default=1000, help='voters in the poll')
+    grid.add_argument('--slots', type=int, default=100, help='time slots in the poll')
+    grid.add_argument('--samples', type=int, default=10, help='requests timed per measurement')
+    grid.set_defaults(func=bench_grid)
+
+    load = commands.add_parser('load', help=bench_load.__doc__)
+    load.add_argument('--url', default='http://127.0.0.1:8000', help='base URL of a running server')
+    load.add_argument('--poll', required=True, help='poll ID to stream and query')
+    load.add_argument('--streams', type=int, default=500, help='live update streams held open')
+    load.add_argument('--requests', type=int, default=2000, help='results API requests timed')
+    load.add_argument('--concurrency', type=int, default=20, help='parallel results API clients')
+    load.add_argument('--settle', type=float, default=2.0, help='seconds to wait after opening streams')
+    load.add_argument('--timeout', type=float, default=10.0, help='per-request timeout in seconds')
+    load.set_defaults(func=bench_load)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
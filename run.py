@@ -40,13 +40,7 @@ def main():
         # Import and run the main application
         import app
         
-        # Force recreate templates with KDC branding
-        import os, shutil
-        if os.path.exists('templates'):
-            shutil.rmtree('templates')
-            print("🔄 Updating to KDC branding...")
-        
-        app.create_templates()
+        # Templates are built into app.py, so only the database needs setting up
         app.init_db()
         
         print("\n🚀 Starting KDC Meeting Scheduler...")
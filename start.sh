@@ -7,15 +7,22 @@ echo "🚀 Starting KDC Meeting Scheduler on Render..."
 # Set environment variable to indicate we're on Render
 export RENDER=true
 
-# Ensure templates are created before starting gunicorn
-echo "🎨 Ensuring templates are created..."
+# Ensure the database schema is up to date before starting the server
+echo "📊 Migrating database..."
 python -c "
 import app
-app.create_templates()
 app.init_db()
-print('✅ Templates and database initialized')
+print('✅ Database initialized')
 "
 
-# Start the application with gunicorn
+# Start the application with uvicorn, or gunicorn when SERVER_MODE=wsgi
 echo "🌐 Starting web server..."
-exec gunicorn --bind 0.0.0.0:$PORT --workers 1 --timeout 120 app:app
\ No newline at end of file
+if [ "${SERVER_MODE:-asgi}" = "asgi" ]; then
+    # Live-update streams wait on the event loop instead of holding a thread each
+    exec uvicorn asgi:app --host 0.0.0.0 --port $PORT --workers ${WEB_CONCURRENCY:-4}
+fi
+
+# SQLite runs in WAL mode with a busy timeout, so several workers can share polls.db.
+# Each live-update stream holds one of the threads, up to SSE_MAX_STREAMS per worker.
+exec gunicorn --bind 0.0.0.0:$PORT --workers ${WEB_CONCURRENCY:-4} \
+    --worker-class gthread --threads ${GUNICORN_THREADS:-32} --timeout 120 app:app
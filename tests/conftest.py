@@ -0,0 +1,35 @@
+"""Point the app at a throwaway database before it is imported"""
+
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='kdc-tests-')
+
+os.environ.setdefault('STORAGE_BACKEND', 'sqlite')
+os.environ['DATABASE'] = os.path.join(WORKDIR, 'polls.db')
+os.environ['LOG_CONTROL_FILE'] = os.path.join(WORKDIR, 'log_control.json')
+sys.path.insert(0, ROOT)
+
+import app as scheduler  # noqa: E402
+
+@pytest.fixture
+def client():
+    scheduler.app.config['TESTING'] = True
+    with scheduler.app.test_client() as client:
+        yield client
+
+@pytest.fixture
+def create_poll(client):
+    """Create a poll through the batch API and return (poll_id, slot_ids)"""
+    def create(title='Standup', time_slots=('Monday 10:00', 'Monday 11:00')):
+        response = client.post('/api/polls/batch', data=json.dumps(
+            {'polls': [{'title': title, 'time_slots': list(time_slots)}]}), content_type='application/json')
+        poll_id = response.get_json()['polls'][0]['id']
+        results = client.get(f'/api/poll/{poll_id}/results').get_json()
+        return poll_id, [slot['slot_id'] for slot in results]
+    return create
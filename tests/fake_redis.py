@@ -0,0 +1,147 @@
+"""A small Redis-protocol server for testing the redis cache backend without Redis"""
+
+import socket
+import socketserver
+import threading
+import time
+
+class FakeRedis:
+    """Serves AUTH, SELECT, PING, GET, SET (with EX), DEL and INCR from memory on a local port"""
+
+    def __init__(self, password=None):
+        self.password = password
+        self.port = 0
+        self.commands = []   # (database, command name) as received
+        self._data = {}      # (database, key) -> (value, expiry as time.monotonic() or None)
+        self._lock = threading.Lock()
+        self._clients = set()
+        self._server = None
+
+    def start(self):
+        """Listen on the port used before, or a free one the first time"""
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with fake._lock:
+                    fake._clients.add(self.request)
+                session = {'database': 0, 'authenticated': fake.password is None}
+                try:
+                    while True:
+                        command = read_command(self.rfile)
+                        if command is None:
+                            return
+                        self.wfile.write(fake._reply(session, command))
+                except OSError:
+                    return
+                finally:
+                    with fake._lock:
+                        fake._clients.discard(self.request)
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self._server = Server(('127.0.0.1', self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop listening and drop every client connection, as a restarting server would"""
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            clients, self._clients = self._clients, set()
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            client.close()
+
+    def clear(self):
+        """Forget every key, as a server restarting without persistence would"""
+        with self._lock:
+            self._data.clear()
+
+    @property
+    def url(self):
+        return f'redis://127.0.0.1:{self.port}'
+
+    def get(self, key, database=0):
+        """The stored value and its remaining time to live in seconds, or None"""
+        with self._lock:
+            entry = self._live_entry((database, key))
+        if entry is None:
+            return None
+        value, expires = entry
+        return value, None if expires is None else expires - time.monotonic()
+
+    def _live_entry(self, item):
+        entry = self._data.get(item)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[item]
+            return None
+        return entry
+
+    def _reply(self, session, command):
+        name, args = command[0].upper().decode(), command[1:]
+        with self._lock:
+            self.commands.append((session['database'], name))
+            if name == 'AUTH':
+                if self.password is None:
+                    return b'-ERR AUTH called without any password configured\r\n'
+                if args != [self.password.encode()]:
+                    return b'-WRONGPASS invalid username-password pair\r\n'
+                session['authenticated'] = True
+                return b'+OK\r\n'
+            if not session['authenticated']:
+                return b'-NOAUTH Authentication required.\r\n'
+            if name == 'PING':
+                return b'+PONG\r\n'
+            if name == 'SELECT':
+                session['database'] = int(args[0])
+                return b'+OK\r\n'
+            database = session['database']
+            if name == 'GET' and len(args) == 1:
+                entry = self._live_entry((database, args[0]))
+                return b'$-1\r\n' if entry is None else bulk(entry[0])
+            if name == 'SET' and len(args) in (2, 4):
+                expires = None
+                if len(args) == 4:
+                    if args[2].upper() != b'EX':
+                        return b'-ERR syntax error\r\n'
+                    expires = time.monotonic() + int(args[3])
+                self._data[database, args[0]] = (args[1], expires)
+                return b'+OK\r\n'
+            if name == 'DEL' and args:
+                deleted = 0
+                for key in args:
+                    if self._live_entry((database, key)) is not None:
+                        del self._data[database, key]
+                        deleted += 1
+                return b':%d\r\n' % deleted
+            if name == 'INCR' and len(args) == 1:
+                value, expires = self._live_entry((database, args[0])) or (b'0', None)
+                try:
+                    value = int(value) + 1
+                except ValueError:
+                    return b'-ERR value is not an integer or out of range\r\n'
+                self._data[database, args[0]] = (str(value).encode(), expires)
+                return b':%d\r\n' % value
+            return b"-ERR unknown command or wrong number of arguments for '%s'\r\n" % name.encode()
+
+def bulk(value):
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+def read_command(reader):
+    """Read one command sent as a RESP array of bulk strings, or None at the end of the stream"""
+    line = reader.readline()
+    if not line.startswith(b'*'):
+        return None
+    command = []
+    for _ in range(int(line[1:])):
+        length = int(reader.readline()[1:])
+        command.append(reader.read(length + 2)[:-2])
+    return command
@@ -0,0 +1,91 @@
+"""Live updates under uvicorn reach open event streams without waiting for a keepalive"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+import pytest
+
+pytest.importorskip('uvicorn')
+pytest.importorskip('a2wsgi')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture(params=[1, 2], ids=['1-worker', '2-workers'])
+def server(request, tmp_path):
+    """A uvicorn server on asgi:app with its own database; yields its base URL"""
+    port = free_port()
+    env = dict(os.environ, DATABASE=str(tmp_path / 'polls.db'), STORAGE_BACKEND='sqlite',
+               EVENT_POLL_INTERVAL='0.2', LOG_CONTROL_FILE=str(tmp_path / 'log_control.json'))
+    # Create the schema once, so the workers don't race to migrate it
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=ROOT, env=env, check=True)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(request.param), '--log-level', 'warning'],
+        cwd=ROOT, env=env)
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    pytest.fail('uvicorn did not start')
+                time.sleep(0.1)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+def create_poll(base_url):
+    body = json.dumps({'polls': [{'title': 'Standup', 'time_slots': ['Monday 10:00']}]}).encode()
+    request = urllib.request.Request(f'{base_url}/api/polls/batch', data=body,
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        poll_id = json.load(response)['polls'][0]['id']
+    with urllib.request.urlopen(f'{base_url}/api/poll/{poll_id}/results', timeout=10) as response:
+        slot_id = json.load(response)[0]['slot_id']
+    return poll_id, slot_id
+
+def open_stream(base_url, poll_id):
+    """Open /poll/<id>/events and read up to the first retry line"""
+    host, port = urllib.parse.urlsplit(base_url).netloc.split(':')
+    sock = socket.create_connection((host, int(port)), timeout=10)
+    sock.sendall(f'GET /poll/{poll_id}/events HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode())
+    received = b''
+    while b'retry:' not in received:
+        received += sock.recv(4096)
+    return sock
+
+def test_vote_reaches_open_stream_within_a_second(server):
+    poll_id, slot_id = create_poll(server)
+    streams = [open_stream(server, poll_id) for _ in range(4)]
+    try:
+        # Give cross-worker watchers a moment to settle on the current event ID
+        time.sleep(0.5)
+        form = urllib.parse.urlencode({'poll_id': poll_id, 'voter_name': 'Alice',
+                                       f'slot_{slot_id}': 'yes'}).encode()
+        start = time.monotonic()
+        urllib.request.urlopen(f'{server}/vote', data=form, timeout=10).close()
+
+        for sock in streams:
+            sock.settimeout(max(0.1, start + 2 - time.monotonic()))
+            received = b''
+            while b'event: update' not in received:
+                received += sock.recv(4096)
+            assert time.monotonic() - start < 1.0
+            assert b'Alice' in received
+    finally:
+        for sock in streams:
+            sock.close()
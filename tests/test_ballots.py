@@ -0,0 +1,74 @@
+"""Packed ballots: the 2-bit codec and moving a poll's votes between formats"""
+
+import pytest
+
+from conftest import scheduler
+
+def vote(client, poll_id, voter_name, answers):
+    form = {'poll_id': poll_id, 'voter_name': voter_name}
+    form.update({f'slot_{slot_id}': answer for slot_id, answer in answers.items()})
+    assert client.post('/vote', data=form).status_code == 302
+
+def read_ballots(poll_id):
+    """Get {voter_name: {slot_id: availability}} from whichever format the poll uses"""
+    db = scheduler.get_db()
+    names = {row['id']: row['name'] for row in db.execute(
+        'SELECT id, name FROM participants WHERE poll_id = ?', (poll_id,))}
+    ballot_format = scheduler.get_ballot_format(db, poll_id)
+    if ballot_format == 'packed':
+        positions = scheduler.get_slot_positions(db, poll_id)
+        ballots = dict(scheduler.read_packed_votes(db, poll_id, positions))
+    else:
+        ballots = {}
+        for row in db.execute('SELECT participant_id, time_slot_id, availability FROM votes WHERE poll_id = ?',
+                              (poll_id,)):
+            ballots.setdefault(row['participant_id'], {})[row['time_slot_id']] = row['availability']
+    return ballot_format, {names[participant_id]: ballot for participant_id, ballot in ballots.items()}
+
+def test_answer_codes_are_two_bits_from_the_low_end():
+    positions = [11, 12, 13, 14, 15]
+    packed = scheduler.pack_ballot({11: 'yes', 12: 'maybe', 13: 'no', 15: 'yes'}, positions)
+    # Slot 14 has no answer (0); slot 15 starts the second byte
+    assert packed == bytes([0b00_11_10_01, 0b01])
+
+@pytest.mark.parametrize('slot_count', [1, 3, 4, 5, 7, 8, 9])
+def test_ballots_round_trip(slot_count):
+    positions = list(range(100, 100 + slot_count))
+    answers = ('yes', 'maybe', 'no', None)
+    ballot = {slot_id: answers[index % 4] for index, slot_id in enumerate(positions)
+              if answers[index % 4] is not None}
+
+    packed = scheduler.pack_ballot(ballot, positions)
+    assert len(packed) == (slot_count + 3) // 4
+    assert scheduler.unpack_ballot(packed, positions) == ballot
+    assert scheduler.unpack_ballot(scheduler.pack_ballot({}, positions), positions) == {}
+
+def test_short_ballots_leave_later_slots_unanswered():
+    # Ballots written before a slot was added are a byte short
+    packed = scheduler.pack_ballot({1: 'no', 4: 'yes'}, [1, 2, 3, 4])
+    assert scheduler.unpack_ballot(packed, [1, 2, 3, 4, 5]) == {1: 'no', 4: 'yes'}
+    assert scheduler.count_packed_answers([packed], 5)[4] == (0, 0, 0)
+
+def test_pack_ballots_moves_existing_votes(client, create_poll):
+    poll_id, slot_ids = create_poll(time_slots=[f'Monday {hour}:00' for hour in range(9, 14)])
+    vote(client, poll_id, 'Alice', {slot_ids[0]: 'yes', slot_ids[2]: 'maybe', slot_ids[4]: 'no'})
+    vote(client, poll_id, 'Bob', {slot_id: 'yes' for slot_id in slot_ids})
+    vote(client, poll_id, 'Carol', {slot_ids[3]: 'no'})
+    results = client.get(f'/api/poll/{poll_id}/results').get_json()
+    _, ballots = read_ballots(poll_id)
+
+    output = scheduler.app.test_cli_runner().invoke(args=['pack-ballots', poll_id]).output
+    assert 'Converted 1 polls (3 voters) to packed ballots' in output
+    assert read_ballots(poll_id) == ('packed', ballots)
+    db = scheduler.get_db()
+    assert db.execute('SELECT COUNT(*) FROM votes WHERE poll_id = ?', (poll_id,)).fetchone()[0] == 0
+    assert {len(row['answers']) for row in db.execute(
+        'SELECT answers FROM ballots WHERE poll_id = ?', (poll_id,))} == {2}
+    assert client.get(f'/api/poll/{poll_id}/results').get_json() == results
+
+    # Votes after the conversion land in ballots, and --unpack brings them all back
+    vote(client, poll_id, 'Carol', {slot_ids[3]: 'yes'})
+    ballots['Carol'] = {slot_ids[3]: 'yes'}
+    output = scheduler.app.test_cli_runner().invoke(args=['pack-ballots', '--unpack', poll_id]).output
+    assert 'Converted 1 polls (3 voters) to one row per vote' in output
+    assert read_ballots(poll_id) == ('rows', ballots)
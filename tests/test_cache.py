@@ -0,0 +1,64 @@
+"""The redis cache backend against a fake Redis-protocol server"""
+
+import pytest
+
+from conftest import scheduler
+from fake_redis import FakeRedis
+
+@pytest.fixture
+def redis_server():
+    server = FakeRedis().start()
+    yield server
+    server.stop()
+
+def test_values_round_trip(redis_server):
+    cache = scheduler.RedisCacheBackend(redis_server.url + '/2', ttl=60)
+    cache.set('poll:a1b2c3d4', {'title': 'Standup'}, tag=3)
+
+    assert cache.get('poll:a1b2c3d4', tag=3) == {'title': 'Standup'}
+    # An entry written for another version of the poll is a miss
+    assert cache.get('poll:a1b2c3d4', tag=4) is None
+    value, ttl = redis_server.get(b'kdc:poll:a1b2c3d4', database=2)
+    assert 59 < ttl <= 60
+
+    cache.delete('poll:a1b2c3d4')
+    assert cache.get('poll:a1b2c3d4', tag=3) is None
+    assert redis_server.get(b'kdc:poll:a1b2c3d4', database=2) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['invalidations']) == (1, 2, 1)
+    assert stats['server'] == f'127.0.0.1:{redis_server.port}/2'
+
+def test_reconnects_after_the_server_restarts(redis_server):
+    cache = scheduler.RedisCacheBackend(redis_server.url, ttl=60)
+    cache.set('poll:a1b2c3d4', 'cached')
+    assert cache.get('poll:a1b2c3d4') == 'cached'
+
+    # The restarted server is empty, and the old connection is gone
+    redis_server.stop()
+    redis_server.start()
+    redis_server.clear()
+    assert cache.get('poll:a1b2c3d4') is None
+    cache.set('poll:a1b2c3d4', 'cached again')
+    assert cache.get('poll:a1b2c3d4') == 'cached again'
+
+def test_unavailable_server_is_a_miss(redis_server):
+    cache = scheduler.RedisCacheBackend(redis_server.url, ttl=60)
+    redis_server.stop()
+
+    cache.set('poll:a1b2c3d4', 'cached')
+    assert cache.get('poll:a1b2c3d4') is None
+    cache.delete('poll:a1b2c3d4')
+    assert (cache.misses, cache.invalidations) == (1, 0)
+
+def test_error_replies_are_a_miss():
+    server = FakeRedis(password='secret').start()
+    try:
+        wrong = scheduler.RedisCacheBackend(f'redis://:wrong@127.0.0.1:{server.port}', ttl=60)
+        wrong.set('poll:a1b2c3d4', 'cached')
+        assert wrong.get('poll:a1b2c3d4') is None
+
+        right = scheduler.RedisCacheBackend(f'redis://:secret@127.0.0.1:{server.port}', ttl=60)
+        right.set('poll:a1b2c3d4', 'cached')
+        assert right.get('poll:a1b2c3d4') == 'cached'
+    finally:
+        server.stop()
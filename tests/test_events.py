@@ -0,0 +1,67 @@
+"""Live update streams served by Flask under a threaded WSGI server"""
+
+import threading
+
+from conftest import scheduler
+
+def test_streams_beyond_the_limit_are_refused(client, create_poll, monkeypatch):
+    monkeypatch.setattr(scheduler, 'sse_stream_slots', threading.BoundedSemaphore(1))
+    poll_id, _ = create_poll()
+
+    first = client.get(f'/poll/{poll_id}/events', buffered=False)
+    assert first.status_code == 200
+    assert next(first.response) == b'retry: 3000\n\n'
+
+    refused = client.get(f'/poll/{poll_id}/events')
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After'] == str(int(scheduler.SSE_MAX_DURATION))
+
+    # Closing a stream frees its slot for the next page
+    first.close()
+    second = client.get(f'/poll/{poll_id}/events', buffered=False)
+    assert second.status_code == 200
+    second.close()
+
+def test_watcher_survives_database_errors(create_poll, monkeypatch):
+    poll_id, _ = create_poll()
+    monkeypatch.setattr(scheduler, 'EVENT_POLL_INTERVAL', 0.05)
+    calls = []
+    get_db = scheduler.get_db
+
+    def flaky_get_db():
+        # Fail the watcher's first checks, including the one reading where to start
+        calls.append(threading.current_thread().name)
+        if len(calls) <= 2:
+            raise scheduler.storage.Error('connection dropped')
+        return get_db()
+
+    monkeypatch.setattr(scheduler, 'get_db', flaky_get_db)
+    broker = scheduler.PollEventBroker()
+    assert not broker.wait(poll_id, 0, 0.5)
+    assert len(calls) > 2
+
+    db = get_db()
+    with db:
+        event_id = scheduler.record_poll_reload(db, poll_id)
+    scheduler.storage.release()
+    assert broker.wait(poll_id, 0, 2)
+    assert broker.latest(poll_id) == event_id
+
+def test_stream_does_not_skip_updates_written_while_it_reads(create_poll, monkeypatch):
+    poll_id, _ = create_poll()
+    announced = {poll_id: 0}
+    read_poll_events = scheduler.read_poll_events
+
+    def read_then_vote(db, poll_id, after):
+        rows = read_poll_events(db, poll_id, after)
+        # Another ballot is committed and announced before the stream moves on
+        with db:
+            announced[poll_id] = scheduler.record_poll_reload(db, poll_id)
+        return rows
+
+    events = scheduler.PollEventStream(poll_id, 0, announced.get)
+    monkeypatch.setattr(scheduler, 'read_poll_events', read_then_vote)
+    assert events.read(scheduler.get_db()) == ''
+    monkeypatch.setattr(scheduler, 'read_poll_events', read_poll_events)
+    assert events.read(scheduler.get_db()).startswith(f'id: {announced[poll_id]}\nevent: update\n')
+    scheduler.storage.release()
@@ -0,0 +1,69 @@
+"""Importing availability from CSV and iCalendar files"""
+
+from flask import Request
+
+from conftest import scheduler
+
+CALENDAR = '''BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+DTSTART:20260302T103000Z
+DURATION:PT1H
+SUMMARY:Dentist
+BEGIN:VALARM
+TRIGGER:-PT15M
+DURATION:PT5M
+REPEAT:2
+ACTION:DISPLAY
+END:VALARM
+END:VEVENT
+END:VCALENDAR
+'''
+
+def answers(client, poll_id):
+    return {slot['slot_datetime']: slot['counts'] for slot in client.get(f'/api/poll/{poll_id}/results').get_json()}
+
+def test_calendar_events_ignore_their_alarms(client, create_poll):
+    poll_id, _ = create_poll(time_slots=['2026-03-02 10:00', '2026-03-02 11:00'])
+    report = client.post(f'/api/poll/{poll_id}/import?voter=Alice&format=ics', data=CALENDAR,
+                         content_type='text/calendar').get_json()
+
+    # The alarm's five minute DURATION is not the event's hour
+    assert answers(client, poll_id) == {
+        '2026-03-02 10:00': {'yes': 1, 'maybe': 0, 'no': 0},
+        '2026-03-02 11:00': {'yes': 0, 'maybe': 0, 'no': 1},
+    }
+    assert (report['busy_times'], report['imported'], report['voters']) == (1, 2, 1)
+    assert 'rows' not in report
+
+def test_raw_body_sent_as_a_form_is_imported(client, create_poll):
+    poll_id, (monday, tuesday) = create_poll()
+    body = f'voter_name,slot_id,availability\r\nAlice,{monday},yes\r\nAlice,{tuesday},maybe\r\nBob,{monday},no\r\n'
+    # What curl --data-binary sends
+    report = client.post(f'/api/poll/{poll_id}/import', data=body,
+                         content_type='application/x-www-form-urlencoded').get_json()
+
+    assert (report['rows'], report['imported'], report['voters'], report['errors']) == (3, 3, 2, [])
+    assert answers(client, poll_id) == {
+        'Monday 10:00': {'yes': 1, 'maybe': 0, 'no': 1},
+        'Monday 11:00': {'yes': 0, 'maybe': 1, 'no': 0},
+    }
+
+def test_raw_calendar_sent_as_a_form_takes_options_from_the_query(client, create_poll):
+    poll_id, _ = create_poll(time_slots=['2026-03-02 10:00', '2026-03-02 11:00'])
+    report = client.post(f'/api/poll/{poll_id}/import?voter=Alice&format=ics', data=CALENDAR,
+                         content_type='application/x-www-form-urlencoded').get_json()
+    assert (report['busy_times'], report['imported'], report['voters']) == (1, 2, 1)
+
+def test_raw_body_is_streamed(client, create_poll, monkeypatch):
+    poll_id, (monday, _) = create_poll()
+    rows = ''.join(f'Voter {index},{monday},yes\r\n' for index in range(2000))
+
+    def get_data(*args, **kwargs):
+        raise AssertionError('the body was read into memory')
+
+    monkeypatch.setattr(Request, 'get_data', get_data)
+    monkeypatch.setattr(scheduler, 'IMPORT_BATCH_ROWS', 500)
+    report = client.post(f'/api/poll/{poll_id}/import', data='voter_name,slot_id,availability\r\n' + rows,
+                         content_type='application/x-www-form-urlencoded').get_json()
+    assert (report['rows'], report['imported'], report['voters']) == (2000, 2000, 2000)
@@ -0,0 +1,78 @@
+"""Schema migrations of the SQLite database"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT, scheduler
+
+def test_workers_starting_together_migrate_once(tmp_path):
+    # Every worker migrates on import; only one may apply each migration
+    for attempt in range(3):
+        env = dict(os.environ, DATABASE=str(tmp_path / f'polls-{attempt}.db'),
+                   LOG_CONTROL_FILE=str(tmp_path / 'log_control.json'))
+        workers = [subprocess.Popen([sys.executable, '-c', 'import app'], cwd=ROOT, env=env,
+                                    stderr=subprocess.PIPE) for _ in range(4)]
+        for worker in workers:
+            _, stderr = worker.communicate(timeout=60)
+            assert worker.returncode == 0, stderr.decode()
+        with sqlite3.connect(env['DATABASE']) as db:
+            assert db.execute('PRAGMA user_version').fetchone()[0] == len(scheduler.MIGRATIONS)
+
+def test_participants_migration_keeps_every_answer(tmp_path):
+    # Migration 7 replaces voter_name with participant_id; start from version 6
+    storage = scheduler.SQLiteStorage(str(tmp_path / 'polls.db'))
+    assert storage.migrate(target=6) == (0, 6)
+    db = storage.connection()
+    answers = ('yes', 'maybe', 'no')
+    with db:
+        for poll_id, ballot_format in [('rows0001', 'rows'), ('rows0002', 'rows'), ('pack0001', 'packed')]:
+            db.execute('INSERT INTO polls (id, title, ballot_format) VALUES (?, ?, ?)',
+                       (poll_id, 'Standup', ballot_format))
+            db.executemany('INSERT INTO time_slots (poll_id, slot_datetime) VALUES (?, ?)',
+                           [(poll_id, f'Monday {hour}:00') for hour in range(9, 14)])
+        slot_ids = {}
+        for row in db.execute('SELECT id, poll_id FROM time_slots ORDER BY id'):
+            slot_ids.setdefault(row['poll_id'], []).append(row['id'])
+
+        # Alice votes on every poll; each poll must get a participant of its own
+        ballots = {
+            ('rows0001', 'Alice'): dict(zip(slot_ids['rows0001'], answers + answers)),
+            ('rows0001', 'Bob'): {slot_ids['rows0001'][1]: 'no'},
+            ('rows0002', 'Alice'): {slot_ids['rows0002'][4]: 'maybe'},
+            ('pack0001', 'Alice'): {slot_ids['pack0001'][0]: 'yes', slot_ids['pack0001'][4]: 'no'},
+            ('pack0001', 'Carol'): {slot_id: 'maybe' for slot_id in slot_ids['pack0001']},
+        }
+        deltas = {}
+        for (poll_id, voter_name), ballot in ballots.items():
+            if poll_id.startswith('pack'):
+                db.execute('INSERT INTO ballots (poll_id, voter_name, answers) VALUES (?, ?, ?)',
+                           (poll_id, voter_name, scheduler.pack_ballot(ballot, slot_ids[poll_id])))
+            else:
+                db.executemany('INSERT INTO votes (poll_id, voter_name, time_slot_id, availability) '
+                               'VALUES (?, ?, ?, ?)',
+                               [(poll_id, voter_name, slot_id, availability)
+                                for slot_id, availability in ballot.items()])
+            scheduler.count_tally_deltas(deltas, {}, ballot, ballot)
+        scheduler.apply_tally_deltas(db, deltas)
+    tallies = {row['time_slot_id']: {answer: row[answer] for answer in answers}
+               for row in db.execute('SELECT * FROM slot_tallies')}
+
+    assert storage.migrate() == (6, len(scheduler.MIGRATIONS))
+    exported = {}
+    for poll_id in slot_ids:
+        for _, voter_name, slot_id, _, _, availability in scheduler.read_poll_export(db, poll_id):
+            exported.setdefault((poll_id, voter_name), {})[slot_id] = availability
+    assert exported == ballots
+    participants = db.execute('SELECT poll_id, name FROM participants ORDER BY poll_id, name').fetchall()
+    assert [tuple(row) for row in participants] == sorted(ballots)
+    with pytest.raises(sqlite3.IntegrityError):
+        db.execute("INSERT INTO participants (poll_id, name) VALUES ('rows0001', 'Alice')")
+    for poll_id in slot_ids:
+        recount = scheduler.count_slot_tallies(db, poll_id)
+        assert {tally['slot_id']: tally['counts'] for tally in recount} == \
+            {slot_id: tallies.get(slot_id, dict.fromkeys(answers, 0)) for slot_id in slot_ids[poll_id]}
+        assert scheduler.get_slot_tallies(db, poll_id) == recount
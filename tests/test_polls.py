@@ -0,0 +1,30 @@
+"""Creating polls through the form and the batch API"""
+
+import json
+
+def post_batch(client, polls):
+    return client.post('/api/polls/batch', data=json.dumps({'polls': polls}), content_type='application/json')
+
+def test_batch_creates_every_poll(client):
+    response = post_batch(client, [
+        {'title': 'Standup', 'time_slots': ['Monday 10:00']},
+        {'title': 'Retro', 'description': 'Sprint 12', 'time_slots': ['Friday 15:00', 'Friday 16:00']},
+    ])
+    assert response.status_code == 201
+    assert len(response.get_json()['polls']) == 2
+
+def test_batch_rejects_fields_of_the_wrong_type(client):
+    response = post_batch(client, [
+        {'title': 'Standup', 'time_slots': ['Monday 10:00']},
+        {'title': 5, 'time_slots': ['Monday 10:00']},
+        {'title': 'Retro', 'description': ['Sprint 12'], 'time_slots': ['Friday 15:00']},
+        {'title': 'Planning', 'time_slots': ['Monday 10:00'], 'timezone': 5},
+        'Standup',
+    ])
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == [
+        {'index': 1, 'error': 'Title must be a string'},
+        {'index': 2, 'error': 'Description must be a string'},
+        {'index': 3, 'error': 'Unknown timezone: 5'},
+        {'index': 4, 'error': 'A title and at least one time slot are required'},
+    ]
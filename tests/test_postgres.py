@@ -0,0 +1,152 @@
+"""The PostgreSQL backend against a real server; set TEST_DATABASE_URL to run these"""
+
+import csv
+import io
+import os
+import threading
+import uuid
+
+import pytest
+
+from conftest import scheduler
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL is not set')
+
+@pytest.fixture
+def postgres(monkeypatch):
+    """Run the app on TEST_DATABASE_URL, in a schema of its own that is dropped afterwards"""
+    psycopg = pytest.importorskip('psycopg')
+    pytest.importorskip('psycopg_pool')
+    from psycopg.conninfo import make_conninfo
+
+    schema = f'kdc_test_{uuid.uuid4().hex[:12]}'
+    with psycopg.connect(TEST_DATABASE_URL, autocommit=True) as conn:
+        conn.execute(f'CREATE SCHEMA {schema}')
+    storage = scheduler.PostgresStorage(make_conninfo(TEST_DATABASE_URL, options=f'-c search_path={schema}'),
+                                        min_size=1, max_size=8, timeout=10)
+    monkeypatch.setattr(scheduler, 'storage', storage)
+    try:
+        assert storage.migrate() == (0, len(scheduler.POSTGRES_MIGRATIONS))
+        yield storage
+    finally:
+        storage.release()
+        storage._get_pool().close()
+        with psycopg.connect(TEST_DATABASE_URL, autocommit=True) as conn:
+            conn.execute(f'DROP SCHEMA {schema} CASCADE')
+
+def vote(client, poll_id, voter_name, answers):
+    form = {'poll_id': poll_id, 'voter_name': voter_name}
+    form.update({f'slot_{slot_id}': answer for slot_id, answer in answers.items()})
+    assert client.post('/vote', data=form).status_code == 302
+
+def test_migrations_run_once(postgres):
+    version = len(scheduler.POSTGRES_MIGRATIONS)
+    assert postgres.migrate() == (version, version)
+
+def test_nodes_starting_together_migrate_once():
+    psycopg = pytest.importorskip('psycopg')
+    from psycopg.conninfo import make_conninfo
+
+    schema = f'kdc_test_{uuid.uuid4().hex[:12]}'
+    with psycopg.connect(TEST_DATABASE_URL, autocommit=True) as conn:
+        conn.execute(f'CREATE SCHEMA {schema}')
+    url = make_conninfo(TEST_DATABASE_URL, options=f'-c search_path={schema}')
+    nodes = [scheduler.PostgresStorage(url, min_size=1, max_size=1, timeout=30) for _ in range(4)]
+    results = []
+    try:
+        threads = [threading.Thread(target=lambda node=node: results.append(node.migrate())) for node in nodes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Nodes may take turns applying migrations, but each is applied once
+        assert [after for _, after in results] == [len(scheduler.POSTGRES_MIGRATIONS)] * 4
+        with psycopg.connect(url) as conn:
+            assert conn.execute('SELECT COUNT(*) FROM schema_version').fetchone()[0] == 1
+    finally:
+        for node in nodes:
+            node._get_pool().close()
+        with psycopg.connect(TEST_DATABASE_URL, autocommit=True) as conn:
+            conn.execute(f'DROP SCHEMA {schema} CASCADE')
+
+def test_votes_are_tallied(postgres, client, create_poll):
+    poll_id, (monday, tuesday) = create_poll()
+    vote(client, poll_id, 'Alice', {monday: 'yes', tuesday: 'no'})
+    vote(client, poll_id, 'Bob', {monday: 'maybe', tuesday: 'yes'})
+    # Changing a ballot replaces the voter's answers
+    vote(client, poll_id, 'Alice', {monday: 'yes', tuesday: 'yes'})
+
+    results = {slot['slot_id']: slot['counts'] for slot in client.get(f'/api/poll/{poll_id}/results').get_json()}
+    assert results[monday] == {'yes': 1, 'maybe': 1, 'no': 0}
+    assert results[tuesday] == {'yes': 2, 'maybe': 0, 'no': 0}
+
+    db = scheduler.get_db()
+    events = scheduler.read_poll_events(db, poll_id, 0)
+    scheduler.storage.release()
+    assert len(events) == 3
+
+def test_concurrent_votes_are_all_recorded(postgres, create_poll):
+    poll_id, (monday, _) = create_poll()
+    failures = []
+
+    def submit(index):
+        try:
+            with scheduler.app.test_client() as client:
+                vote(client, poll_id, f'Voter {index}', {monday: 'yes'})
+        except Exception as error:   # reported below; a thread can't fail the test itself
+            failures.append(error)
+
+    threads = [threading.Thread(target=submit, args=(index,)) for index in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not failures
+
+    db = scheduler.get_db()
+    counts = {tally['slot_id']: tally['counts'] for tally in scheduler.get_slot_tallies(db, poll_id)}
+    event_ids = [row['id'] for row in scheduler.read_poll_events(db, poll_id, 0)]
+    scheduler.storage.release()
+    assert counts[monday]['yes'] == 16
+    assert event_ids == sorted(set(event_ids)) and len(event_ids) == 16
+
+def test_export_streams_and_imports_again(postgres, client, create_poll, monkeypatch):
+    monkeypatch.setattr(scheduler, 'STREAM_FETCH_ROWS', 3)   # several round trips of the server-side cursor
+    poll_id, slot_ids = create_poll(time_slots=['Monday 10:00', 'Monday 11:00', 'Monday 12:00'])
+    for index in range(5):
+        vote(client, poll_id, f'Voter {index}', {slot_id: 'maybe' for slot_id in slot_ids})
+
+    exported = client.get(f'/api/poll/{poll_id}/export.csv').get_data(as_text=True)
+    rows = list(csv.DictReader(io.StringIO(exported)))
+    assert len(rows) == 15
+    assert {row['availability'] for row in rows} == {'maybe'}
+
+    # Merge it back with every answer changed
+    data = {'file': (io.BytesIO(exported.replace(',maybe', ',yes').encode()), 'export.csv')}
+    report = client.post(f'/api/poll/{poll_id}/import', data=data).get_json()
+    assert (report['imported'], report['changed'], report['errors']) == (15, 15, [])
+
+    results = client.get(f'/api/poll/{poll_id}/results').get_json()
+    assert [slot['counts'] for slot in results] == [{'yes': 5, 'maybe': 0, 'no': 0}] * 3
+
+def test_watcher_recovers_after_its_connection_drops(postgres, create_poll, monkeypatch):
+    monkeypatch.setattr(scheduler, 'EVENT_POLL_INTERVAL', 0.05)
+    poll_id, _ = create_poll()
+    broker = scheduler.PollEventBroker()
+    assert not broker.wait(poll_id, 0, 0.3)
+
+    db = scheduler.get_db()
+    terminated = db.execute('''
+        SELECT COUNT(*) FILTER (WHERE pg_terminate_backend(pid)) FROM pg_stat_activity
+        WHERE datname = current_database() AND pid <> pg_backend_pid()
+    ''').fetchone()[0]
+    assert terminated >= 1
+
+    # Write on the one connection left; the watcher has to replace its own
+    with db:
+        event_id = scheduler.record_poll_reload(db, poll_id)
+    scheduler.storage.release()
+    assert broker.wait(poll_id, 0, 5)
+    assert broker.latest(poll_id) == event_id
@@ -0,0 +1,37 @@
+"""Choosing slots: the best slot and the fewest slots covering everyone"""
+
+import pytest
+
+def vote(client, poll_id, voter_name, answers):
+    form = {'poll_id': poll_id, 'voter_name': voter_name}
+    form.update({f'slot_{slot_id}': answer for slot_id, answer in answers.items()})
+    client.post('/vote', data=form)
+
+@pytest.fixture
+def poll(client, create_poll):
+    poll_id, (monday, tuesday) = create_poll()
+    vote(client, poll_id, 'Alice', {monday: 'yes', tuesday: 'no'})
+    vote(client, poll_id, 'Bob', {monday: 'no', tuesday: 'yes'})
+    return poll_id
+
+def test_cover_uses_one_slot_per_voter_group(client, poll):
+    response = client.get(f'/api/poll/{poll}/cover?budget_ms=50')
+    assert response.status_code == 200
+    assert len(response.get_json()['sessions']) == 2
+
+@pytest.mark.parametrize('budget', ['nan', 'inf', '-inf', 'soon'])
+def test_cover_rejects_budgets_that_are_not_finite_numbers(client, poll, budget):
+    response = client.get(f'/api/poll/{poll}/cover?budget_ms={budget}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'budget_ms must be a number'}
+
+def test_best_ranks_slots_by_weighted_answers(client, poll):
+    response = client.get(f'/api/poll/{poll}/best?yes=1&no=-1&optional=Bob&optional_weight=0.5')
+    assert response.status_code == 200
+    assert [slot['score'] for slot in response.get_json()['slots']] == [0.5, -0.5]
+
+@pytest.mark.parametrize('query', ['yes=nan', 'maybe=inf', 'no=-inf', 'optional_weight=nan', 'yes=1e308'])
+def test_best_rejects_weights_that_are_not_finite(client, poll, query):
+    response = client.get(f'/api/poll/{poll}/best?{query}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Weights must be finite numbers between -1e+06 and 1e+06'}
@@ -0,0 +1,34 @@
+"""Finding time slots by when they start, and paging through a poll's slots"""
+
+import pytest
+
+def test_slots_in_range(client, create_poll):
+    poll_id, _ = create_poll(time_slots=['2026-03-02 10:00', '2026-03-03 10:00'])
+    response = client.get(f'/api/slots?poll={poll_id}&start=2026-03-02T00:00:00Z&end=1772496000')
+    assert response.status_code == 200
+    assert [slot['slot_datetime'] for slot in response.get_json()['slots']] == ['2026-03-02 10:00']
+
+@pytest.mark.parametrize('start, end', [
+    ('0', '99999999999999999999'),
+    ('-99999999999999999999', '0'),
+    ('0', '9' * 5000),
+])
+def test_slots_in_range_rejects_times_out_of_range(client, create_poll, start, end):
+    poll_id, _ = create_poll()
+    response = client.get(f'/api/slots?poll={poll_id}&start={start}&end={end}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'start and end are required, as epoch seconds or ISO 8601'}
+
+def test_slot_pages_follow_each_other(client, create_poll):
+    poll_id, slot_ids = create_poll(time_slots=['2026-03-02 10:00', '2026-03-02 11:00', '2026-03-02 12:00'])
+    first = client.get(f'/api/poll/{poll_id}/slots?limit=2').get_json()
+    assert [slot['slot_id'] for slot in first['slots']] == slot_ids[:2]
+    second = client.get(f"/api/poll/{poll_id}/slots?limit=2&after={first['next']}").get_json()
+    assert ([slot['slot_id'] for slot in second['slots']], second['next']) == (slot_ids[2:], None)
+
+@pytest.mark.parametrize('after', ['999999999999999999999', '-1', '0', 'first'])
+def test_slot_pages_reject_cursors_that_are_not_slot_ids(client, create_poll, after):
+    poll_id, _ = create_poll()
+    response = client.get(f'/api/poll/{poll_id}/slots?after={after}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'after must be the slot ID of a previous page'}
@@ -0,0 +1,107 @@
+"""Stored slot tallies: vote deltas, rebuilds and the check-tallies command"""
+
+import pytest
+
+from conftest import scheduler
+
+def vote(client, poll_id, voter_name, answers):
+    form = {'poll_id': poll_id, 'voter_name': voter_name}
+    form.update({f'slot_{slot_id}': answer for slot_id, answer in answers.items()})
+    assert client.post('/vote', data=form).status_code == 302
+
+def stored_tallies(poll_id):
+    return {tally['slot_id']: tally['counts'] for tally in scheduler.get_slot_tallies(scheduler.get_db(), poll_id)}
+
+def counted_tallies(poll_id):
+    return {tally['slot_id']: tally['counts'] for tally in scheduler.count_slot_tallies(scheduler.get_db(), poll_id)}
+
+def counts(yes=0, maybe=0, no=0):
+    return {'yes': yes, 'maybe': maybe, 'no': no}
+
+def check_tallies(*args):
+    return scheduler.app.test_cli_runner().invoke(args=['check-tallies', *args]).output
+
+@pytest.fixture(params=['rows', 'packed'])
+def poll(request, create_poll, monkeypatch):
+    """A poll with two slots, stored in each ballot format in turn"""
+    monkeypatch.setattr(scheduler, 'PACKED_BALLOTS_MIN_SLOTS', 1 if request.param == 'packed' else 0)
+    poll_id, slot_ids = create_poll()
+    assert scheduler.get_ballot_format(scheduler.get_db(), poll_id) == request.param
+    return poll_id, slot_ids
+
+def test_deltas_follow_each_answer():
+    deltas = scheduler.count_tally_deltas({}, {1: 'yes', 2: 'no', 3: 'maybe'}, {1: 'maybe', 2: 'no', 4: 'yes'},
+                                          [1, 2, 3, 4])
+    assert deltas == {
+        1: counts(yes=-1, maybe=1),   # changed
+        2: counts(),                  # the same answer again
+        3: counts(maybe=-1),          # withdrawn
+        4: counts(yes=1),             # new
+    }
+    # Further voters add up in the same dict
+    scheduler.count_tally_deltas(deltas, {}, {1: 'maybe'}, [1])
+    assert deltas[1] == counts(yes=-1, maybe=2)
+
+def test_votes_keep_tallies_in_step(client, poll):
+    poll_id, (monday, tuesday) = poll
+    vote(client, poll_id, 'Alice', {monday: 'yes', tuesday: 'no'})
+    vote(client, poll_id, 'Bob', {monday: 'yes', tuesday: 'yes'})
+    assert stored_tallies(poll_id) == {monday: counts(yes=2), tuesday: counts(yes=1, no=1)}
+
+    # A changed answer moves a count; the same answer again changes nothing
+    vote(client, poll_id, 'Alice', {monday: 'yes', tuesday: 'maybe'})
+    assert stored_tallies(poll_id) == {monday: counts(yes=2), tuesday: counts(yes=1, maybe=1)}
+
+    # Answers left out of a new ballot are deleted, down to the whole ballot
+    vote(client, poll_id, 'Bob', {tuesday: 'yes'})
+    vote(client, poll_id, 'Alice', {})
+    assert stored_tallies(poll_id) == {monday: counts(), tuesday: counts(yes=1)}
+    assert stored_tallies(poll_id) == counted_tallies(poll_id)
+
+def test_applied_deltas_add_to_stored_tallies(client, poll):
+    poll_id, (monday, tuesday) = poll
+    vote(client, poll_id, 'Alice', {monday: 'no'})
+    db = scheduler.get_db()
+    with db:
+        # Tuesday has no slot_tallies row yet; the first delta creates it
+        db.execute('DELETE FROM slot_tallies WHERE time_slot_id = ?', (tuesday,))
+        scheduler.apply_tally_deltas(db, {monday: counts(yes=2, no=-1), tuesday: counts(maybe=1)})
+    assert stored_tallies(poll_id) == {monday: counts(yes=2), tuesday: counts(maybe=1)}
+
+def test_check_tallies_finds_and_fixes_drift(client, poll):
+    poll_id, (monday, tuesday) = poll
+    vote(client, poll_id, 'Alice', {monday: 'yes', tuesday: 'no'})
+    vote(client, poll_id, 'Bob', {monday: 'maybe'})
+    expected = stored_tallies(poll_id)
+    assert expected == counted_tallies(poll_id)
+    assert f'Poll {poll_id}' not in check_tallies(poll_id)
+
+    db = scheduler.get_db()
+    with db:
+        db.execute('UPDATE slot_tallies SET yes = yes + 3 WHERE time_slot_id = ?', (monday,))
+        db.execute('DELETE FROM slot_tallies WHERE time_slot_id = ?', (tuesday,))
+    version = scheduler.get_poll_version(db, poll_id)
+
+    # Without --fix the drift is only reported
+    output = check_tallies(poll_id)
+    assert f'Poll {poll_id}: 2 slots differ\n' in output
+    assert 'Checked 1 polls, 1 with drifted tallies' in output
+    assert stored_tallies(poll_id) != expected
+
+    output = check_tallies('--fix', poll_id)
+    assert f'Poll {poll_id}: 2 slots differ (rebuilt)' in output
+    assert stored_tallies(poll_id) == expected
+    assert scheduler.get_poll_version(db, poll_id) == version + 1
+    assert 'Checked 1 polls, 0 with drifted tallies' in check_tallies(poll_id)
+
+def test_rebuild_recounts_from_the_votes(client, poll):
+    poll_id, (monday, tuesday) = poll
+    vote(client, poll_id, 'Alice', {monday: 'yes', tuesday: 'no'})
+    vote(client, poll_id, 'Bob', {tuesday: 'no'})
+    db = scheduler.get_db()
+    with db:
+        db.execute('UPDATE slot_tallies SET yes = 7, maybe = 7, no = 7 WHERE time_slot_id IN (?, ?)',
+                   (monday, tuesday))
+        scheduler.rebuild_slot_tallies(db, poll_id)
+    assert stored_tallies(poll_id) == {monday: counts(yes=1), tuesday: counts(no=2)}
+    assert scheduler.find_tally_drift(db, poll_id) == []